@@ -1,6 +1,11 @@
-from fastapi import FastAPI
+import os
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
+from bulk_import import detect_format, parse_records, validate_batches
+from user_store import DuplicateEmail, UserStore, VersionConflict
 
 app = FastAPI(title="My API", version="1.0.0")
 
@@ -10,8 +15,28 @@ class User(BaseModel):
     email: str
     age: Optional[int] = None
 
-# In-memory storage (use database in production)
-users_db = []
+# In-memory storage (use database in production): stable ids, unique emails, versioned writes
+users_db = UserStore()
+MAX_IMPORT_ROWS = int(os.environ.get('USERS_MAX_IMPORT_ROWS', 50000))
+
+def user_response(body, user, status_code=200):
+    """JSON response carrying the user's version as its ETag"""
+    return JSONResponse(body, status_code=status_code, headers={"ETag": f'"{user["version"]}"'})
+
+def expected_version(if_match):
+    """The version named by an If-Match header ("3" or 3), or None to write unconditionally"""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    try:
+        return int(if_match.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match must be a user version ETag")
+
+def conflict(e):
+    if isinstance(e, VersionConflict):
+        return JSONResponse({"error": str(e), "version": e.current_version}, status_code=412,
+                            headers={"ETag": f'"{e.current_version}"'})
+    return JSONResponse({"error": str(e)}, status_code=409)
 
 # Routes
 @app.get("/")
@@ -20,29 +45,63 @@ async def root():
 
 @app.get("/users")
 async def get_users():
-    return {"users": users_db}
+    return {"users": users_db.list()}
 
 @app.post("/users")
 async def create_user(user: User):
-    users_db.append(user.dict())
-    return {"message": "User created", "user": user}
+    try:
+        created = users_db.create(user.model_dump())
+    except DuplicateEmail as e:
+        return conflict(e)
+    return user_response({"message": "User created", "user": created}, created)
+
+@app.post("/users/bulk")
+async def create_users(request: Request, format: Optional[str] = None):
+    """Create many users from a JSON array, NDJSON or CSV body; invalid rows are reported, not fatal"""
+    try:
+        records = parse_records(await request.body(), detect_format(request.headers.get("content-type"), format))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(records) > MAX_IMPORT_ROWS:
+        raise HTTPException(status_code=413, detail=f"Too many rows ({len(records)}, max {MAX_IMPORT_ROWS})")
+
+    valid, errors = await run_in_threadpool(validate_batches, User, records)
+    created, duplicates = users_db.create_many([user.model_dump() for _, user in valid])
+    errors.extend({"index": valid[duplicate["position"]][0], "error": duplicate["error"]} for duplicate in duplicates)
+    errors.sort(key=lambda error: error["index"])
+
+    rejected = {duplicate["position"] for duplicate in duplicates}
+    indexes = [index for position, (index, _) in enumerate(valid) if position not in rejected]
+    return {
+        "message": f"{len(created)} users created",
+        "ids": [{"index": index, "id": user["id"]} for index, user in zip(indexes, created)],
+        "errors": errors
+    }
 
 @app.get("/users/{user_id}")
 async def get_user(user_id: int):
-    if 0 <= user_id < len(users_db):
-        return users_db[user_id]
+    user = users_db.get(user_id)
+    if user is not None:
+        return user_response(user, user)
     return {"error": "User not found"}
 
 @app.put("/users/{user_id}")
-async def update_user(user_id: int, user: User):
-    if 0 <= user_id < len(users_db):
-        users_db[user_id] = user.dict()
-        return {"message": "User updated", "user": user}
+async def update_user(user_id: int, user: User, if_match: Optional[str] = Header(None)):
+    """Replace a user; send the ETag from a previous read as If-Match to reject concurrent changes (412)"""
+    try:
+        updated = users_db.update(user_id, user.model_dump(), expected_version(if_match))
+    except (DuplicateEmail, VersionConflict) as e:
+        return conflict(e)
+    if updated is not None:
+        return user_response({"message": "User updated", "user": updated}, updated)
     return {"error": "User not found"}
 
 @app.delete("/users/{user_id}")
-async def delete_user(user_id: int):
-    if 0 <= user_id < len(users_db):
-        deleted_user = users_db.pop(user_id)
+async def delete_user(user_id: int, if_match: Optional[str] = Header(None)):
+    try:
+        deleted_user = users_db.delete(user_id, expected_version(if_match))
+    except VersionConflict as e:
+        return conflict(e)
+    if deleted_user is not None:
         return {"message": "User deleted", "user": deleted_user}
     return {"error": "User not found"}
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""Pre-serialized /api/airports responses with ETags, compression and pagination.
+
+The airport list only changes when the registry is rebuilt, so the full
+response is serialized and compressed once at startup. Pages and field
+selections are built from pre-shaped entries the first time they are
+asked for and kept in a small LRU. Every variant carries a strong ETag, so
+clients revalidating with If-None-Match get a 304 without a body.
+"""
+import bisect
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from flask import Response, jsonify, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always offered
+    brotli = None
+
+FIELDS = ('code', 'name', 'city', 'country', 'coordinates')
+# The full listings are built once and kept; pages are built on demand, so they get cheaper settings
+FULL_COMPRESSION = {'gzip': 9, 'br': 11}
+PAGE_COMPRESSION = {'gzip': 6, 'br': 4}
+DEFAULT_FIELDS = ('code', 'city', 'coordinates')
+
+
+def _serialize(data):
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class AirportListing:
+    """Serve the airport list from bytes prepared ahead of time"""
+
+    def __init__(self, registry, max_age=3600, max_page_size=1000, max_variants=256):
+        self.max_age = max_age
+        self.max_page_size = max_page_size
+        self.max_variants = max_variants
+        self._entries = [
+            {
+                'code': airport['code'],
+                'name': airport['name'],
+                'city': airport['city'],
+                'country': airport['country'],
+                'coordinates': {'lat': airport['lat'], 'lon': airport['lon']}
+            }
+            for airport in registry.values()
+        ]
+        self._codes = [entry['code'] for entry in self._entries]
+        self._version = hashlib.sha256(_serialize(self._entries)).hexdigest()[:16]
+        self._variants = OrderedDict()  # (fields, start, limit) -> encoded bodies
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.not_modified = 0
+        # The unpaginated default listing is what most clients ask for
+        self._variant(DEFAULT_FIELDS, 0, None)
+
+    def _build(self, fields, start, limit):
+        end = len(self._entries) if limit is None else min(start + limit, len(self._entries))
+        page = self._entries[start:end]
+        if fields != FIELDS:
+            page = [{field: entry[field] for field in fields} for entry in page]
+
+        data = {
+            'success': True,
+            'airports': page,
+            'count': len(page)
+        }
+        if limit is not None:
+            data['total'] = len(self._entries)
+            data['nextCursor'] = self._codes[end - 1] if end < len(self._entries) and page else None
+
+        body = _serialize(data)
+        variant_key = '|'.join([self._version, ','.join(fields), str(start), str(limit)])
+        etag = hashlib.sha256(variant_key.encode('utf-8')).hexdigest()[:24]
+        compression = FULL_COMPRESSION if limit is None else PAGE_COMPRESSION
+        encoded = {
+            'identity': (body, f'"{etag}"'),
+            'gzip': (gzip.compress(body, compresslevel=compression['gzip'], mtime=0), f'"{etag}-gz"')
+        }
+        if brotli is not None:
+            encoded['br'] = (brotli.compress(body, quality=compression['br']), f'"{etag}-br"')
+        return encoded
+
+    def _variant(self, fields, start, limit):
+        key = (fields, start, limit)
+        with self._lock:
+            encoded = self._variants.get(key)
+            if encoded is not None:
+                self._variants.move_to_end(key)
+                self.hits += 1
+                return encoded
+
+        encoded = self._build(fields, start, limit)
+        with self._lock:
+            self._variants[key] = encoded
+            while len(self._variants) > self.max_variants:
+                self._variants.popitem(last=False)
+        return encoded
+
+    def parse(self, args):
+        """Validate ?fields=, ?cursor= and ?limit= into (fields, start index, limit).
+
+        Raises ValueError with a client-facing message. The cursor is the
+        code of the last airport on the previous page; it is resolved to a
+        start index here so any cursor falling in the same gap shares one
+        cached page.
+        """
+        fields = DEFAULT_FIELDS
+        if args.get('fields'):
+            requested = [field.strip() for field in args['fields'].split(',') if field.strip()]
+            unknown = [field for field in requested if field not in FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)} (available: {', '.join(FIELDS)})")
+            fields = tuple(field for field in FIELDS if field in requested)
+
+        cursor = args.get('cursor') or None
+        start = 0 if cursor is None else bisect.bisect_right(self._codes, cursor.upper())
+
+        limit = args.get('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                raise ValueError('limit must be an integer')
+            limit = min(max(limit, 1), self.max_page_size)
+        elif cursor is not None:
+            limit = self.max_page_size
+        return fields, start, limit
+
+    def negotiate(self, args, accepts, if_none_match=''):
+        """Pick the encoded body for a request: returns (status, body, headers).
+
+        `accepts(encoding)` says whether the client takes an encoding; the
+        status is 304 (with an empty body) when If-None-Match matches.
+        """
+        fields, start, limit = self.parse(args)
+        encoded = self._variant(fields, start, limit)
+
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in encoded and accepts(candidate):
+                encoding = candidate
+                break
+        body, etag = encoded[encoding]
+
+        headers = {
+            'ETag': etag,
+            'Cache-Control': f'public, max-age={self.max_age}',
+            'Vary': 'Accept-Encoding'
+        }
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+
+        # Match any of this variant's ETags: a proxy may have stored a different encoding
+        if if_none_match.strip() == '*' or any(tag in if_none_match for _, tag in encoded.values()):
+            with self._lock:
+                self.not_modified += 1
+            return 304, b'', headers
+        return 200, body, headers
+
+    def respond(self, request):
+        """Build the Flask response for a /api/airports request (400 on bad query parameters)"""
+        try:
+            status, body, headers = self.negotiate(
+                request.args,
+                lambda encoding: bool(request.accept_encodings[encoding]),
+                request.headers.get('If-None-Match', '')
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if status == 304:
+            return Response(status=304, headers=headers)
+        return Response(body, mimetype='application/json', headers=headers)
+
+    def add_route(self, app, rule='/api/airports'):
+        """Serve this listing at `rule` on a Flask app: ?fields=, ?limit=, ?cursor= and ETag revalidation"""
+        app.add_url_rule(rule, 'list_airports', lambda: self.respond(request))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'airports': len(self._entries),
+                'variants': len(self._variants),
+                'hits': self.hits,
+                'not_modified': self.not_modified,
+                'brotli': brotli is not None
+            }
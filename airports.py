@@ -0,0 +1,316 @@
+"""Shared airport registry loaded from a packed, memory-mapped file.
+
+airports.bin is produced by build_airports.py and holds, after a small
+header:
+
+    records   fixed-size (code, lat, lon, string offsets) rows sorted by code
+    slots     26**3 int16 entries mapping a three-letter code to its row (-1 if absent)
+    cities    row numbers sorted by case-folded city, for autocomplete
+    strings   one UTF-8 blob with every name, city and country
+
+Code lookups are a single slot read; code and city prefix searches bisect
+the sorted rows; nearest-airport queries walk a coarse lat/lon grid built at
+load. Rows are decoded on access, so a 10k-airport file costs a few hundred
+kilobytes of page cache shared by every worker.
+"""
+import bisect
+import csv
+import math
+import mmap
+import os
+import struct
+
+MAGIC = b'APT1'
+HEADER = struct.Struct('<4sII')  # magic, count, strings size
+RECORD = struct.Struct('<3sffIHIHIH')  # code, lat, lon, (offset, length) of name, city, country
+SLOT_COUNT = 26 ** 3
+SLOT = struct.Struct('<h')
+MAX_AIRPORTS = 32767  # row numbers are stored as int16 slots
+
+GRID_DEGREES = 2.0
+GRID_ROWS = int(180 / GRID_DEGREES) + 1
+GRID_COLUMNS = int(360 / GRID_DEGREES)
+SCAN_BELOW = 256  # registries this small are scanned directly instead of through the grid
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+AIRPORTS_FILE = os.environ.get('AIRPORTS_FILE', os.path.join(DATA_DIR, 'airports.bin'))
+AIRPORTS_CSV = os.path.join(DATA_DIR, 'airports.csv')
+
+
+def slot_for(code):
+    """Slot number for a three-letter code, or None if it is not one"""
+    if len(code) != 3 or not code.isascii() or not code.isalpha():
+        return None
+    a, b, c = (ord(char) - 65 for char in code.upper())
+    return (a * 26 + b) * 26 + c
+
+
+def read_csv(path):
+    """Read airport rows from a CSV.
+
+    Accepts this repo's airports.csv columns (iata, name, city, country, lat,
+    lon) or an OurAirports airports.csv export (iata_code, name,
+    municipality, iso_country, latitude_deg, longitude_deg).
+    """
+    with open(path, newline='', encoding='utf-8') as fp:
+        for row in csv.DictReader(fp):
+            code = (row.get('iata') or row.get('iata_code') or '').strip().upper()
+            if slot_for(code) is None:
+                continue
+            yield {
+                'code': code,
+                'name': row.get('name', '').strip(),
+                'city': (row.get('city') or row.get('municipality') or '').strip(),
+                'country': (row.get('country') or row.get('iso_country') or '').strip(),
+                'lat': float(row.get('lat') or row.get('latitude_deg')),
+                'lon': float(row.get('lon') or row.get('longitude_deg'))
+            }
+
+
+def pack(rows):
+    """Pack airport rows into the registry file format and return the bytes"""
+    by_code = {}
+    for row in rows:
+        by_code.setdefault(row['code'], row)  # first row wins on duplicate codes
+    airports = [by_code[code] for code in sorted(by_code)]
+    if len(airports) > MAX_AIRPORTS:
+        raise ValueError(f'Too many airports ({len(airports)}, max {MAX_AIRPORTS})')
+
+    strings = bytearray()
+    offsets = {}
+
+    def intern(text):
+        data = text.encode('utf-8')[:65535]
+        if data not in offsets:
+            offsets[data] = len(strings)
+            strings.extend(data)
+        return offsets[data], len(data)
+
+    records = bytearray()
+    slots = [-1] * SLOT_COUNT
+    for index, airport in enumerate(airports):
+        slots[slot_for(airport['code'])] = index
+        records += RECORD.pack(
+            airport['code'].encode('ascii'), airport['lat'], airport['lon'],
+            *intern(airport['name']), *intern(airport['city']), *intern(airport['country'])
+        )
+
+    cities = sorted(range(len(airports)), key=lambda index: (airports[index]['city'].casefold(), airports[index]['code']))
+    return b''.join([
+        HEADER.pack(MAGIC, len(airports), len(strings)),
+        bytes(records),
+        struct.pack(f'<{SLOT_COUNT}h', *slots),
+        struct.pack(f'<{len(cities)}I', *cities),
+        bytes(strings)
+    ])
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class AirportRegistry:
+    """Read-only airport registry over a packed buffer.
+
+    Behaves like the old AIRPORT_DATA dict (`code in registry`,
+    `registry[code]['city']`, `.keys()`, `.items()`), and adds `search` for
+    autocomplete and `nearest` for lat/lon queries.
+    """
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        magic, self.count, strings_size = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError('Not an airport registry file')
+        self._records_at = HEADER.size
+        self._slots_at = self._records_at + self.count * RECORD.size
+        self._cities_at = self._slots_at + SLOT_COUNT * SLOT.size
+        self._strings_at = self._cities_at + self.count * 4
+        if len(buffer) < self._strings_at + strings_size:
+            raise ValueError('Truncated airport registry file')
+        self._cities = memoryview(buffer)[self._cities_at:self._strings_at].cast('I')
+        self._grid = self._build_grid()
+
+    @classmethod
+    def open(cls, path=AIRPORTS_FILE):
+        """Memory-map a prebuilt registry file"""
+        with open(path, 'rb') as fp:
+            return cls(mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @classmethod
+    def from_csv(cls, path=AIRPORTS_CSV):
+        return cls(pack(read_csv(path)))
+
+    def _row(self, index):
+        return RECORD.unpack_from(self._buffer, self._records_at + index * RECORD.size)
+
+    def _string(self, offset, length):
+        start = self._strings_at + offset
+        return bytes(self._buffer[start:start + length]).decode('utf-8')
+
+    def _code(self, index):
+        start = self._records_at + index * RECORD.size
+        return bytes(self._buffer[start:start + 3]).decode('ascii')
+
+    def _city(self, index):
+        offset, length = self._row(index)[5:7]
+        return self._string(offset, length)
+
+    def _airport(self, index):
+        code, lat, lon, name_at, name_len, city_at, city_len, country_at, country_len = self._row(index)
+        return {
+            'code': code.decode('ascii'),
+            'name': self._string(name_at, name_len),
+            'city': self._string(city_at, city_len),
+            'country': self._string(country_at, country_len),
+            'lat': round(lat, 4),
+            'lon': round(lon, 4)
+        }
+
+    def _index(self, code):
+        slot = slot_for(code) if isinstance(code, str) else None
+        if slot is None:
+            return -1
+        return SLOT.unpack_from(self._buffer, self._slots_at + slot * SLOT.size)[0]
+
+    def get(self, code, default=None):
+        index = self._index(code)
+        return default if index < 0 else self._airport(index)
+
+    def __getitem__(self, code):
+        index = self._index(code)
+        if index < 0:
+            raise KeyError(code)
+        return self._airport(index)
+
+    def __contains__(self, code):
+        return self._index(code) >= 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return (self._code(index) for index in range(self.count))
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return (self._airport(index) for index in range(self.count))
+
+    def items(self):
+        return ((airport['code'], airport) for airport in self.values())
+
+    def search(self, prefix, limit=10):
+        """Autocomplete: airports whose code starts with prefix, then those whose city does"""
+        prefix = prefix.strip()
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+
+        code_prefix = prefix.upper()
+        if len(code_prefix) <= 3:
+            start = bisect.bisect_left(range(self.count), code_prefix, key=self._code)
+            for index in range(start, self.count):
+                if len(results) >= limit or not self._code(index).startswith(code_prefix):
+                    break
+                results.append(self._airport(index))
+                seen.add(index)
+
+        city_prefix = prefix.casefold()
+        city_key = lambda position: self._city(self._cities[position]).casefold()
+        start = bisect.bisect_left(range(self.count), city_prefix, key=city_key)
+        for position in range(start, self.count):
+            if len(results) >= limit or not city_key(position).startswith(city_prefix):
+                break
+            index = self._cities[position]
+            if index not in seen:
+                results.append(self._airport(index))
+        return results
+
+    def suggest(self, query, limit=5):
+        """A few codes to offer for an unknown code: its search matches, else codes sharing its first two letters"""
+        matches = self.search(query, limit) or self.search(query[:2], limit)
+        return [airport['code'] for airport in matches]
+
+    def _build_grid(self):
+        grid = {}
+        for index in range(self.count):
+            lat, lon = self._row(index)[1:3]
+            grid.setdefault(self._cell(lat, lon), []).append(index)
+        return grid
+
+    @staticmethod
+    def _cell(lat, lon):
+        return int((lat + 90) // GRID_DEGREES), int((lon + 180) // GRID_DEGREES) % GRID_COLUMNS
+
+    def _ring(self, center_row, center_column, ring):
+        """Grid cells exactly `ring` cells from the center (Chebyshev distance), wrapping in longitude"""
+        cells = set()
+        for offset in range(-ring, ring + 1):
+            for row, column in ((center_row - ring, center_column + offset), (center_row + ring, center_column + offset),
+                                (center_row + offset, center_column - ring), (center_row + offset, center_column + ring)):
+                if 0 <= row < GRID_ROWS:
+                    cells.add((row, column % GRID_COLUMNS))
+        return cells
+
+    def nearest(self, lat, lon, limit=1):
+        """The `limit` closest airports to a point, each with its distance_km.
+
+        Grid cells are searched in growing rings around the point until no
+        unvisited cell can hold anything closer than the current results.
+        """
+        if self.count <= SCAN_BELOW:
+            found = [(haversine_km(lat, lon, *self._row(index)[1:3]), index) for index in range(self.count)]
+        else:
+            found = self._grid_candidates(lat, lon, limit)
+
+        found.sort()
+        results = []
+        for distance, index in found[:limit]:
+            airport = self._airport(index)
+            airport['distance_km'] = round(distance, 1)
+            results.append(airport)
+        return results
+
+    def _grid_candidates(self, lat, lon, limit):
+        center_row, center_column = self._cell(lat, lon)
+        visited = set()
+        found = []  # (distance_km, index)
+        for ring in range(max(GRID_ROWS, GRID_COLUMNS)):
+            cells = self._ring(center_row, center_column, ring) - visited
+            visited |= cells
+            for cell in cells:
+                for index in self._grid.get(cell, ()):
+                    found.append((haversine_km(lat, lon, *self._row(index)[1:3]), index))
+
+            if len(visited) >= GRID_ROWS * GRID_COLUMNS:
+                break
+            if len(found) >= limit:
+                # Anything beyond this ring is at least `ring` cells away; longitude
+                # cells shrink towards the poles, so bound with the smallest width
+                # (and a margin, since great circles cut inside parallels)
+                widest_lat = min(90.0, abs(lat) + (ring + 1) * GRID_DEGREES)
+                bound = 0.9 * ring * GRID_DEGREES * KM_PER_DEGREE * math.cos(math.radians(widest_lat))
+                found.sort()
+                if found[limit - 1][0] <= bound:
+                    break
+        return found
+
+
+def load(path=AIRPORTS_FILE):
+    """Open the prebuilt registry, or pack airports.csv in memory when it has not been built"""
+    if os.path.exists(path):
+        return AirportRegistry.open(path)
+    return AirportRegistry.from_csv()
+
+
+registry = load()
+# Home airports whose weather every app keeps warm; departures add more on the fly
+PREFETCH_AIRPORTS = [code.strip().upper() for code in os.environ.get(
+    'WEATHER_PREFETCH_AIRPORTS', 'DEL,BOM,BLR,MAA,HYD,CCU,AMD,GOI,PNQ,COK').split(',') if code.strip()]
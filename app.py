@@ -1,12 +1,24 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_file, send_from_directory
 from flask_cors import CORS
-import qrcode
-import barcode
-from barcode.writer import ImageWriter
+from werkzeug.exceptions import BadRequest
+from werkzeug.security import safe_join
+import json
 import os
+from io import BytesIO
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
-import uuid
-import random
+import airports
+import composer
+import documents
+import jobs
+import streaming
+import warmup
+from airport_listing import AirportListing
+from image_janitor import ImageJanitor
+from render_cache import RenderCache
+from simulated_weather import SimulatedWeather
+from weather_cache import WeatherCache
+from weather_prefetch import DepartureBoard, WeatherPrefetcher
 
 app = Flask(__name__)
 CORS(app)
@@ -18,52 +30,37 @@ BASE_URL = '/'  # Use relative base URL
 # Ensure the images folder exists
 os.makedirs(os.path.join(app.root_path, IMAGES_FOLDER), exist_ok=True)
 
+# Rendered images are content-addressed, so reprints reuse the existing file.
+# Inline responses (data URLs, raw PNG) are served from memory and never written out.
+render_cache = RenderCache(
+    os.path.join(app.root_path, IMAGES_FOLDER),
+    max_image_bytes=int(os.environ.get('INLINE_CACHE_BYTES', 32 * 1024 ** 2))
+)
+RESPONSE_MODES = ('url', 'data-url', 'png')
+
+# Generated images are evicted after IMAGE_TTL seconds without access or when over IMAGE_MAX_BYTES
+image_janitor = ImageJanitor(
+    os.path.join(app.root_path, IMAGES_FOLDER),
+    ttl=int(os.environ.get('IMAGE_TTL', 7 * 24 * 3600)),
+    max_bytes=int(os.environ.get('IMAGE_MAX_BYTES', 1024 ** 3)),
+    interval=int(os.environ.get('JANITOR_INTERVAL', 300))
+)
+
+# Batch renders fan out over a process pool so PIL work uses every core
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', os.cpu_count() or 1))
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 1000))
+BATCH_STREAM_WINDOW = int(os.environ.get('BATCH_STREAM_WINDOW', RENDER_WORKERS * 2))
+render_pool = None
+
 # Airport data
-AIRPORT_DATA = {
-    'DEL': {'city': 'Delhi', 'lat': 28.6139, 'lon': 77.2090},
-    'BOM': {'city': 'Mumbai', 'lat': 19.0760, 'lon': 72.8777},
-    'BLR': {'city': 'Bangalore', 'lat': 12.9716, 'lon': 77.5946},
-    'MAA': {'city': 'Chennai', 'lat': 13.0827, 'lon': 80.2707},
-    'HYD': {'city': 'Hyderabad', 'lat': 17.3850, 'lon': 78.4867},
-    'CCU': {'city': 'Kolkata', 'lat': 22.5726, 'lon': 88.3639},
-    'AMD': {'city': 'Ahmedabad', 'lat': 23.0225, 'lon': 72.5714},
-    'GOI': {'city': 'Goa', 'lat': 15.2993, 'lon': 74.1240},
-    'PNQ': {'city': 'Pune', 'lat': 18.5204, 'lon': 73.8567},
-    'COK': {'city': 'Kochi', 'lat': 9.9312, 'lon': 76.2673}
-}
-
-# Weather configurations for different cities
-WEATHER_CONFIGS = {
-    'DEL': {'base_temp': 25, 'variation': 10, 'conditions': ['Clear', 'Haze', 'Cloudy']},
-    'BOM': {'base_temp': 28, 'variation': 5, 'conditions': ['Humid', 'Cloudy', 'Light Rain']},
-    'BLR': {'base_temp': 26, 'variation': 4, 'conditions': ['Mild', 'Cloudy', 'Clear']},
-    'MAA': {'base_temp': 30, 'variation': 3, 'conditions': ['Hot', 'Humid', 'Clear']},
-    'HYD': {'base_temp': 29, 'variation': 4, 'conditions': ['Clear', 'Hot', 'Cloudy']},
-    'CCU': {'base_temp': 27, 'variation': 5, 'conditions': ['Humid', 'Cloudy', 'Rain']},
-    'AMD': {'base_temp': 32, 'variation': 6, 'conditions': ['Hot', 'Clear', 'Dry']},
-    'GOI': {'base_temp': 27, 'variation': 3, 'conditions': ['Pleasant', 'Breezy', 'Clear']},
-    'PNQ': {'base_temp': 26, 'variation': 4, 'conditions': ['Mild', 'Clear', 'Cloudy']},
-    'COK': {'base_temp': 28, 'variation': 3, 'conditions': ['Humid', 'Rain', 'Cloudy']}
-}
-
-# Weather emoji mapping
-WEATHER_EMOJI = {
-    'Clear': '☀️',
-    'Cloudy': '☁️',
-    'Rain': '🌧️',
-    'Light Rain': '🌦️',
-    'Thunderstorm': '⛈️',
-    'Snow': '❄️',
-    'Mist': '🌫️',
-    'Fog': '🌫️',
-    'Haze': '🌫️',
-    'Humid': '💧',
-    'Hot': '🔥',
-    'Mild': '🌤️',
-    'Pleasant': '😊',
-    'Breezy': '💨',
-    'Dry': '🏜️'
-}
+AIRPORT_DATA = airports.registry
+airport_listing = AirportListing(AIRPORT_DATA, max_age=int(os.environ.get('AIRPORTS_MAX_AGE', 3600)))
+
+@app.before_request
+def start_background_workers():
+    # Started lazily so each forked gunicorn worker gets its own thread
+    image_janitor.start()
+    weather_prefetcher.start()
 
 @app.route('/')
 def index():
@@ -77,124 +74,413 @@ def health_check():
         'timestamp': datetime.now().isoformat()
     })
 
+def qr_code_result(data, mode='url'):
+    """Generate (or reuse) the QR code for one payload and return the response data"""
+    # Build the QR content for the current mode (boarding pass, e-ticket or baggage tag)
+    qr_data = documents.qr_payload(data)
+    departure_board.record_document(data)
+    render = lambda fp: documents.render_qr(qr_data, fp)
+
+    # Inline modes render in memory and skip the disk entirely
+    if mode != 'url':
+        png = render_cache.render_bytes('qr_code', qr_data, render, documents.QR_OPTIONS)
+        return {'qrImageUrl': documents.data_url(png)}, png
+
+    # Generate QR code (or reuse the image of an identical payload)
+    filename = render_cache.get_or_render('qr_code', qr_data, render, documents.QR_OPTIONS)
+
+    return {
+        'qrImageUrl': f"/static/images/{filename}",
+        'filename': filename
+    }, None
+
+def barcode_result(data, mode='url'):
+    """Generate (or reuse) the barcode for one payload and return the response data"""
+    # Determine barcode content based on mode
+    barcode_data = documents.barcode_payload(data)
+    render = lambda fp: documents.render_barcode(barcode_data, fp)
+
+    if mode != 'url':
+        png = render_cache.render_bytes('barcode', barcode_data, render, documents.BARCODE_OPTIONS)
+        return {'barcodeImageUrl': documents.data_url(png), 'barcodeData': barcode_data}, png
+
+    # Generate barcode (using Code128 format), reusing identical renders
+    filename = render_cache.get_or_render('barcode', barcode_data, render, documents.BARCODE_OPTIONS)
+
+    return {
+        'barcodeImageUrl': f"/static/images/{filename}",
+        'filename': filename,
+        'barcodeData': barcode_data
+    }, None
+
+def response_mode(data):
+    """Pick how a generated image is returned: a file URL (default), a data URL or the raw PNG.
+
+    Set with ?response=url|data-url|png or a "responseMode" field in the body;
+    an Accept header of image/png also selects the raw image.
+    """
+    mode = request.args.get('response') or (data.get('responseMode') if isinstance(data, dict) else None)
+    if mode is None:
+        best = request.accept_mimetypes.best_match(['application/json', 'image/png'])
+        mode = 'png' if best == 'image/png' else 'url'
+    if mode not in RESPONSE_MODES:
+        raise ValueError(f"Unknown response mode {mode!r} (expected one of {', '.join(RESPONSE_MODES)})")
+    return mode
+
+def image_response(result, png, mode, mimetype='image/png'):
+    """Return a generation result as JSON, or as the image itself in raw mode"""
+    if mode == 'png':
+        return send_file(BytesIO(png), mimetype=mimetype, max_age=3600)
+    return jsonify({
+        'success': True,
+        'data': result
+    })
+
+def request_object():
+    """The JSON body as a dict ({} when empty); raises ValueError for invalid JSON or a non-object"""
+    try:
+        data = request.json or {}
+    except BadRequest:
+        raise ValueError('Request body must be valid JSON')
+    if not isinstance(data, dict):
+        raise ValueError('Request body must be a JSON object')
+    return data
+
+def wants_async():
+    return request.args.get('async', '').lower() in ('1', 'true')
+
+def queue_job(kind, data):
+    """Queue a render job and return the 202 response pointing at its status URL"""
+    try:
+        job_id = job_queue.submit(kind, data)
+    except jobs.QueueFull as e:
+        response = jsonify({'success': False, 'error': f'Render queue is full ({e}), retry later'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
+    return jsonify({
+        'success': True,
+        'data': {
+            'jobId': job_id,
+            'status': 'queued',
+            'statusUrl': f"/api/jobs/{job_id}"
+        }
+    }), 202
+
 @app.route('/api/generate/qr-code', methods=['POST'])
 def generate_qr_code():
     try:
-        data = request.json or {}
-        
-        # Extract data based on current mode
-        if 'etFirstName' in data:  # E-Ticket mode
-            first_name = data.get('etFirstName', 'Rahul')
-            last_name = data.get('etLastName', 'Sharma')
-            flight = data.get('etFlight', 'AI 2727')
-            from_airport = data.get('etFrom', 'BOM')
-            to_airport = data.get('etTo', 'DEL')
-            date = data.get('etDate', '2025-09-10')
-            time = data.get('etTime', '13:15')
-            pnr = data.get('pnrEt', 'ABC123')
-            ticket_number = data.get('ticketNumber', '1234567890123')
-            
-            qr_data = f"E-TICKET\nTicket: {ticket_number}\nPassenger: {first_name} {last_name}\nFlight: {flight}\nFrom: {from_airport}\nTo: {to_airport}\nDate: {date}\nTime: {time}\nPNR: {pnr}"
-        
-        elif 'bagFirstName' in data:  # Baggage Tag mode
-            first_name = data.get('bagFirstName', 'Priya')
-            last_name = data.get('bagLastName', 'Patel')
-            flight = data.get('bagFlight', 'AI0121')
-            from_airport = data.get('bagFrom', 'BOM')
-            to_airport = data.get('bagTo', 'DEL')
-            pnr = data.get('bagPnr', 'ABC123')
-            bag_number = data.get('bagNumber', '0000-615742')
-            
-            qr_data = f"BAGGAGE TAG\nPassenger: {first_name} {last_name}\nFlight: {flight}\nFrom: {from_airport}\nTo: {to_airport}\nPNR: {pnr}\nTag: {bag_number}"
-        
-        else:  # Boarding Pass mode (default)
-            first_name = data.get('firstName', 'Rahul')
-            last_name = data.get('lastName', 'Sharma')
-            flight = data.get('flight', 'AI 2727')
-            from_airport = data.get('from', 'BOM')
-            to_airport = data.get('to', 'DEL')
-            date = data.get('date', '2025-09-10')
-            time = data.get('time', '13:15')
-            seat = data.get('seat', '17A')
-            gate = data.get('gate', '07')
-            pnr = data.get('pnr', 'ABC123')
-            boarding_time = data.get('boardingTime', '12:45')
-            flight_class = data.get('class', 'Y')
-            sequence = data.get('sequence', '001A')
-            
-            qr_data = f"BOARDING PASS\nPassenger: {first_name} {last_name}\nFlight: {flight}\nFrom: {from_airport}\nTo: {to_airport}\nDate: {date}\nTime: {time}\nSeat: {seat}\nGate: {gate}\nPNR: {pnr}\nBoarding: {boarding_time}\nClass: {flight_class}\nSeq: {sequence}"
-
-        # Generate QR code
-        qr_img = qrcode.make(qr_data)
-        
-        # Generate unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        filename = f"qr_code_{timestamp}_{unique_id}.png"
-        
-        # Construct the full file path
-        filepath = os.path.join(app.root_path, IMAGES_FOLDER, filename)
-        
-        # Save QR code to file
-        qr_img.save(filepath)
-        
-        # Generate the URL for the image
-        image_url = f"/static/images/{filename}"
+        try:
+            data = request_object()
+            mode = response_mode(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
 
-        return jsonify({
-            'success': True,
-            'data': {
-                'qrImageUrl': image_url,
-                'filename': filename
-            }
-        })
+        if wants_async():
+            return queue_job('qr-code', data)
+
+        result, png = qr_code_result(data, mode)
+        return image_response(result, png, mode)
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/generate/barcode', methods=['POST'])
 def generate_barcode():
+    try:
+        try:
+            data = request_object()
+            mode = response_mode(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        if wants_async():
+            return queue_job('barcode', data)
+
+        result, png = barcode_result(data, mode)
+        return image_response(result, png, mode)
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def document_format(data, requested=None):
+    """The output format asked for by ?format= or the body's "format"; raises ValueError if unsupported"""
+    image_format = requested or data.get('format', 'png')
+    if image_format not in composer.FORMATS:
+        raise ValueError(f'Unsupported format {image_format!r} (expected png or pdf)')
+    return image_format
+
+def document_result(data, image_format='png', mode='url'):
+    """Compose (or reuse) the full boarding pass, e-ticket or baggage tag for one payload"""
+    document_mode = documents.document_mode(data)
+    departure_board.record_document(data)
+    mimetype = composer.FORMATS[image_format]
+    # The composite depends on every field, so the whole payload is the cache key
+    payload = json.dumps(data, sort_keys=True)
+    options = {'format': image_format, 'qr': documents.QR_OPTIONS, 'barcode': documents.BARCODE_OPTIONS}
+    render = lambda fp: composer.render_document(data, fp, image_format)
+
+    if mode != 'url':
+        content = render_cache.render_bytes(document_mode, payload, render, options)
+        return {'documentUrl': documents.data_url(content, mimetype), 'mode': document_mode}, content, mimetype
+
+    filename = render_cache.get_or_render(document_mode, payload, render, options, extension=image_format)
+
+    return {
+        'documentUrl': f"/static/images/{filename}",
+        'filename': filename,
+        'mode': document_mode
+    }, None, mimetype
+
+@app.route('/api/generate/document', methods=['POST'])
+def generate_document():
+    """Render the complete document server-side as PNG or PDF (?format=png|pdf).
+
+    ?response=png returns the file itself (PDF bytes when format=pdf).
+    """
+    try:
+        try:
+            data = request_object()
+            image_format = document_format(data, request.args.get('format'))
+            mode = response_mode(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        result, content, mimetype = document_result(data, image_format, mode)
+        return image_response(result, content, mode, mimetype)
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def get_render_pool():
+    """Return the process pool used for batch rendering, creating it on first use"""
+    global render_pool
+    if render_pool is None:
+        render_pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+    return render_pool
+
+def render_batch(passengers):
+    """Render QR codes and barcodes for a list of passenger payloads.
+
+    Cache hits are answered directly; misses are de-duplicated by content
+    hash and fanned out over the render pool. Results keep the input order.
+    """
+    results = []
+    pending = {}  # cache key -> (filename, future)
+    for index, data in enumerate(passengers):
+        if not isinstance(data, dict):
+            results.append(({'index': index, 'success': False, 'error': 'Passenger payload must be an object'}, {}))
+            continue
+
+        barcode_data = documents.barcode_payload(data)
+        result = {
+            'index': index,
+            'success': True,
+            'mode': documents.document_mode(data),
+            'barcodeData': barcode_data
+        }
+        keys = {}
+        for kind, payload in documents.passenger_documents(data):
+            key = render_cache.key(kind, payload, documents.RENDER_OPTIONS[kind])
+            filename = render_cache.lookup(kind, key)
+            if filename is None and key not in pending:
+                filename = render_cache.filename_for(kind, key)
+                future = get_render_pool().submit(
+                    documents.render_file, kind, payload, render_cache.path_for(filename)
+                )
+                pending[key] = (filename, future)
+            keys[kind] = (key, render_cache.filename_for(kind, key))
+        results.append((result, keys))
+
+    errors = {}
+    for key, (filename, future) in pending.items():
+        try:
+            future.result()
+            render_cache.remember(key, filename, rendered=True)
+        except Exception as e:
+            errors[key] = str(e)
+
+    responses = []
+    for result, keys in results:
+        for kind, url_key in (('qr_code', 'qrImageUrl'), ('barcode', 'barcodeImageUrl')):
+            if kind not in keys:
+                continue
+            key, filename = keys[kind]
+            if key in errors:
+                result.update({'success': False, 'error': errors[key]})
+            else:
+                result[url_key] = f"/static/images/{filename}"
+        responses.append(result)
+
+    return responses
+
+def passenger_result(index, data, files):
+    """Build the response entry for one passenger from its {kind: (key, filename)} map"""
+    result = {
+        'index': index,
+        'success': True,
+        'mode': documents.document_mode(data),
+        'barcodeData': documents.barcode_payload(data)
+    }
+    for kind, url_key in (('qr_code', 'qrImageUrl'), ('barcode', 'barcodeImageUrl')):
+        key, filename = files[kind]
+        render_cache.remember(key, filename)
+        result[url_key] = f"/static/images/{filename}"
+    return result
+
+def stream_batch(passengers):
+    """Yield one result per passenger as soon as its images are ready.
+
+    Passengers whose images are all cached are answered without touching the
+    pool; the rest are rendered with at most BATCH_STREAM_WINDOW in flight,
+    so results arrive in completion order rather than input order.
+    """
+    def submit(item):
+        index, data = item
+        if not isinstance(data, dict):
+            return streaming.completed({'index': index, 'success': False, 'error': 'Passenger payload must be an object'})
+
+        files = {}
+        for kind, payload in documents.passenger_documents(data):
+            key = render_cache.key(kind, payload, documents.RENDER_OPTIONS[kind])
+            filename = render_cache.lookup(kind, key)
+            if filename is None:
+                break
+            files[kind] = (key, filename)
+        else:
+            return streaming.completed(passenger_result(index, data, files))
+
+        rendered = Future()
+
+        def on_rendered(future):
+            try:
+                rendered.set_result(passenger_result(index, data, future.result()))
+            except Exception as e:
+                rendered.set_result({'index': index, 'success': False, 'error': str(e)})
+
+        get_render_pool().submit(documents.render_passenger, data, render_cache.directory).add_done_callback(on_rendered)
+        return rendered
+
+    for future in streaming.bounded_as_completed(enumerate(passengers), submit, BATCH_STREAM_WINDOW):
+        yield future.result()
+
+@app.route('/api/generate/batch', methods=['POST'])
+def generate_batch():
     try:
         data = request.json or {}
+        passengers = data.get('passengers') if isinstance(data, dict) else data
         
-        # Determine barcode content based on mode
-        if 'bagNumber' in data:  # Baggage Tag mode
-            barcode_data = data.get('bagNumber', '0000-615742')
-        elif 'ticketNumber' in data:  # E-Ticket mode
-            barcode_data = data.get('ticketNumber', '1234567890123')
-        else:  # Boarding Pass mode (default)
-            barcode_data = data.get('pnr', 'ABC123')
-
-        # Generate barcode (using Code128 format)
-        barcode_class = barcode.get_barcode_class('code128')
-        barcode_img = barcode_class(barcode_data, writer=ImageWriter())
-        
-        # Generate unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        filename = f"barcode_{timestamp}_{unique_id}.png"
-        
-        # Construct the full file path
-        filepath = os.path.join(app.root_path, IMAGES_FOLDER, filename)
-        
-        # Save barcode to file
-        barcode_img.save(filepath)
-        
-        # Generate the URL for the image
-        image_url = f"/static/images/{filename}"
+        if not isinstance(passengers, list):
+            return jsonify({'success': False, 'error': 'Expected a list of passengers'}), 400
+        if len(passengers) > MAX_BATCH_SIZE:
+            return jsonify({
+                'success': False,
+                'error': f'Batch too large (max {MAX_BATCH_SIZE} passengers)'
+            }), 413
+
+        for passenger in passengers:
+            if isinstance(passenger, dict):
+                departure_board.record_document(passenger)
+
+        if wants_async():
+            return queue_job('batch', passengers)
+
+        # Stream one NDJSON line per finished passenger when asked to
+        if streaming.wants_ndjson(request):
+            return streaming.ndjson_response(stream_batch(passengers))
+
+        results = render_batch(passengers)
 
         return jsonify({
-            'success': True,
+            'success': all(result['success'] for result in results),
             'data': {
-                'barcodeImageUrl': image_url,
-                'filename': filename,
-                'barcodeData': barcode_data
+                'results': results,
+                'count': len(results)
             }
         })
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def batch_job(passengers):
+    results = render_batch(passengers)
+    return {'results': results, 'count': len(results)}
+
+# Asynchronous render jobs live in a local SQLite queue shared by all workers on the host
+job_queue = jobs.JobQueue(
+    os.environ.get('JOBS_DB', os.path.join(app.root_path, 'jobs.db')),
+    handlers={
+        'qr-code': lambda data: qr_code_result(data)[0],
+        'barcode': lambda data: barcode_result(data)[0],
+        'document': lambda data: document_result(data, document_format(data))[0],
+        'batch': batch_job
+    },
+    workers=int(os.environ.get('JOB_WORKERS', 2)),
+    max_pending=int(os.environ.get('MAX_PENDING_JOBS', 500))
+)
+MAX_JOB_WAIT = 30
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    try:
+        try:
+            body = request_object()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        kind = body.get('type')
+        if kind not in job_queue.handlers:
+            return jsonify({
+                'success': False,
+                'error': f'Unknown job type: {kind}',
+                'available_types': list(job_queue.handlers)
+            }), 400
+
+        data = body.get('data', {})
+        try:
+            expected = list if kind == 'batch' else dict
+            if not isinstance(data, expected):
+                raise ValueError(f"Job data must be a JSON {'array' if expected is list else 'object'}")
+            if kind == 'document':
+                # Rejected here rather than failing later in a worker
+                document_format(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        return queue_job(kind, data)
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    # ?wait=N long-polls for up to N seconds until the job has finished
+    wait = min(max(request.args.get('wait', 0, type=float), 0), MAX_JOB_WAIT)
+    job = job_queue.wait(job_id, wait) if wait else job_queue.get(job_id)
+
+    if job is None:
+        return jsonify({'success': False, 'error': f'Job {job_id} not found'}), 404
+
+    return jsonify({'success': True, 'data': job})
+
+# Weather is cached per airport and refreshed ahead of time for the airports on
+# upcoming boarding passes and e-tickets (plus the always-warm WEATHER_PREFETCH_AIRPORTS)
+weather_cache = WeatherCache(
+    ttl=int(os.environ.get('WEATHER_CACHE_TTL', 300)),
+    stale_ttl=int(os.environ.get('WEATHER_CACHE_STALE', 600)),
+    max_entries=int(os.environ.get('WEATHER_CACHE_SIZE', 1024)),
+    db_path=os.environ.get('WEATHER_CACHE_DB')
+)
+simulated_weather = SimulatedWeather(AIRPORT_DATA, weather_cache)
+departure_board = DepartureBoard()
+weather_prefetcher = WeatherPrefetcher(
+    simulated_weather.refresh,
+    refresh_many=simulated_weather.refresh_many,
+    airports=airports.PREFETCH_AIRPORTS,
+    departures=departure_board,
+    interval=int(os.environ.get('WEATHER_PREFETCH_INTERVAL', 240)),
+    horizon_hours=int(os.environ.get('WEATHER_PREFETCH_HOURS', 6))
+)
+
 @app.route('/api/weather/<airport_code>')
 def get_weather(airport_code):
     airport_code = airport_code.upper()
@@ -203,45 +489,12 @@ def get_weather(airport_code):
         return jsonify({
             'success': False,
             'error': f'Airport code {airport_code} not found',
-            'available_airports': list(AIRPORT_DATA.keys())
+            'suggestions': AIRPORT_DATA.suggest(airport_code)
         }), 404
     
     try:
-        # Get weather config for this airport
-        config = WEATHER_CONFIGS.get(airport_code, WEATHER_CONFIGS['DEL'])
-        
-        # Generate realistic temperature based on time of day
-        current_hour = datetime.now().hour
-        time_factor = abs(12 - current_hour) / 12  # 0 at noon, 1 at midnight
-        temp_variation = random.uniform(-config['variation'], config['variation'])
-        
-        # Base temperature is cooler at night, warmer during day
-        if 6 <= current_hour <= 18:  # Daytime
-            base_temp = config['base_temp'] + 2
-        else:  # Nighttime
-            base_temp = config['base_temp'] - 2
-            
-        temperature = round(base_temp + temp_variation)
-        
-        # Select weather condition
-        condition = random.choice(config['conditions'])
-        emoji = WEATHER_EMOJI.get(condition, '🌤️')
-        
-        response_data = {
-            'success': True,
-            'airport_code': airport_code,
-            'city': AIRPORT_DATA[airport_code]['city'],
-            'temperature': temperature,
-            'description': condition,
-            'main': condition,
-            'emoji': emoji,
-            'humidity': random.randint(40, 85),
-            'wind_speed': round(random.uniform(1, 15), 1),
-            'timestamp': datetime.now().isoformat(),
-            'source': 'simulated_realtime'
-        }
-        
-        return jsonify(response_data)
+        # Served from cache; the prefetcher keeps airports with upcoming departures warm
+        return jsonify(simulated_weather.get(airport_code))
         
     except Exception as e:
         return jsonify({
@@ -251,28 +504,58 @@ def get_weather(airport_code):
             'city': AIRPORT_DATA.get(airport_code, {}).get('city', 'Unknown')
         }), 500
 
-@app.route('/api/airports')
-def list_airports():
-    airports_list = []
-    for code, info in AIRPORT_DATA.items():
-        airports_list.append({
-            'code': code,
-            'city': info['city'],
-            'coordinates': {
-                'lat': info['lat'],
-                'lon': info['lon']
-            }
-        })
-    
+airport_listing.add_route(app)
+
+@app.route('/api/airports/search')
+def search_airports():
+    """Autocomplete by IATA code or city prefix"""
+    query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    results = AIRPORT_DATA.search(query, limit)
+    return jsonify({
+        'success': True,
+        'airports': results,
+        'count': len(results)
+    })
+
+@app.route('/api/airports/nearest')
+def nearest_airports():
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    if lat is None or lon is None or not -90 <= lat <= 90 or not -180 <= lon <= 180:
+        return jsonify({'success': False, 'error': 'lat and lon query parameters are required'}), 400
+    limit = min(max(request.args.get('limit', 5, type=int), 1), 50)
+    results = AIRPORT_DATA.nearest(lat, lon, limit)
     return jsonify({
         'success': True,
-        'airports': airports_list,
-        'count': len(airports_list)
+        'airports': results,
+        'count': len(results)
+    })
+
+@app.route('/api/images/stats')
+def image_stats():
+    return jsonify({
+        'success': True,
+        'data': {
+            'cache': render_cache.stats(),
+            'janitor': image_janitor.stats()
+        }
+    })
+
+@app.route('/api/weather/stats')
+def weather_stats():
+    return jsonify({
+        'success': True,
+        'data': {
+            'cache': weather_cache.stats(),
+            'prefetch': weather_prefetcher.stats()
+        }
     })
 
-# Route to serve images with CORS headers
-@app.route('/static/images/<filename>')
+# Route to serve images with CORS headers (files live in hash-prefix shard directories)
+@app.route('/static/images/<path:filename>')
 def serve_image(filename):
+    ImageJanitor.touch(safe_join(os.path.join(app.root_path, IMAGES_FOLDER), filename))
     response = send_from_directory(os.path.join(app.root_path, IMAGES_FOLDER), filename)
     response.headers.add('Access-Control-Allow-Origin', '*')
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
@@ -288,6 +571,7 @@ def serve_static(filename):
     return response
 
 if __name__ == '__main__':
+    warmup.warm_up()
     port = int(os.environ.get('PORT', 5000))
     print(f"🚀 Starting Travel Document Generator Server on port {port}")
     print("📍 Available endpoints:")
@@ -295,10 +579,16 @@ if __name__ == '__main__':
     print("   GET /api/health           - Health check")
     print("   POST /api/generate/qr-code - Generate QR code")
     print("   POST /api/generate/barcode - Generate barcode")
+    print("   POST /api/generate/document - Render a full boarding pass, e-ticket or bag tag (PNG/PDF)")
+    print("   POST /api/generate/batch  - Generate QR codes and barcodes for many passengers")
+    print("   POST /api/jobs            - Queue a render job (or add ?async=1 to a generate route)")
+    print("   GET /api/jobs/<id>        - Job status and image URLs (?wait=N to long-poll)")
     print("   GET /api/weather/<code>   - Get weather for airport")
     print("   GET /api/airports         - List all supported airports")
+    print("   GET /api/airports/search  - Airport autocomplete by code or city (?q=)")
+    print("   GET /api/airports/nearest - Closest airports to a point (?lat=&lon=)")
     print("")
-    print("📋 Supported airport codes:", list(AIRPORT_DATA.keys()))
+    print(f"📋 Supported airports: {len(AIRPORT_DATA)}")
     print("")
     print("🌐 Server will be available at: http://localhost:5000")
     
@@ -0,0 +1,319 @@
+"""Async FastAPI version of the generation and weather endpoints in app.py.
+
+Responses keep app.py's shapes ({'success': True, 'data': {...}} with
+qrImageUrl / barcodeImageUrl), so the front end can point at either
+server. QR and barcode rendering runs in a process pool through
+run_in_executor; cache lookups, weather fetches and other file access run
+in the threadpool, so the event loop only ever awaits.
+
+    uvicorn async_api:app --workers 4
+"""
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, Response
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+import airports
+import documents
+import warmup
+from airport_listing import AirportListing
+from image_janitor import ImageJanitor
+from render_cache import RenderCache
+from simulated_weather import SimulatedWeather
+from weather_cache import WeatherCache
+from weather_prefetch import DepartureBoard, WeatherPrefetcher
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_FOLDER = os.path.join(ROOT, 'static')
+IMAGES_FOLDER = os.path.join(STATIC_FOLDER, 'images')
+RESPONSE_MODES = ('url', 'data-url', 'png')
+URL_KEYS = {'qr_code': 'qrImageUrl', 'barcode': 'barcodeImageUrl'}
+
+# Same image directory and cache layout as app.py, so both servers reuse each other's renders
+render_cache = RenderCache(IMAGES_FOLDER, max_image_bytes=int(os.environ.get('INLINE_CACHE_BYTES', 32 * 1024 ** 2)))
+image_janitor = ImageJanitor(
+    IMAGES_FOLDER,
+    ttl=int(os.environ.get('IMAGE_TTL', 7 * 24 * 3600)),
+    max_bytes=int(os.environ.get('IMAGE_MAX_BYTES', 1024 ** 3)),
+    interval=int(os.environ.get('JANITOR_INTERVAL', 300))
+)
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', os.cpu_count() or 1))
+render_pool = None
+rendering = {}  # cache key -> Task rendering it, shared by concurrent identical requests
+
+AIRPORT_DATA = airports.registry
+airport_listing = AirportListing(AIRPORT_DATA, max_age=int(os.environ.get('AIRPORTS_MAX_AGE', 3600)))
+MAX_BULK_AIRPORTS = int(os.environ.get('MAX_BULK_AIRPORTS', 100))
+
+
+def get_render_pool():
+    """Return the process pool used for rendering, creating it on first use"""
+    global render_pool
+    if render_pool is None:
+        render_pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+    return render_pool
+
+
+async def run_in_render_pool(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(get_render_pool(), fn, *args)
+
+
+async def shared(key, make):
+    """Await the task for `key`, starting it with make() unless one is already running"""
+    task = rendering.get(key)
+    if task is None:
+        task = asyncio.ensure_future(make())
+        rendering[key] = task
+        task.add_done_callback(lambda _: rendering.pop(key, None))
+    # Shielded so one cancelled request does not cancel the render for everyone else
+    return await asyncio.shield(task)
+
+
+async def image_file(kind, payload):
+    """Filename of the cached image for a payload, rendering it in the pool on a miss"""
+    key = render_cache.key(kind, payload, documents.RENDER_OPTIONS[kind])
+    filename = await run_in_threadpool(render_cache.lookup, kind, key)
+    if filename is not None:
+        return filename
+
+    async def render():
+        filename = render_cache.filename_for(kind, key)
+        await run_in_render_pool(documents.render_file, kind, payload, render_cache.path_for(filename))
+        render_cache.remember(key, filename, rendered=True)
+        return filename
+
+    return await shared(key, render)
+
+
+async def image_bytes(kind, payload):
+    """PNG bytes for a payload from the in-memory cache, rendering them in the pool on a miss"""
+    key = render_cache.key(kind, payload, documents.RENDER_OPTIONS[kind])
+    data = render_cache.cached_bytes(key)
+    if data is not None:
+        return data
+
+    async def render():
+        return render_cache.remember_bytes(key, await run_in_render_pool(documents.render_png, kind, payload))
+
+    return await shared(('bytes', key), render)
+
+
+async def image_result(kind, payload, mode):
+    """(response data, png or None) for one image, as app.py's qr_code_result/barcode_result"""
+    if mode != 'url':
+        png = await image_bytes(kind, payload)
+        return {URL_KEYS[kind]: documents.data_url(png)}, png
+
+    filename = await image_file(kind, payload)
+    return {URL_KEYS[kind]: f"/static/images/{filename}", 'filename': filename}, None
+
+
+def response_mode(request, data):
+    """?response=url|data-url|png, a "responseMode" body field, or Accept: image/png"""
+    mode = request.query_params.get('response') or (data.get('responseMode') if isinstance(data, dict) else None)
+    if mode is None:
+        accept = request.headers.get('accept', '')
+        mode = 'png' if 'image/png' in accept and 'application/json' not in accept else 'url'
+    if mode not in RESPONSE_MODES:
+        raise ValueError(f"Unknown response mode {mode!r} (expected one of {', '.join(RESPONSE_MODES)})")
+    return mode
+
+
+def image_response(result, png, mode):
+    if mode == 'png':
+        return Response(png, media_type='image/png', headers={'Cache-Control': 'public, max-age=3600'})
+    return {'success': True, 'data': result}
+
+
+def error(message, status_code):
+    return JSONResponse({'success': False, 'error': message}, status_code=status_code)
+
+
+async def request_data(request):
+    """The JSON body as a dict ({} when empty); raises ValueError unless it is a JSON object"""
+    body = await request.body()
+    if not body:
+        return {}
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise ValueError('Request body must be valid JSON')
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise ValueError('Request body must be a JSON object')
+    return data
+
+
+weather_cache = WeatherCache(
+    ttl=int(os.environ.get('WEATHER_CACHE_TTL', 300)),
+    stale_ttl=int(os.environ.get('WEATHER_CACHE_STALE', 600)),
+    max_entries=int(os.environ.get('WEATHER_CACHE_SIZE', 1024)),
+    db_path=os.environ.get('WEATHER_CACHE_DB')
+)
+simulated_weather = SimulatedWeather(AIRPORT_DATA, weather_cache)
+departure_board = DepartureBoard()
+weather_prefetcher = WeatherPrefetcher(
+    simulated_weather.refresh,
+    airports=airports.PREFETCH_AIRPORTS,
+    departures=departure_board,
+    interval=int(os.environ.get('WEATHER_PREFETCH_INTERVAL', 240)),
+    horizon_hours=int(os.environ.get('WEATHER_PREFETCH_HOURS', 6)),
+    refresh_many=simulated_weather.refresh_many
+)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Warm before the render pool forks from this process, so its workers inherit the warm state
+    await run_in_threadpool(warmup.warm_up)
+    # Background threads start per worker process, after uvicorn/gunicorn has forked
+    image_janitor.start()
+    weather_prefetcher.start()
+    yield
+    if render_pool is not None:
+        render_pool.shutdown(cancel_futures=True)
+
+
+app = FastAPI(title="Travel Document Generator API", version="1.0.0", lifespan=lifespan)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+os.makedirs(IMAGES_FOLDER, exist_ok=True)
+app.mount('/static', StaticFiles(directory=STATIC_FOLDER), name='static')
+
+
+@app.get('/')
+async def index():
+    return FileResponse(os.path.join(ROOT, 'index.html'))
+
+
+@app.get('/api/health')
+async def health_check():
+    return {
+        'success': True,
+        'message': 'Travel Document Generator API is running',
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+async def generate(request, kind, payload_for):
+    try:
+        try:
+            data = await request_data(request)
+            mode = response_mode(request, data)
+        except ValueError as e:
+            return error(str(e), 400)
+
+        departure_board.record_document(data)
+        payload = payload_for(data)
+        result, png = await image_result(kind, payload, mode)
+        if kind == 'barcode':
+            result['barcodeData'] = payload
+        return image_response(result, png, mode)
+
+    except Exception as e:
+        return error(str(e), 500)
+
+
+@app.post('/api/generate/qr-code')
+async def generate_qr_code(request: Request):
+    return await generate(request, 'qr_code', documents.qr_payload)
+
+
+@app.post('/api/generate/barcode')
+async def generate_barcode(request: Request):
+    return await generate(request, 'barcode', documents.barcode_payload)
+
+
+@app.get('/api/weather/stats')
+async def weather_stats():
+    return {
+        'success': True,
+        'data': {
+            'cache': weather_cache.stats(),
+            'prefetch': weather_prefetcher.stats()
+        }
+    }
+
+
+@app.get('/api/weather/bulk')
+async def get_bulk_weather(airports: str = 'DEL,BOM'):
+    airport_codes = [code.strip().upper() for code in airports.split(',')]
+    if len(airport_codes) > MAX_BULK_AIRPORTS:
+        return error(f'Too many airports (max {MAX_BULK_AIRPORTS})', 400)
+    return await run_in_threadpool(simulated_weather.bulk, airport_codes)
+
+
+@app.get('/api/weather/{airport_code}')
+async def get_weather(airport_code: str):
+    airport_code = airport_code.upper()
+
+    if airport_code not in AIRPORT_DATA:
+        return JSONResponse({
+            'success': False,
+            'error': f'Airport code {airport_code} not found',
+            'suggestions': AIRPORT_DATA.suggest(airport_code)
+        }, status_code=404)
+
+    try:
+        return await run_in_threadpool(simulated_weather.get, airport_code)
+    except Exception:
+        return JSONResponse({
+            'success': False,
+            'error': 'Unable to fetch weather data',
+            'airport_code': airport_code,
+            'city': AIRPORT_DATA[airport_code]['city']
+        }, status_code=500)
+
+
+def accepts_encoding(header):
+    """Accept-Encoding check: listed and not refused with q=0"""
+    accepted = set()
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        if name and params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(name.strip().lower())
+    return lambda encoding: encoding in accepted
+
+
+@app.get('/api/airports')
+async def list_airports(request: Request):
+    try:
+        status, body, headers = airport_listing.negotiate(
+            request.query_params,
+            accepts_encoding(request.headers.get('accept-encoding', '')),
+            request.headers.get('if-none-match', '')
+        )
+    except ValueError as e:
+        return error(str(e), 400)
+    if status == 304:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type='application/json', headers=headers)
+
+
+@app.get('/api/airports/search')
+async def search_airports(q: str = '', limit: int = 10):
+    """Autocomplete by IATA code or city prefix"""
+    results = AIRPORT_DATA.search(q, min(max(limit, 1), 50))
+    return {'success': True, 'airports': results, 'count': len(results)}
+
+
+@app.get('/api/airports/nearest')
+async def nearest_airports(lat: float = None, lon: float = None, limit: int = 5):
+    if lat is None or lon is None or not -90 <= lat <= 90 or not -180 <= lon <= 180:
+        return error('lat and lon query parameters are required', 400)
+    results = AIRPORT_DATA.nearest(lat, lon, min(max(limit, 1), 50))
+    return {'success': True, 'airports': results, 'count': len(results)}
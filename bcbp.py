@@ -0,0 +1,197 @@
+"""IATA Bar Coded Boarding Pass (Resolution 792) encoding.
+
+Only the mandatory items of a single-leg 'M1' pass are produced, which is the
+fixed 60 character layout stored in boarding_passes.iata_bcbp_data, e.g.
+
+    M1DOE/JOHN            EABC123 JFKLHRUA 2456 196Y023A0001A100
+
+The payload only uses upper-case letters, digits, space, '-' and '/', so QR
+encoders pick alphanumeric mode and the symbol stays at a low version.
+Missing (None) values are written as blanks.
+"""
+import re
+import unicodedata
+from datetime import date as date_type, datetime
+
+# (field name, width) for the mandatory unique and repeated items, in order
+FIELDS = [
+    ('format_code', 1),
+    ('legs', 1),
+    ('passenger_name', 20),
+    ('electronic_ticket', 1),
+    ('pnr', 7),
+    ('from_airport', 3),
+    ('to_airport', 3),
+    ('carrier', 3),
+    ('flight_number', 5),
+    ('julian_date', 3),
+    ('compartment', 1),
+    ('seat', 4),
+    ('sequence', 5),
+    ('passenger_status', 1),
+    ('conditional_size', 2)
+]
+
+BCBP_LENGTH = sum(width for _, width in FIELDS)
+
+FLIGHT_PATTERN = re.compile(r'^([A-Z0-9]{2}[A-Z]?)\s*(\d{1,4})([A-Z]?)$')
+SEAT_PATTERN = re.compile(r'^(\d{1,3})([A-Z])$')
+SEQUENCE_PATTERN = re.compile(r'^(\d{1,4})([A-Z]?)$')
+# Anything else would break the '/' separator or force QR byte mode
+NAME_STRIP = re.compile(r'[^A-Z0-9 \-]')
+# The date input sends ISO dates; the others are what people type into the API by hand
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y')
+
+
+def _ascii_upper(value):
+    """Upper-case a value and drop anything that is not plain ASCII; None becomes ''"""
+    if value is None:
+        return ''
+    normalized = unicodedata.normalize('NFKD', str(value))
+    return normalized.encode('ascii', 'ignore').decode('ascii').upper().strip()
+
+
+def _fixed(value, width):
+    return _ascii_upper(value)[:width].ljust(width)
+
+
+def format_name(first_name, last_name):
+    """Return the 20 character LAST/FIRST name element; letters, digits, spaces and hyphens are kept"""
+    last = NAME_STRIP.sub('', _ascii_upper(last_name))
+    first = NAME_STRIP.sub('', _ascii_upper(first_name))
+    return _fixed(f"{last}/{first}", 20)
+
+
+def split_flight(flight):
+    """Split 'AI 2727' / 'AI0121' / 'UA2456A' into a 3 char carrier and 5 char flight number.
+
+    Anything else is kept as padded free text (two character carrier, then
+    the rest), as the generator did before flights were validated.
+    """
+    compact = _ascii_upper(flight).replace(' ', '')
+    match = FLIGHT_PATTERN.match(compact)
+    if not match:
+        return _fixed(compact[:2], 3), _fixed(compact[2:], 5)
+    carrier, number, suffix = match.groups()
+    return carrier.ljust(3), f"{int(number):04d}{suffix or ' '}"
+
+
+def parse_date(value):
+    """A date from a date object or a string in one of DATE_FORMATS, or None"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date_type):
+        return value
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def julian_date(value):
+    """Day of the year (001-366) for a date; blank when the date cannot be parsed"""
+    value = parse_date(value)
+    if value is None:
+        return '   '
+    return f"{value.timetuple().tm_yday:03d}"
+
+
+def format_seat(seat):
+    """Return the 4 character seat element, e.g. '17A' -> '017A'"""
+    match = SEAT_PATTERN.match(_ascii_upper(seat))
+    if not match:
+        return _fixed(seat, 4)
+    row, letter = match.groups()
+    return f"{int(row):03d}{letter}"
+
+
+def format_sequence(sequence):
+    """Return the 5 character check-in sequence element, e.g. '001A' -> '0001A'"""
+    match = SEQUENCE_PATTERN.match(_ascii_upper(sequence))
+    if not match:
+        return _fixed(sequence, 5)
+    number, suffix = match.groups()
+    return f"{int(number):04d}{suffix or ' '}"
+
+
+def encode(first_name, last_name, pnr, from_airport, to_airport, flight, date,
+           compartment='Y', seat='', sequence='', passenger_status='1', electronic_ticket=True):
+    """Encode the mandatory items of a single-leg boarding pass"""
+    carrier, flight_number = split_flight(flight)
+    values = {
+        'format_code': 'M',
+        'legs': '1',
+        'passenger_name': format_name(first_name, last_name),
+        'electronic_ticket': 'E' if electronic_ticket else ' ',
+        'pnr': _fixed(pnr, 7),
+        'from_airport': _fixed(from_airport, 3),
+        'to_airport': _fixed(to_airport, 3),
+        'carrier': carrier,
+        'flight_number': flight_number,
+        'julian_date': julian_date(date),
+        'compartment': _fixed(compartment, 1),
+        'seat': format_seat(seat),
+        'sequence': format_sequence(sequence),
+        'passenger_status': _fixed(passenger_status, 1),
+        'conditional_size': '00'
+    }
+    return ''.join(values[name] for name, _ in FIELDS)
+
+
+def decode(data):
+    """Parse the mandatory items of a BCBP string back into a dict of stripped fields"""
+    if len(data) < BCBP_LENGTH or data[0] != 'M':
+        raise ValueError('Not an IATA BCBP mandatory item block')
+
+    fields = {}
+    offset = 0
+    for name, width in FIELDS:
+        fields[name] = data[offset:offset + width]
+        offset += width
+
+    decoded = {name: value.strip() for name, value in fields.items()}
+    last_name, _, first_name = decoded['passenger_name'].partition('/')
+    decoded.update({
+        'last_name': last_name,
+        'first_name': first_name,
+        'electronic_ticket': fields['electronic_ticket'] == 'E',
+        'flight': f"{decoded['carrier']}{decoded['flight_number']}",
+        'conditional_size': int(fields['conditional_size'], 16)
+    })
+    return decoded
+
+
+def encode_boarding_pass(data):
+    """Encode a boarding pass form payload (firstName, lastName, pnr, ...) as BCBP"""
+    return encode(
+        first_name=data.get('firstName', 'Rahul'),
+        last_name=data.get('lastName', 'Sharma'),
+        pnr=data.get('pnr', 'ABC123'),
+        from_airport=data.get('from', 'BOM'),
+        to_airport=data.get('to', 'DEL'),
+        flight=data.get('flight', 'AI 2727'),
+        date=data.get('date', '2025-09-10'),
+        compartment=data.get('class', 'Y'),
+        seat=data.get('seat', '17A'),
+        sequence=data.get('sequence', '001A')
+    )
+
+
+def encode_e_ticket(ticket_number, first_name, last_name, flight, from_airport, to_airport, date):
+    """Compact e-ticket payload in the e_tickets.iata_data layout: ticket|NAME|flight|route|yymmdd"""
+    carrier, flight_number = split_flight(flight)
+    parsed = parse_date(date)
+    travel_date = parsed.strftime('%y%m%d') if parsed else _ascii_upper(date).replace('|', '')
+    name = format_name(first_name, last_name).strip()
+    route = f"{_fixed(from_airport, 3)}{_fixed(to_airport, 3)}"
+    return f"{_ascii_upper(ticket_number)}|{name}|{carrier.strip()}{flight_number.strip()}|{route}|{travel_date}"
+
+
+def encode_bag_tag(tag_number, first_name, last_name, flight, from_airport, to_airport):
+    """Compact baggage tag payload in the baggage_tags.barcode_data layout: tag|NAME|flight|route"""
+    carrier, flight_number = split_flight(flight)
+    name = format_name(first_name, last_name).strip()
+    route = f"{_fixed(from_airport, 3)}{_fixed(to_airport, 3)}"
+    return f"{_ascii_upper(tag_number)}|{name}|{carrier.strip()}{flight_number.strip()}|{route}"
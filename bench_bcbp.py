@@ -0,0 +1,76 @@
+"""Compare QR symbol version and render time: free-text payload vs IATA BCBP.
+
+Usage: python bench_bcbp.py [iterations]
+"""
+import sys
+import time
+from io import BytesIO
+import qrcode
+import bcbp
+
+PASSENGER = {
+    'firstName': 'Rahul',
+    'lastName': 'Sharma',
+    'flight': 'AI 2727',
+    'from': 'BOM',
+    'to': 'DEL',
+    'date': '2025-09-10',
+    'time': '13:15',
+    'seat': '17A',
+    'gate': '07',
+    'pnr': 'ABC123',
+    'boardingTime': '12:45',
+    'class': 'Y',
+    'sequence': '001A'
+}
+
+
+def free_text_payload(data):
+    """The multi-line payload app.py generated before BCBP encoding"""
+    return (
+        f"BOARDING PASS\nPassenger: {data['firstName']} {data['lastName']}\nFlight: {data['flight']}\n"
+        f"From: {data['from']}\nTo: {data['to']}\nDate: {data['date']}\nTime: {data['time']}\n"
+        f"Seat: {data['seat']}\nGate: {data['gate']}\nPNR: {data['pnr']}\n"
+        f"Boarding: {data['boardingTime']}\nClass: {data['class']}\nSeq: {data['sequence']}"
+    )
+
+
+def measure(payload, iterations):
+    qr = qrcode.QRCode(box_size=10, border=4)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    version = qr.version
+
+    png_size = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        buffered = BytesIO()
+        qrcode.make(payload, box_size=10, border=4).save(buffered)
+        png_size = buffered.tell()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'length': len(payload),
+        'version': version,
+        'modules': version * 4 + 17,
+        'png_bytes': png_size,
+        'ms_per_render': elapsed / iterations * 1000
+    }
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    payloads = {
+        'free_text': free_text_payload(PASSENGER),
+        'bcbp': bcbp.encode_boarding_pass(PASSENGER)
+    }
+
+    print(f"{'payload':<10} {'chars':>6} {'version':>8} {'modules':>8} {'png bytes':>10} {'ms/render':>10}")
+    for name, payload in payloads.items():
+        result = measure(payload, iterations)
+        print(f"{name:<10} {result['length']:>6} {result['version']:>8} {result['modules']:>8} "
+              f"{result['png_bytes']:>10} {result['ms_per_render']:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
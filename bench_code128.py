@@ -0,0 +1,52 @@
+"""Microbenchmark: native Code128 encoder vs python-barcode's ImageWriter.
+
+Usage: python bench_code128.py [iterations]
+"""
+import sys
+import time
+from io import BytesIO
+import barcode
+from barcode.writer import ImageWriter
+import code128
+
+INPUTS = {
+    'pnr': 'ABC123',
+    'ticket_number': '0161234567890',
+    'bag_tag': '0000-615742',
+    'bag_tag_iata': 'UA1234567890'
+}
+
+
+def python_barcode_png(text):
+    buffered = BytesIO()
+    barcode.get_barcode_class('code128')(text, writer=ImageWriter()).write(buffered)
+    return buffered.getvalue()
+
+
+def native_png(text):
+    return code128.render_png(text)
+
+
+def measure(render, text, iterations):
+    png = render(text)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render(text)
+    elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1000, len(png)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print(f"{'input':<14} {'symbols':>7} {'python-barcode':>16} {'native':>10} {'speedup':>8} {'bytes (pb/native)':>18}")
+    for name, text in INPUTS.items():
+        reference_ms, reference_bytes = measure(python_barcode_png, text, iterations)
+        native_ms, native_bytes = measure(native_png, text, iterations)
+        symbols = len(code128.encode(text))
+        print(f"{name:<14} {symbols:>7} {reference_ms:>13.3f} ms {native_ms:>7.3f} ms "
+              f"{reference_ms / native_ms:>7.1f}x {reference_bytes:>8}/{native_bytes:<9}")
+
+
+if __name__ == '__main__':
+    main()
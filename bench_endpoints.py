@@ -0,0 +1,255 @@
+"""Latency/throughput benchmark for the generation, weather and airport endpoints.
+
+Requests go through Flask's test client (no network), from a pool of
+client threads per concurrency level. Each case reports mean/p50/p95/p99
+latency and requests per second, and the whole run is written as JSON so
+two commits can be compared:
+
+Usage: python bench_endpoints.py [-n REQUESTS] [-c 1,4,16] [-k FILTER] [-o results.json]
+       python bench_endpoints.py -o new.json --compare old.json [--threshold 0.15]
+
+With --compare, cases whose p50 latency or throughput got worse by more
+than the threshold are listed and the exit status is 1.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Keep the job queue out of the repo; set before the apps are imported
+os.environ.setdefault('JOBS_DB', os.path.join(tempfile.gettempdir(), 'bench_endpoints_jobs.db'))
+
+import app as generator_app
+import weather_ as weather_app
+
+PASSENGER = {
+    'firstName': 'Rahul',
+    'lastName': 'Sharma',
+    'flight': 'AI 2727',
+    'from': 'BOM',
+    'to': 'DEL',
+    'date': '2025-09-10',
+    'time': '13:15',
+    'seat': '17A',
+    'gate': '07',
+    'pnr': 'ABC123'
+}
+E_TICKET = {
+    'etFirstName': 'Rahul',
+    'etLastName': 'Sharma',
+    'ticketNumber': '0981234567890',
+    'etFlight': 'AI 2727',
+    'etFrom': 'BOM',
+    'etTo': 'DEL',
+    'etDate': '2025-09-10'
+}
+BAG_TAG = {
+    'bagFirstName': 'Priya',
+    'bagLastName': 'Patel',
+    'bagNumber': '0098-615742',
+    'bagFlight': 'AI0121',
+    'bagFrom': 'BOM',
+    'bagTo': 'DEL'
+}
+# Payload "sizes" are the three document types: their QR contents differ in length and layout
+DOCUMENTS = {'boarding_pass': PASSENGER, 'e_ticket': E_TICKET, 'baggage_tag': BAG_TAG}
+SEQUENCE = itertools.count(1)
+
+
+def unique(data):
+    """A copy of a payload that renders differently from every earlier one in the run (a cache miss)"""
+    data = dict(data)
+    number = next(SEQUENCE)
+    for key in ('pnr', 'ticketNumber', 'bagNumber'):
+        if key in data:
+            data[key] = f"{data[key][:-6]}{number % 1000000:06d}"
+    return data
+
+
+def generation_cases():
+    cases = []
+    for mode in ('url', 'data-url', 'png'):
+        path = '/api/generate/qr-code' if mode == 'url' else f'/api/generate/qr-code?response={mode}'
+        for size, data in DOCUMENTS.items():
+            cases.append((f'qr-code/{mode}/{size}/cached', generator_app.app,
+                          lambda client, index, path=path, data=data: client.post(path, json=data)))
+            cases.append((f'qr-code/{mode}/{size}/unique', generator_app.app,
+                          lambda client, index, path=path, data=data: client.post(path, json=unique(data))))
+    for size, data in DOCUMENTS.items():
+        cases.append((f'barcode/url/{size}/cached', generator_app.app,
+                      lambda client, index, data=data: client.post('/api/generate/barcode', json=data)))
+        cases.append((f'barcode/url/{size}/unique', generator_app.app,
+                      lambda client, index, data=data: client.post('/api/generate/barcode', json=unique(data))))
+    return cases
+
+
+def weather_cases():
+    codes = list(weather_app.AIRPORT_DATA.keys())
+    cases = [
+        ('weather/single/cached', weather_app.app,
+         lambda client, index: client.get('/api/weather/DEL')),
+        ('weather/single/rotating', weather_app.app,
+         lambda client, index: client.get(f'/api/weather/{codes[index % len(codes)]}'))
+    ]
+    for count in (1, 10, len(codes)):
+        airports = ','.join(codes[:count])
+        cases.append((f'weather/bulk/{count}', weather_app.app,
+                      lambda client, index, airports=airports: client.get(f'/api/weather/bulk?airports={airports}')))
+    return cases
+
+
+def airport_cases():
+    etag = generator_app.app.test_client().get('/api/airports').headers['ETag']
+    return [
+        ('airports/default/identity', generator_app.app, lambda client, index: client.get('/api/airports')),
+        ('airports/default/gzip', generator_app.app,
+         lambda client, index: client.get('/api/airports', headers={'Accept-Encoding': 'gzip'})),
+        ('airports/all-fields', generator_app.app,
+         lambda client, index: client.get('/api/airports?fields=code,name,city,country,coordinates')),
+        ('airports/page-5', generator_app.app, lambda client, index: client.get('/api/airports?limit=5')),
+        ('airports/not-modified', generator_app.app,
+         lambda client, index: client.get('/api/airports', headers={'If-None-Match': etag}))
+    ]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_case(flask_app, call, requests, concurrency):
+    """Send `requests` calls from `concurrency` threads; returns latency stats in ms"""
+    local = threading.local()
+    counter = iter(range(requests))
+    counter_lock = threading.Lock()
+    latencies = []
+    errors = []
+
+    def worker():
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = flask_app.test_client()
+        while True:
+            with counter_lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            started = time.perf_counter()
+            response = call(client, index)
+            elapsed = time.perf_counter() - started
+            latencies.append(elapsed * 1000)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'errors': len(errors),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'max_ms': round(latencies[-1], 3),
+        'throughput_rps': round(requests / wall, 1)
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print per-case changes against a baseline run; returns the regressed case keys"""
+    previous = {(result['case'], result['concurrency']): result for result in baseline['results']}
+    regressions = []
+    print(f"\nvs {baseline['meta'].get('commit') or 'baseline'} (threshold {threshold:.0%})")
+    print(f"{'case':<40} {'conc':>4} {'p50 ms':>16} {'change':>8} {'req/s':>18} {'change':>8}")
+    for result in results:
+        key = (result['case'], result['concurrency'])
+        if key not in previous:
+            continue
+        old = previous[key]
+        latency_change = result['p50_ms'] / old['p50_ms'] - 1 if old['p50_ms'] else 0.0
+        throughput_change = result['throughput_rps'] / old['throughput_rps'] - 1 if old['throughput_rps'] else 0.0
+        regressed = latency_change > threshold or throughput_change < -threshold
+        if regressed:
+            regressions.append(key)
+        print(f"{result['case']:<40} {result['concurrency']:>4} {old['p50_ms']:>7.3f}->{result['p50_ms']:<8.3f} "
+              f"{latency_change:>+7.0%} {old['throughput_rps']:>8.1f}->{result['throughput_rps']:<9.1f} "
+              f"{throughput_change:>+7.0%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--requests', type=int, default=200, help='requests per case and concurrency level')
+    parser.add_argument('-c', '--concurrency', default='1,4,16', help='comma-separated client thread counts')
+    parser.add_argument('-k', '--filter', default='', help='only run cases whose name contains this')
+    parser.add_argument('-o', '--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15, help='relative change counted as a regression')
+    args = parser.parse_args()
+
+    # Renders go to a scratch directory so "unique" cases do not fill static/images
+    scratch = tempfile.mkdtemp(prefix='bench_endpoints_')
+    generator_app.render_cache.directory = scratch
+
+    levels = [int(level) for level in args.concurrency.split(',')]
+    cases = [case for case in generation_cases() + weather_cases() + airport_cases() if args.filter in case[0]]
+
+    results = []
+    print(f"{'case':<40} {'conc':>4} {'mean ms':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>9} {'errors':>6}")
+    for name, flask_app, call in cases:
+        call(flask_app.test_client(), 0)  # warm imports, caches and the first render outside the timing
+        for concurrency in levels:
+            stats = run_case(flask_app, call, args.requests, concurrency)
+            results.append(dict(case=name, concurrency=concurrency, **stats))
+            print(f"{name:<40} {concurrency:>4} {stats['mean_ms']:>9.3f} {stats['p50_ms']:>8.3f} "
+                  f"{stats['p95_ms']:>8.3f} {stats['p99_ms']:>8.3f} {stats['throughput_rps']:>9.1f} {stats['errors']:>6}")
+
+    run = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'requests_per_case': args.requests,
+            'concurrency': levels
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(run, fp, indent=2)
+        print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as fp:
+            regressions = compare(results, json.load(fp), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
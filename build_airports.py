@@ -0,0 +1,29 @@
+"""Build the packed airport registry (airports.bin) from a CSV.
+
+The bundled airports.csv only covers the airports this app has used so
+far. For the full IATA list, download an OurAirports export
+(https://ourairports.com/data/airports.csv) and build from that:
+
+Usage: python build_airports.py [source.csv] [airports.bin]
+"""
+import sys
+import time
+import airports
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else airports.AIRPORTS_CSV
+    target = sys.argv[2] if len(sys.argv) > 2 else airports.AIRPORTS_FILE
+
+    start = time.perf_counter()
+    data = airports.pack(airports.read_csv(source))
+    with open(target, 'wb') as fp:
+        fp.write(data)
+
+    registry = airports.AirportRegistry(data)
+    print(f"Packed {len(registry)} airports from {source} into {target} "
+          f"({len(data)} bytes, {(time.perf_counter() - start) * 1000:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Parse and validate bulk record uploads for the FastAPI apps.
+
+A body can be a JSON array, NDJSON (one object per line) or CSV with a
+header row; the format comes from the Content-Type, or from ?format= when
+a client cannot set one. Rows are validated with a Pydantic model a batch
+at a time and bad rows are reported by index instead of failing the upload.
+"""
+import csv
+import io
+import json
+from pydantic import TypeAdapter, ValidationError
+
+FORMATS = {
+    'application/json': 'json',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'text/csv': 'csv'
+}
+
+
+def detect_format(content_type, override=None):
+    """'json', 'ndjson' or 'csv'; raises ValueError for anything else"""
+    if override:
+        if override not in FORMATS.values():
+            raise ValueError(f"Unknown format: {override} (available: json, ndjson, csv)")
+        return override
+    mimetype = (content_type or 'application/json').split(';')[0].strip().lower()
+    if mimetype not in FORMATS:
+        raise ValueError(f"Unsupported content type: {mimetype} (send application/json, application/x-ndjson or text/csv)")
+    return FORMATS[mimetype]
+
+
+def parse_records(body, body_format):
+    """Split a body into records: a list of dicts, or of Exceptions for rows that could not be parsed.
+
+    Raises ValueError when the body as a whole is unusable (not UTF-8, not
+    a JSON array, CSV without a header).
+    """
+    try:
+        text = body.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise ValueError('Body must be UTF-8')
+
+    if body_format == 'json':
+        try:
+            records = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Invalid JSON: {e}')
+        if not isinstance(records, list):
+            raise ValueError('Expected a JSON array of records')
+        return records
+
+    if body_format == 'ndjson':
+        records = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                records.append(ValueError(f'Invalid JSON: {e}'))
+        return records
+
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        raise ValueError('CSV upload needs a header row')
+    # Empty cells count as missing so optional fields keep their defaults
+    return [{key: value for key, value in row.items() if key and value not in (None, '')} for row in reader]
+
+
+def _error_message(errors):
+    return '; '.join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'record'}: {error['msg']}" for error in errors
+    )
+
+
+def validate_batches(model, records, batch_size=1000):
+    """Validate records with `model`, batch_size at a time.
+
+    Returns (valid, errors): valid is a list of (index, model instance) in
+    input order, errors a list of {'index', 'error'} for the rows that
+    failed. A clean batch is validated in one call; a batch with failures
+    is split so the good rows in it still go through.
+    """
+    adapter = TypeAdapter(list[model])
+    valid = []
+    errors = []
+    for start in range(0, len(records), batch_size):
+        batch = []
+        for index, record in enumerate(records[start:start + batch_size], start):
+            if isinstance(record, Exception):
+                errors.append({'index': index, 'error': str(record)})
+            else:
+                batch.append((index, record))
+
+        try:
+            instances = adapter.validate_python([record for _, record in batch])
+            valid.extend((index, instance) for (index, _), instance in zip(batch, instances))
+            continue
+        except ValidationError as e:
+            failures = {}
+            for error in e.errors():
+                position, loc = error['loc'][0], error['loc'][1:]
+                failures.setdefault(position, []).append(dict(error, loc=loc))
+
+        for position, (index, record) in enumerate(batch):
+            if position in failures:
+                errors.append({'index': index, 'error': _error_message(failures[position])})
+            else:
+                valid.append((index, model.model_validate(record)))
+
+    errors.sort(key=lambda error: error['index'])
+    return valid, errors
@@ -0,0 +1,120 @@
+"""Native Code128 encoder with code set optimization and NumPy rasterization.
+
+Symbol patterns are expanded once at import into a (106, 11) module table, so
+rendering a barcode is a table lookup, one concatenate and one packbits for
+the whole bar row instead of drawing bar by bar.
+"""
+import numpy as np
+import matrix_image
+
+# Bar/space widths for symbol values 0-105 (bar first)
+WIDTHS = [
+    '212222', '222122', '222221', '121223', '121322', '131222', '122213', '122312', '132212', '221213',
+    '221312', '231212', '112232', '122132', '122231', '113222', '123122', '123221', '223211', '221132',
+    '221231', '213212', '223112', '312131', '311222', '321122', '321221', '312212', '322112', '322211',
+    '212123', '212321', '232121', '111323', '131123', '131321', '112313', '132113', '132311', '211313',
+    '231113', '231311', '112133', '112331', '132131', '113123', '113321', '133121', '313121', '211331',
+    '231131', '213113', '213311', '213131', '311123', '311321', '331121', '312113', '312311', '332111',
+    '314111', '221411', '431111', '111224', '111422', '121124', '121421', '141122', '141221', '112214',
+    '112412', '122114', '122411', '142112', '142211', '241211', '221114', '413111', '241112', '134111',
+    '111242', '121142', '121241', '114212', '124112', '124211', '411212', '421112', '421211', '212141',
+    '214121', '412121', '111143', '111341', '131141', '114113', '114311', '411113', '411311', '113141',
+    '114131', '311141', '411131', '211412', '211214', '211232'
+]
+STOP_WIDTHS = '2331112'
+
+START = {'A': 103, 'B': 104, 'C': 105}
+SWITCH = {'A': 101, 'B': 100, 'C': 99}
+
+QUIET_ZONE = 10  # modules of white space on each side
+
+
+def _modules(widths):
+    modules = []
+    for index, width in enumerate(widths):
+        modules.extend([index % 2 == 0] * int(width))
+    return modules
+
+
+MODULE_TABLE = np.array([_modules(widths) for widths in WIDTHS], dtype=np.uint8)
+STOP_MODULES = np.array(_modules(STOP_WIDTHS), dtype=np.uint8)
+
+
+def _value(code_set, text, pos):
+    """Symbol value for the character(s) at pos in a code set, or None if not encodable"""
+    if code_set == 'C':
+        pair = text[pos:pos + 2]
+        if len(pair) == 2 and pair.isdigit() and pair.isascii():
+            return int(pair)
+        return None
+
+    code = ord(text[pos])
+    if code_set == 'A':
+        if 32 <= code <= 95:
+            return code - 32
+        if code < 32:
+            return code + 64
+        return None
+    if 32 <= code <= 127:
+        return code - 32
+    return None
+
+
+def encode(text):
+    """Return the symbol values (start, data, checksum) for text using the fewest symbols.
+
+    A small dynamic program over (position, code set) decides where to switch
+    between sets A, B and C, so digit runs such as ticket numbers are packed
+    two per symbol in set C.
+    """
+    if not text:
+        raise ValueError('Code128 data must not be empty')
+
+    length = len(text)
+    # best[pos][code_set] = (symbols needed for text[pos:] while in code_set, next step)
+    best = [dict.fromkeys('ABC', (0, None)) for _ in range(length + 1)]
+    for pos in range(length - 1, -1, -1):
+        encoded = {}
+        for code_set in 'ABC':
+            value = _value(code_set, text, pos)
+            if value is not None:
+                next_pos = pos + (2 if code_set == 'C' else 1)
+                encoded[code_set] = (best[next_pos][code_set][0] + 1, (value, next_pos, code_set))
+        if not encoded:
+            raise ValueError(f"Cannot encode {text[pos]!r} in Code128")
+        for code_set in 'ABC':
+            options = [encoded[code_set]] if code_set in encoded else []
+            options.extend(
+                (cost + 1, (SWITCH[other], pos, other))
+                for other, (cost, _) in encoded.items() if other != code_set
+            )
+            best[pos][code_set] = min(options, key=lambda option: option[0])
+
+    # The start code selects the first set, so begin in one that can encode text[0]
+    start_set = min(
+        (code_set for code_set in 'ABC' if _value(code_set, text, 0) is not None),
+        key=lambda code_set: best[0][code_set][0]
+    )
+
+    values = [START[start_set]]
+    pos, code_set = 0, start_set
+    while pos < length:
+        value, pos, code_set = best[pos][code_set][1]
+        values.append(value)
+
+    checksum = (values[0] + sum(index * value for index, value in enumerate(values[1:], start=1))) % 103
+    return values + [checksum]
+
+
+def modules(text, quiet_zone=QUIET_ZONE):
+    """Return the bar row for text as a uint8 array (1 = bar), quiet zones included"""
+    values = encode(text)
+    quiet = np.zeros(quiet_zone, dtype=np.uint8)
+    return np.concatenate([quiet, MODULE_TABLE[values].ravel(), STOP_MODULES, quiet])
+
+
+def render_png(text, module_width=2, height=100, quiet_zone=QUIET_ZONE):
+    """Render text as a 1-bit Code128 PNG and return the bytes"""
+    row = np.repeat(modules(text, quiet_zone), module_width)
+    packed = np.packbits(row).tobytes()
+    return matrix_image.encode_png([packed], len(row), row_repeat=height)
@@ -0,0 +1,228 @@
+"""Server-side layout of complete boarding passes, e-tickets and baggage tags.
+
+Everything that is the same on every document (background, header band,
+airline name, logo, field labels, dividers) is drawn once per document type
+at import time. A request copies that template layer and only draws the
+passenger's values, QR code and barcode on top, then encodes PNG or PDF.
+"""
+import os
+from io import BytesIO
+from PIL import Image, ImageDraw, ImageFont
+import code128
+import documents
+import matrix_image
+
+AIRLINE_NAME = os.environ.get('AIRLINE_NAME', '22 NORTH')
+LOGO_PATH = os.environ.get('COMPOSER_LOGO')  # optional PNG pasted into every header
+FONT_PATH = os.environ.get('COMPOSER_FONT', 'DejaVuSans.ttf')
+BOLD_FONT_PATH = os.environ.get('COMPOSER_BOLD_FONT', 'DejaVuSans-Bold.ttf')
+DPI = 150
+
+HEADER_COLOR = (26, 35, 126)
+LABEL_COLOR = (110, 110, 110)
+TEXT_COLOR = (20, 20, 20)
+HEADER_HEIGHT = 80
+
+FORMATS = {
+    'png': 'image/png',
+    'pdf': 'application/pdf'
+}
+
+
+def _load_font(path, size):
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+
+# Fonts are loaded once; truetype() reads and parses the font file on every call
+FONTS = {
+    'title': _load_font(BOLD_FONT_PATH, 30),
+    'label': _load_font(FONT_PATH, 15),
+    'value': _load_font(BOLD_FONT_PATH, 26),
+    'large': _load_font(BOLD_FONT_PATH, 64),
+    'small': _load_font(FONT_PATH, 18)
+}
+
+# (label, field, x, y, font) per document type; fields come from document_fields()
+LAYOUTS = {
+    'boarding_pass': {
+        'size': (1200, 480),
+        'title': 'BOARDING PASS',
+        'divider': 860,
+        'fields': [
+            ('PASSENGER', 'passenger', 40, 110, 'value'),
+            ('FROM', 'from', 40, 190, 'large'),
+            ('TO', 'to', 320, 190, 'large'),
+            ('FLIGHT', 'flight', 600, 110, 'value'),
+            ('DATE', 'date', 40, 300, 'value'),
+            ('DEPARTS', 'time', 230, 300, 'value'),
+            ('BOARDING', 'boardingTime', 380, 300, 'value'),
+            ('GATE', 'gate', 560, 300, 'value'),
+            ('SEAT', 'seat', 680, 300, 'value'),
+            ('CLASS', 'class', 600, 190, 'value'),
+            ('SEQ', 'sequence', 720, 190, 'value'),
+            ('PNR', 'pnr', 890, 400, 'value')
+        ],
+        'qr': (890, 100, 280),
+        'barcode': (40, 380, 780, 80)
+    },
+    'e_ticket': {
+        'size': (1200, 560),
+        'title': 'ELECTRONIC TICKET',
+        'divider': None,
+        'fields': [
+            ('PASSENGER', 'passenger', 40, 110, 'value'),
+            ('TICKET NUMBER', 'ticketNumber', 40, 190, 'value'),
+            ('BOOKING REF', 'pnr', 420, 190, 'value'),
+            ('FROM', 'from', 40, 270, 'large'),
+            ('TO', 'to', 320, 270, 'large'),
+            ('FLIGHT', 'flight', 600, 110, 'value'),
+            ('DEPARTURE', 'departure', 600, 270, 'value'),
+            ('ARRIVAL', 'arrival', 600, 350, 'value')
+        ],
+        'qr': (900, 110, 260),
+        'barcode': (40, 440, 800, 90)
+    },
+    'baggage_tag': {
+        'size': (480, 1100),
+        'title': 'BAGGAGE TAG',
+        'divider': None,
+        'fields': [
+            ('TO', 'to', 40, 110, 'large'),
+            ('FROM', 'from', 40, 220, 'value'),
+            ('FLIGHT', 'flight', 240, 220, 'value'),
+            ('PASSENGER', 'passenger', 40, 300, 'value'),
+            ('BOOKING REF', 'pnr', 40, 380, 'value'),
+            ('WEIGHT', 'weight', 240, 380, 'value'),
+            ('TAG NUMBER', 'bagNumber', 40, 460, 'value')
+        ],
+        'qr': (100, 540, 280),
+        'barcode': (40, 860, 400, 200)
+    }
+}
+
+
+def _build_template(layout):
+    """Rasterize the static layer of a document type"""
+    width, height = layout['size']
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+
+    draw.rectangle([0, 0, width, HEADER_HEIGHT], fill=HEADER_COLOR)
+    draw.text((40, HEADER_HEIGHT // 2), AIRLINE_NAME, font=FONTS['title'], fill='white', anchor='lm')
+    draw.text((width - 40, HEADER_HEIGHT // 2), layout['title'], font=FONTS['small'], fill='white', anchor='rm')
+    draw.rectangle([0, 0, width - 1, height - 1], outline=LABEL_COLOR, width=2)
+
+    if LOGO_PATH and os.path.exists(LOGO_PATH):
+        with Image.open(LOGO_PATH) as logo:
+            logo = logo.convert('RGBA')
+            logo.thumbnail((HEADER_HEIGHT * 3, HEADER_HEIGHT - 20))
+            position = ((width - logo.width) // 2, (HEADER_HEIGHT - logo.height) // 2)
+            image.paste(logo, position, logo)
+
+    if layout['divider']:
+        x = layout['divider']
+        for y in range(HEADER_HEIGHT + 10, height - 10, 16):
+            draw.line([x, y, x, y + 8], fill=LABEL_COLOR, width=2)
+
+    for label, _, x, y, _ in layout['fields']:
+        draw.text((x, y - 22), label, font=FONTS['label'], fill=LABEL_COLOR)
+    return image
+
+
+TEMPLATES = {mode: _build_template(layout) for mode, layout in LAYOUTS.items()}
+
+
+def document_fields(data):
+    """Return the printable values for a request payload, with the same defaults as the forms"""
+    mode = documents.document_mode(data)
+
+    if mode == 'e_ticket':
+        return {
+            'passenger': f"{data.get('etLastName', 'Sharma')}/{data.get('etFirstName', 'Rahul')}",
+            'ticketNumber': data.get('ticketNumber', '1234567890123'),
+            'pnr': data.get('pnrEt', data.get('pnr', '')),
+            'flight': data.get('etFlight', 'AI 2727'),
+            'from': data.get('etFrom', 'BOM'),
+            'to': data.get('etTo', 'DEL'),
+            'departure': f"{data.get('etDate', '2025-09-10')} {data.get('etTime', '')}".strip(),
+            'arrival': f"{data.get('etArrivalDate', '')} {data.get('etArrivalTime', '')}".strip()
+        }
+
+    if mode == 'baggage_tag':
+        weight = data.get('bagWeight')
+        return {
+            'passenger': f"{data.get('bagLastName', 'Patel')}/{data.get('bagFirstName', 'Priya')}",
+            'pnr': data.get('bagPnr', ''),
+            'flight': data.get('bagFlight', 'AI0121'),
+            'from': data.get('bagFrom', 'BOM'),
+            'to': data.get('bagTo', 'DEL'),
+            'weight': f"{weight} KG" if weight else '',
+            'bagNumber': data.get('bagNumber', '0000-615742')
+        }
+
+    return {
+        'passenger': f"{data.get('lastName', 'Sharma')}/{data.get('firstName', 'Rahul')}",
+        'from': data.get('from', 'BOM'),
+        'to': data.get('to', 'DEL'),
+        'flight': data.get('flight', 'AI 2727'),
+        'date': data.get('date', '2025-09-10'),
+        'time': data.get('time', ''),
+        'boardingTime': data.get('boardingTime', ''),
+        'gate': data.get('gate', ''),
+        'seat': data.get('seat', '17A'),
+        'class': data.get('class', 'Y'),
+        'sequence': data.get('sequence', '001A'),
+        'pnr': data.get('pnr', 'ABC123')
+    }
+
+
+def _paste_centered(image, png, box):
+    x, y, width, height = box
+    with Image.open(BytesIO(png)) as code:
+        code = code.convert('L')
+        image.paste(code, (x + (width - code.width) // 2, y + (height - code.height) // 2))
+
+
+def _qr_png(payload, size):
+    """QR code at the largest whole number of pixels per module that fits size"""
+    matrix = matrix_image.qr_matrix(payload, border=documents.QR_OPTIONS['border'])
+    return matrix_image.to_png(matrix, scale=max(1, size // len(matrix)))
+
+
+def _barcode_png(payload, width, height):
+    """Barcode with whole-pixel modules, so bar widths stay exact for scanners"""
+    module_width = max(1, width // len(code128.modules(payload)))
+    return code128.render_png(payload, module_width=module_width, height=height)
+
+
+def compose(data):
+    """Lay out the full document for a request payload and return it as a PIL image"""
+    mode = documents.document_mode(data)
+    layout = LAYOUTS[mode]
+    image = TEMPLATES[mode].copy()
+    draw = ImageDraw.Draw(image)
+
+    values = document_fields(data)
+    for _, field, x, y, font in layout['fields']:
+        draw.text((x, y), str(values.get(field, '')).upper(), font=FONTS[font], fill=TEXT_COLOR)
+
+    x, y, size = layout['qr']
+    _paste_centered(image, _qr_png(documents.qr_payload(data), size), (x, y, size, size))
+
+    _, _, width, height = layout['barcode']
+    _paste_centered(image, _barcode_png(str(documents.barcode_payload(data)), width, height), layout['barcode'])
+    return image
+
+
+def render_document(data, fp, image_format='png'):
+    """Write the composed document for data to a binary file object as PNG or PDF"""
+    if image_format not in FORMATS:
+        raise ValueError(f"Unsupported document format {image_format!r} (expected png or pdf)")
+    image = compose(data)
+    if image_format == 'pdf':
+        image.save(fp, format='PDF', resolution=DPI)
+    else:
+        image.save(fp, format='PNG', optimize=False, dpi=(DPI, DPI))
@@ -1,11 +1,16 @@
 from flask import Flask, render_template, request, jsonify, send_from_directory
 from flask_cors import CORS
-import qrcode
-import barcode
-from barcode.writer import ImageWriter
+from werkzeug.security import safe_join
 import os
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
 import uuid
+import bcbp
+from image_janitor import ImageJanitor
+import code128
+import matrix_image
+import streaming
+import warmup
 
 app = Flask(__name__)
 CORS(app)
@@ -19,6 +24,22 @@ BASE_URL = '/'  # Use a relative base URL
 # This will create the 'images' folder in the same directory as this script.
 os.makedirs(os.path.join(app.root_path, IMAGES_FOLDER), exist_ok=True)
 
+# Old images are evicted by TTL and disk quota in the background
+image_janitor = ImageJanitor(
+    os.path.join(app.root_path, IMAGES_FOLDER),
+    ttl=int(os.environ.get('IMAGE_TTL', 7 * 24 * 3600)),
+    max_bytes=int(os.environ.get('IMAGE_MAX_BYTES', 1024 ** 3))
+)
+
+# A JSON list of passengers is streamed back as NDJSON, rendered on a process pool
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', os.cpu_count() or 1))
+STREAM_WINDOW = int(os.environ.get('STREAM_WINDOW', RENDER_WORKERS * 2))
+render_pool = None
+
+@app.before_request
+def start_image_janitor():
+    image_janitor.start()
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -30,125 +51,176 @@ def health_check():
         'message': 'Travel Document Generator API is running'
     })
 
-@app.route('/api/generate/qr-code', methods=['POST'])
-def generate_qr_code():
+def qr_code_document(data):
+    """Generate the QR code for one passenger and return the response data"""
+    first_name = data.get('firstName', 'John')
+    last_name = data.get('lastName', 'Doe')
+    flight = data.get('flight', 'PH 0121')
+    from_airport = data.get('from', 'BOM')
+    to_airport = data.get('to', 'DEL')
+    date = data.get('date', '2025-09-10')
+    time = data.get('time', '13:15')
+    seat = data.get('seat', '14A')
+    gate = data.get('gate', 'B12')
+    pnr = data.get('pnr', 'ABC123')
+
+    # Encode the IATA BCBP mandatory items instead of free text
+    qr_data = bcbp.encode(
+        first_name, last_name, pnr, from_airport, to_airport, flight, date,
+        compartment=data.get('class', 'Y'), seat=seat, sequence=data.get('sequence', '001A')
+    )
+
+    # Generate QR code as a 1-bit PNG straight from the module matrix
+    qr_png = matrix_image.to_png(matrix_image.qr_matrix(qr_data))
+    
+    # Generate unique filename
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    unique_id = str(uuid.uuid4())[:8]
+    filename = f"{ImageJanitor.shard(unique_id)}/qr_code_{timestamp}_{unique_id}.png"
+    
+    # Construct the full file path using the application's root path
+    filepath = os.path.join(app.root_path, IMAGES_FOLDER, filename)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    
+    # Save QR code to file
+    with open(filepath, 'wb') as fp:
+        fp.write(qr_png)
+    
+    # Generate the full URL for the generated image
+    image_url = f"{BASE_URL}{IMAGES_FOLDER}/{filename}"
+
+    return {
+        'passengerName': f"{first_name} {last_name}".upper(),
+        'flight': flight,
+        'fromAirport': from_airport,
+        'toAirport': to_airport,
+        'date': date,
+        'time': time,
+        'seat': seat,
+        'gate': gate,
+        'pnr': pnr,
+        'qrImageUrl': image_url,
+        'filename': filename
+    }
+
+def barcode_document(data):
+    """Generate the barcode for one passenger and return the response data"""
+    first_name = data.get('firstName', 'John')
+    last_name = data.get('lastName', 'Doe')
+    flight = data.get('flight', 'PH 0121')
+    from_airport = data.get('from', 'BOM')
+    to_airport = data.get('to', 'DEL')
+    date = data.get('date', '2025-09-10')
+    time = data.get('time', '13:15')
+    seat = data.get('seat', '14A')
+    gate = data.get('gate', 'B12')
+    pnr = data.get('pnr', 'ABC123')
+
+    # Create barcode data (using PNR as barcode content)
+    barcode_data = pnr
+    
+    # Generate barcode (using Code128 format) with the native encoder
+    barcode_png = code128.render_png(barcode_data)
+    
+    # Generate unique filename
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    unique_id = str(uuid.uuid4())[:8]
+    filename = f"{ImageJanitor.shard(unique_id)}/barcode_{timestamp}_{unique_id}.png"
+    
+    # Construct the full file path using the application's root path
+    filepath = os.path.join(app.root_path, IMAGES_FOLDER, filename)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    
+    # Save barcode to file
+    with open(filepath, 'wb') as fp:
+        fp.write(barcode_png)
+    
+    # Generate the full URL for the generated image
+    image_url = f"{BASE_URL}{IMAGES_FOLDER}/{filename}"
+
+    return {
+        'passengerName': f"{first_name} {last_name}".upper(),
+        'flight': flight,
+        'fromAirport': from_airport,
+        'toAirport': to_airport,
+        'date': date,
+        'time': time,
+        'seat': seat,
+        'gate': gate,
+        'pnr': pnr,
+        'barcodeImageUrl': image_url,
+        'filename': filename
+    }
+
+def get_render_pool():
+    """Return the process pool used for streamed renders, creating it on first use"""
+    global render_pool
+    if render_pool is None:
+        render_pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+    return render_pool
+
+def stream_documents(passengers, render):
+    """Stream one NDJSON line per passenger as soon as its image has been written"""
+    pool = get_render_pool()
+
+    def submit(item):
+        index, data = item
+        if not isinstance(data, dict):
+            return streaming.completed({'index': index, 'success': False, 'error': 'Passenger payload must be an object'})
+
+        rendered = Future()
+
+        def on_rendered(future):
+            try:
+                rendered.set_result({'index': index, 'success': True, 'data': future.result()})
+            except Exception as e:
+                rendered.set_result({'index': index, 'success': False, 'error': str(e)})
+
+        pool.submit(render, data).add_done_callback(on_rendered)
+        return rendered
+
+    results = streaming.bounded_as_completed(enumerate(passengers), submit, STREAM_WINDOW)
+    return streaming.ndjson_response(future.result() for future in results)
+
+def generate_documents(render):
+    """Handle a generate request: a single passenger object, or a list streamed as NDJSON"""
     try:
         data = request.json or {}
-        first_name = data.get('firstName', 'John')
-        last_name = data.get('lastName', 'Doe')
-        flight = data.get('flight', 'PH 0121')
-        from_airport = data.get('from', 'BOM')
-        to_airport = data.get('to', 'DEL')
-        date = data.get('date', '2025-09-10')
-        time = data.get('time', '13:15')
-        seat = data.get('seat', '14A')
-        gate = data.get('gate', 'B12')
-        pnr = data.get('pnr', 'ABC123')
-
-        qr_data = f"BOARDING PASS\nPassenger: {first_name} {last_name}\nFlight: {flight}\nFrom: {from_airport}\nTo: {to_airport}\nDate: {date}\nTime: {time}\nSeat: {seat}\nGate: {gate}\nPNR: {pnr}"
-
-        # Generate QR code
-        qr_img = qrcode.make(qr_data)
-        
-        # Generate unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        filename = f"qr_code_{timestamp}_{unique_id}.png"
-        
-        # Construct the full file path using the application's root path
-        filepath = os.path.join(app.root_path, IMAGES_FOLDER, filename)
-        
-        # Save QR code to file
-        qr_img.save(filepath)
-        
-        # Generate the full URL for the generated image
-        image_url = f"{BASE_URL}{IMAGES_FOLDER}/{filename}"
+        if isinstance(data, dict) and 'passengers' in data:
+            data = data['passengers']
+
+        if isinstance(data, list):
+            return stream_documents(data, render)
+        if streaming.wants_ndjson(request):
+            return stream_documents([data], render)
 
         return jsonify({
             'success': True,
-            'data': {
-                'passengerName': f"{first_name} {last_name}".upper(),
-                'flight': flight,
-                'fromAirport': from_airport,
-                'toAirport': to_airport,
-                'date': date,
-                'time': time,
-                'seat': seat,
-                'gate': gate,
-                'pnr': pnr,
-                'qrImageUrl': image_url,
-                'filename': filename
-            }
+            'data': render(data)
         })
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/generate/qr-code', methods=['POST'])
+def generate_qr_code():
+    return generate_documents(qr_code_document)
+
 @app.route('/api/generate/barcode', methods=['POST'])
 def generate_barcode():
-    try:
-        data = request.json or {}
-        first_name = data.get('firstName', 'John')
-        last_name = data.get('lastName', 'Doe')
-        flight = data.get('flight', 'PH 0121')
-        from_airport = data.get('from', 'BOM')
-        to_airport = data.get('to', 'DEL')
-        date = data.get('date', '2025-09-10')
-        time = data.get('time', '13:15')
-        seat = data.get('seat', '14A')
-        gate = data.get('gate', 'B12')
-        pnr = data.get('pnr', 'ABC123')
-
-        # Create barcode data (using PNR as barcode content)
-        barcode_data = pnr
-        
-        # Generate barcode (using Code128 format)
-        barcode_class = barcode.get_barcode_class('code128')
-        barcode_img = barcode_class(barcode_data, writer=ImageWriter())
-        
-        # Generate unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        filename = f"barcode_{timestamp}_{unique_id}.png"
-        
-        # Construct the full file path using the application's root path
-        filepath = os.path.join(app.root_path, IMAGES_FOLDER, filename)
-        
-        # Save barcode to file
-        barcode_img.save(filepath)
-        
-        # Generate the full URL for the generated image
-        image_url = f"{BASE_URL}{IMAGES_FOLDER}/{filename}"
-
-        return jsonify({
-            'success': True,
-            'data': {
-                'passengerName': f"{first_name} {last_name}".upper(),
-                'flight': flight,
-                'fromAirport': from_airport,
-                'toAirport': to_airport,
-                'date': date,
-                'time': time,
-                'seat': seat,
-                'gate': gate,
-                'pnr': pnr,
-                'barcodeImageUrl': image_url,
-                'filename': filename
-            }
-        })
-
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    return generate_documents(barcode_document)
 
-# Add a route to serve the images from the 'images' directory
-@app.route(f'/{IMAGES_FOLDER}/<filename>')
+# Add a route to serve the images from the 'images' directory (sharded by id prefix)
+@app.route(f'/{IMAGES_FOLDER}/<path:filename>')
 def serve_image(filename):
     try:
+        ImageJanitor.touch(safe_join(os.path.join(app.root_path, IMAGES_FOLDER), filename))
         return send_from_directory(os.path.join(app.root_path, IMAGES_FOLDER), filename)
     except Exception as e:
         return jsonify({'error': 'Image not found', 'details': str(e)}), 404
 
 if __name__ == '__main__':
+    warmup.warm_up()
     # Flask will automatically serve files from the 'static' folder.
     # We are using send_from_directory for our custom 'images' folder.
     # app.static_folder = IMAGES_FOLDER is not needed.
@@ -0,0 +1,130 @@
+import base64
+import io
+import os
+import bcbp
+import code128
+import matrix_image
+from render_cache import RenderCache, write_atomic
+
+# Render options are part of the cache key, so changing them invalidates old images
+QR_OPTIONS = {'box_size': int(os.environ.get('QR_BOX_SIZE', 10)), 'border': 4, 'writer': 'png1'}
+BARCODE_OPTIONS = {'symbology': 'code128', 'writer': 'png1', 'module_width': 2, 'height': 100}
+
+RENDER_OPTIONS = {
+    'qr_code': QR_OPTIONS,
+    'barcode': BARCODE_OPTIONS
+}
+
+
+def document_mode(data):
+    """Return which travel document a request payload describes"""
+    if 'etFirstName' in data:
+        return 'e_ticket'
+    if 'bagFirstName' in data:
+        return 'baggage_tag'
+    return 'boarding_pass'
+
+
+def qr_payload(data):
+    """Build the QR code content for a boarding pass, e-ticket or baggage tag payload.
+
+    Boarding passes carry the IATA BCBP mandatory items; e-tickets and bag
+    tags use the compact layouts stored in e_tickets.iata_data and
+    baggage_tags.barcode_data.
+    """
+    mode = document_mode(data)
+
+    if mode == 'e_ticket':
+        return bcbp.encode_e_ticket(
+            ticket_number=data.get('ticketNumber', '1234567890123'),
+            first_name=data.get('etFirstName', 'Rahul'),
+            last_name=data.get('etLastName', 'Sharma'),
+            flight=data.get('etFlight', 'AI 2727'),
+            from_airport=data.get('etFrom', 'BOM'),
+            to_airport=data.get('etTo', 'DEL'),
+            date=data.get('etDate', '2025-09-10')
+        )
+
+    if mode == 'baggage_tag':
+        return bcbp.encode_bag_tag(
+            tag_number=data.get('bagNumber', '0000-615742'),
+            first_name=data.get('bagFirstName', 'Priya'),
+            last_name=data.get('bagLastName', 'Patel'),
+            flight=data.get('bagFlight', 'AI0121'),
+            from_airport=data.get('bagFrom', 'BOM'),
+            to_airport=data.get('bagTo', 'DEL')
+        )
+
+    return bcbp.encode_boarding_pass(data)
+
+
+def barcode_payload(data):
+    """Return the Code128 content: bag tag number, ticket number or PNR"""
+    if 'bagNumber' in data:  # Baggage Tag mode
+        return data.get('bagNumber', '0000-615742')
+    if 'ticketNumber' in data:  # E-Ticket mode
+        return data.get('ticketNumber', '1234567890123')
+    return data.get('pnr', 'ABC123')  # Boarding Pass mode (default)
+
+
+def render_qr(qr_data, fp):
+    """Write a 1-bit QR code PNG for qr_data to a binary file object"""
+    matrix = matrix_image.qr_matrix(qr_data, border=QR_OPTIONS['border'])
+    fp.write(matrix_image.to_png(matrix, scale=QR_OPTIONS['box_size']))
+
+
+def render_barcode(barcode_data, fp):
+    """Write a 1-bit Code128 barcode PNG for barcode_data to a binary file object"""
+    fp.write(code128.render_png(
+        str(barcode_data),
+        module_width=BARCODE_OPTIONS['module_width'],
+        height=BARCODE_OPTIONS['height']
+    ))
+
+
+RENDERERS = {
+    'qr_code': render_qr,
+    'barcode': render_barcode
+}
+
+
+def render_file(kind, payload, path):
+    """Render one image straight to disk; used by process pool workers"""
+    render = RENDERERS[kind]
+    write_atomic(path, lambda fp: render(payload, fp))
+    return path
+
+
+def render_png(kind, payload):
+    """Render one image to bytes; used by process pool workers for inline responses"""
+    buffered = io.BytesIO()
+    RENDERERS[kind](payload, buffered)
+    return buffered.getvalue()
+
+
+def passenger_documents(data):
+    """Return the (kind, payload) pairs rendered for one passenger"""
+    return [('qr_code', qr_payload(data)), ('barcode', barcode_payload(data))]
+
+
+def render_passenger(data, directory):
+    """Render every image for one passenger into directory, skipping ones already on disk.
+
+    Returns {kind: (cache key, filename)} so the caller can record the files
+    in its own RenderCache.
+    """
+    files = {}
+    for kind, payload in passenger_documents(data):
+        key = RenderCache.key(kind, payload, RENDER_OPTIONS[kind])
+        filename = RenderCache.filename_for(kind, key)
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            render_file(kind, payload, path)
+        files[kind] = (key, filename)
+    return files
+
+
+
+def data_url(content, mimetype='image/png'):
+    """Embed rendered bytes as a base64 data URL"""
+    return f"data:{mimetype};base64,{base64.b64encode(content).decode('utf-8')}"
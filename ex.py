@@ -1,11 +1,10 @@
 from flask import Flask, render_template, request, jsonify, send_from_directory
 from flask_cors import CORS
-import qrcode
-import barcode
-from barcode.writer import ImageWriter
 import os
 from datetime import datetime
 import uuid
+import documents
+import warmup
 
 app = Flask(__name__)
 CORS(app)
@@ -45,11 +44,12 @@ def generate_qr_code():
         gate = data.get('gate', 'B12')
         pnr = data.get('pnr', 'ABC123')
 
-        qr_data = f"BOARDING PASS\nPassenger: {first_name} {last_name}\nFlight: {flight}\nFrom: {from_airport}\nTo: {to_airport}\nDate: {date}\nTime: {time}\nSeat: {seat}\nGate: {gate}\nPNR: {pnr}"
+        # Encode the IATA BCBP mandatory items from the same values the response reports
+        qr_data = documents.qr_payload(dict(
+            data, firstName=first_name, lastName=last_name, flight=flight, date=date,
+            seat=seat, pnr=pnr, **{'from': from_airport, 'to': to_airport}
+        ))
 
-        # Generate QR code
-        qr_img = qrcode.make(qr_data)
-        
         # Generate unique filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         unique_id = str(uuid.uuid4())[:8]
@@ -58,8 +58,8 @@ def generate_qr_code():
         # Construct the full file path using the application's root path
         filepath = os.path.join(app.root_path, IMAGES_FOLDER, filename)
         
-        # Save QR code to file
-        qr_img.save(filepath)
+        # Write the QR code as a 1-bit PNG straight from its module matrix
+        documents.render_file('qr_code', qr_data, filepath)
         
         # Generate the full URL for the generated image
         image_url = f"{BASE_URL}{IMAGES_FOLDER}/{filename}"
@@ -102,10 +102,6 @@ def generate_barcode():
         # Create barcode data (using PNR as barcode content)
         barcode_data = pnr
         
-        # Generate barcode (using Code128 format)
-        barcode_class = barcode.get_barcode_class('code128')
-        barcode_img = barcode_class(barcode_data, writer=ImageWriter())
-        
         # Generate unique filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         unique_id = str(uuid.uuid4())[:8]
@@ -114,8 +110,8 @@ def generate_barcode():
         # Construct the full file path using the application's root path
         filepath = os.path.join(app.root_path, IMAGES_FOLDER, filename)
         
-        # Save barcode to file
-        barcode_img.save(filepath)
+        # Write the Code128 barcode with the native encoder
+        documents.render_file('barcode', barcode_data, filepath)
         
         # Generate the full URL for the generated image
         image_url = f"{BASE_URL}{IMAGES_FOLDER}/{filename}"
@@ -149,6 +145,7 @@ def serve_image(filename):
         return jsonify({'error': 'Image not found', 'details': str(e)}), 404
 
 if __name__ == '__main__':
+    warmup.warm_up()
     # Flask will automatically serve files from the 'static' folder.
     # We are using send_from_directory for our custom 'images' folder.
     # app.static_folder = IMAGES_FOLDER is not needed.
@@ -157,42 +154,32 @@ from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 import qrcode
 import base64
-from io import BytesIO
-import barcode
-from barcode.writer import ImageWriter
+import code128
+import documents
+import matrix_image
 
 app = Flask(__name__)
 CORS(app)  # This will enable CORS for all routes
 
 # Helper function to generate QR code and return a base64 string
-def generate_qr_code(data_string):
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(data_string)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
+def generate_qr_code(data_string, image_format='png', scale=10):
+    # Build the module matrix and write it directly as a 1-bit PNG or an SVG path
+    matrix = matrix_image.qr_matrix(data_string, border=4, error_correction=qrcode.constants.ERROR_CORRECT_L)
     
-    buffered = BytesIO()
-    img.save(buffered, format="PNG")
-    img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
+    if image_format == 'svg':
+        img_str = base64.b64encode(matrix_image.to_svg(matrix, scale).encode("utf-8")).decode("utf-8")
+        return f"data:image/svg+xml;base64,{img_str}"
+
+    img_str = base64.b64encode(matrix_image.to_png(matrix, scale)).decode("utf-8")
     return f"data:image/png;base64,{img_str}"
 
 # Helper function to generate barcode and return a base64 string
 def generate_barcode(data_string):
     try:
-        # Use a standard format like Code128
-        Code128 = barcode.get_barcode_class('code128')
-        code = Code128(data_string, writer=ImageWriter())
-        
-        buffered = BytesIO()
-        # Save the barcode to the buffer
-        code.write(buffered, options={"module_width": 0.2, "module_height": 10, "font_size": 10})
+        # Use a standard format like Code128, rasterized by the native encoder
+        png = code128.render_png(data_string, module_width=2, height=118)
         
-        img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
+        img_str = base64.b64encode(png).decode("utf-8")
         return f"data:image/png;base64,{img_str}"
     except Exception as e:
         # Return an error or a placeholder image if the data is invalid for the barcode type
@@ -209,8 +196,13 @@ def serve_html():
 def handle_qr_code_generation():
     data = request.json
     try:
-        data_string = str(data)  # Convert the JSON data to a string for the QR code
-        qr_image_url = generate_qr_code(data_string)
+        scale = min(max(int(request.args.get('scale', 10)), 1), 40)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'scale must be an integer'}), 400
+    try:
+        data_string = documents.qr_payload(data or {})  # IATA BCBP / compact document payload
+        image_format = request.args.get('format', 'png').lower()
+        qr_image_url = generate_qr_code(data_string, image_format, scale)
         return jsonify({'success': True, 'data': {'qrImageUrl': qr_image_url}})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -0,0 +1,30 @@
+"""gunicorn settings: load and warm the app once in the master, then fork.
+
+    gunicorn -c gunicorn.conf.py                 # app:app
+    APP_MODULE=dc:app gunicorn -c gunicorn.conf.py
+
+With preload_app the master imports the application and runs
+warmup.warm_up() before forking, so every worker starts with the rendering
+libraries, fonts and composer templates already in (shared, copy-on-write)
+memory and the first request is as fast as the rest. Background threads
+and pools are created lazily per worker, after the fork.
+"""
+import gc
+import os
+import warmup
+
+wsgi_app = os.environ.get('APP_MODULE', 'app:app')
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+preload_app = True
+
+# The config file is read before the app module is imported, so warming up here
+# times each library on its own rather than as part of importing the app
+warmup.warm_up()
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the collector's reach, so collections in the
+    # workers do not write to (and un-share) the pages inherited from the master
+    gc.freeze()
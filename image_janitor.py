@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: every process sweeps, deletes are idempotent anyway
+    fcntl = None
+
+LOCK_FILE = '.janitor.lock'
+TMP_FILE_TTL = 3600  # leftovers from interrupted atomic writes
+
+
+class ImageJanitor:
+    """Background eviction for a generated-image directory.
+
+    Images older than `ttl` seconds since their last access are deleted, and
+    if the directory is still above `max_bytes` the least recently accessed
+    images go next. Access time is whatever `touch` last set (mtime), since
+    atime is unreliable on relatime/noatime mounts. Only one process per host
+    sweeps at a time, coordinated with a lock file in the directory.
+    """
+
+    def __init__(self, directory, ttl=7 * 24 * 3600, max_bytes=1024 ** 3, interval=300):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._started_pid = None
+        self.runs = 0
+        self.skipped_runs = 0
+        self.evicted_ttl = 0
+        self.evicted_quota = 0
+        self.evicted_bytes = 0
+        self.last_run = None
+        self.last_total_bytes = 0
+        self.last_file_count = 0
+        self.last_duration = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def shard(name):
+        """Subdirectory for a file name or hash, e.g. 'ab' for 'ab12...' """
+        return name[:2]
+
+    @staticmethod
+    def touch(path):
+        """Record an access to path; returns False if the file has already been evicted"""
+        if path is None:  # rejected by safe_join
+            return False
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def start(self):
+        """Start the sweeper thread for this process (safe to call repeatedly and after fork)"""
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+        thread = threading.Thread(target=self._run, name='image-janitor', daemon=True)
+        thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Image janitor sweep failed: {e}")
+            time.sleep(self.interval)
+
+    def _scan(self):
+        files = []
+        for root, dirs, names in os.walk(self.directory):
+            for name in names:
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _remove(self, path, size):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            self.evicted_bytes += size
+        return True
+
+    def sweep(self):
+        """Run one eviction pass; returns the number of files removed"""
+        lock_fp = open(os.path.join(self.directory, LOCK_FILE), 'a')
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_fp, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    with self._lock:
+                        self.skipped_runs += 1
+                    return 0
+            return self._sweep()
+        finally:
+            lock_fp.close()
+
+    def _sweep(self):
+        started = time.monotonic()
+        now = time.time()
+        removed = 0
+        kept = []
+
+        for last_access, size, path in self._scan():
+            expired = path.endswith('.tmp') and now - last_access > TMP_FILE_TTL
+            if self.ttl and now - last_access > self.ttl:
+                expired = True
+            if expired:
+                if self._remove(path, size):
+                    removed += 1
+                    with self._lock:
+                        self.evicted_ttl += 1
+            else:
+                kept.append((last_access, size, path))
+
+        total = sum(size for _, size, _ in kept)
+        count = len(kept)
+        if self.max_bytes and total > self.max_bytes:
+            # Least recently accessed first, down to 90% of the quota to avoid evicting on every pass
+            target = self.max_bytes * 0.9
+            for last_access, size, path in sorted(kept):
+                if total <= target:
+                    break
+                if self._remove(path, size):
+                    removed += 1
+                    total -= size
+                    count -= 1
+                    with self._lock:
+                        self.evicted_quota += 1
+
+        with self._lock:
+            self.runs += 1
+            self.last_run = now
+            self.last_total_bytes = total
+            self.last_file_count = count
+            self.last_duration = time.monotonic() - started
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {
+                'directory': self.directory,
+                'ttl_seconds': self.ttl,
+                'max_bytes': self.max_bytes,
+                'runs': self.runs,
+                'skipped_runs': self.skipped_runs,
+                'evicted_ttl': self.evicted_ttl,
+                'evicted_quota': self.evicted_quota,
+                'evicted_bytes': self.evicted_bytes,
+                'last_run': self.last_run,
+                'last_total_bytes': self.last_total_bytes,
+                'last_file_count': self.last_file_count,
+                'last_duration_seconds': round(self.last_duration, 4)
+            }
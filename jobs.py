@@ -0,0 +1,247 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+TERMINAL_STATUSES = ('done', 'failed')
+
+
+class QueueFull(Exception):
+    """Raised when too many jobs are already waiting; callers should retry later"""
+
+
+class JobQueue:
+    """SQLite-backed render job queue with a bounded pool of worker threads.
+
+    Jobs are rows in a local database, so every gunicorn worker on a host
+    shares the same queue and a job can be polled from any of them. Each
+    process runs `workers` threads that claim queued jobs with an immediate
+    transaction and store the handler's JSON result.
+
+    While a job runs, its process refreshes the job's heartbeat_at every
+    stale_after / 3 seconds; a running job whose heartbeat is older than
+    stale_after belonged to a process that died and is queued again.
+    """
+
+    def __init__(self, db_path, handlers, workers=2, max_pending=500,
+                 poll_interval=0.2, retention=3600, stale_after=300):
+        self.db_path = db_path
+        self.handlers = handlers
+        self.workers = workers
+        self.max_pending = max_pending
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.stale_after = stale_after
+        self._local = threading.local()
+        self._condition = threading.Condition()
+        self._started_pid = None
+        self._start_lock = threading.Lock()
+        self._last_purge = 0
+        self._running = set()  # ids of the jobs this process is running
+        self._running_lock = threading.Lock()
+        self._create_schema()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _create_schema(self):
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                heartbeat_at REAL,
+                finished_at REAL
+            )
+        ''')
+        if 'heartbeat_at' not in [row[1] for row in conn.execute('PRAGMA table_info(jobs)')]:
+            # Queue created before heartbeats
+            conn.execute('ALTER TABLE jobs ADD COLUMN heartbeat_at REAL')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)')
+
+    def start(self):
+        """Start the worker threads for this process (safe to call repeatedly and after fork)"""
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+            self._running = set()
+            self._requeue_stale()
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'job-worker-{index}', daemon=True)
+                thread.start()
+            threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True).start()
+
+    def submit(self, kind, payload):
+        """Queue a job and return its id; raises QueueFull when the backlog is at max_pending"""
+        if kind not in self.handlers:
+            raise ValueError(f'Unknown job type: {kind}')
+        self.start()
+
+        job_id = uuid.uuid4().hex
+        conn = self._connect()
+        # Count and insert under one write lock, so concurrent workers cannot all pass the check
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+            if pending < self.max_pending:
+                conn.execute(
+                    'INSERT INTO jobs (job_id, kind, payload, created_at) VALUES (?, ?, ?, ?)',
+                    (job_id, kind, json.dumps(payload), time.time())
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        if pending >= self.max_pending:
+            raise QueueFull(f'{pending} jobs pending')
+
+        with self._condition:
+            self._condition.notify()
+        return job_id
+
+    def get(self, job_id):
+        """Return the job as a dict, or None if it does not exist"""
+        row = self._connect().execute('SELECT * FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            'jobId': row['job_id'],
+            'type': row['kind'],
+            'status': row['status'],
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'createdAt': row['created_at'],
+            'startedAt': row['started_at'],
+            'finishedAt': row['finished_at']
+        }
+
+    def wait(self, job_id, timeout):
+        """Long-poll: return the job once it has finished or the timeout has passed"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job['status'] in TERMINAL_STATUSES or remaining <= 0:
+                return job
+            # Jobs finished by this process notify us; others are picked up by polling
+            with self._condition:
+                self._condition.wait(min(self.poll_interval, remaining))
+
+    def stats(self):
+        rows = self._connect().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        return {status: count for status, count in rows}
+
+    def _claim(self):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                "SELECT job_id, kind, payload FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ? WHERE job_id = ?",
+                    (time.time(), time.time(), row['job_id'])
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return row
+
+    def _finish(self, job_id, result=None, error=None):
+        self._connect().execute(
+            'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE job_id = ?',
+            ('failed' if error is not None else 'done', json.dumps(result) if error is None else None,
+             error, time.time(), job_id)
+        )
+        with self._condition:
+            self._condition.notify_all()
+
+    def _work(self):
+        while True:
+            self._housekeeping()
+            try:
+                row = self._claim()
+            except sqlite3.OperationalError as e:
+                print(f"Job queue unavailable: {e}")
+                time.sleep(self.poll_interval)
+                continue
+
+            if row is None:
+                with self._condition:
+                    self._condition.wait(self.poll_interval)
+                continue
+
+            with self._running_lock:
+                self._running.add(row['job_id'])
+            try:
+                result = self.handlers[row['kind']](json.loads(row['payload']))
+                self._finish(row['job_id'], result=result)
+            except Exception as e:
+                self._finish(row['job_id'], error=str(e) or type(e).__name__)
+            finally:
+                with self._running_lock:
+                    self._running.discard(row['job_id'])
+
+    def _heartbeat(self):
+        """Mark this process's running jobs as alive, so other processes never requeue them"""
+        while True:
+            time.sleep(max(self.stale_after / 3, 1))
+            with self._running_lock:
+                job_ids = list(self._running)
+            if not job_ids:
+                continue
+            try:
+                self._connect().execute(
+                    f"UPDATE jobs SET heartbeat_at = ? WHERE status = 'running' AND job_id IN "
+                    f"({', '.join('?' * len(job_ids))})",
+                    [time.time()] + job_ids
+                )
+            except sqlite3.OperationalError as e:
+                print(f"Job heartbeat failed: {e}")
+
+    def _requeue_stale(self):
+        """Put back jobs left 'running' by a worker process that died (no heartbeat for stale_after)"""
+        self._connect().execute(
+            "UPDATE jobs SET status = 'queued', started_at = NULL, heartbeat_at = NULL "
+            "WHERE status = 'running' AND COALESCE(heartbeat_at, started_at) < ?",
+            (time.time() - self.stale_after,)
+        )
+
+    def _housekeeping(self):
+        """At most once a minute: recover orphaned jobs and drop old finished ones"""
+        now = time.time()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        try:
+            self._requeue_stale()
+            self._purge_finished(now)
+        except sqlite3.OperationalError as e:
+            print(f"Job queue housekeeping failed: {e}")
+
+    def _purge_finished(self, now):
+        self._connect().execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+            (now - self.retention,)
+        )
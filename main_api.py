@@ -1,8 +1,14 @@
 cat > main.py << 'EOF'
-from fastapi import FastAPI, HTTPException
+import json
+import os
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
+from bulk_import import detect_format, parse_records, validate_batches
+from passenger_store import PassengerStore, format_cursor, parse_cursor, parse_fields
 
 app = FastAPI(title="Boarding Pass API", version="1.0.0")
 
@@ -21,28 +27,103 @@ class Passenger(BaseModel):
     seat: str
     boarding_time: str
 
-passengers_db = []
-current_id = 1
+# Passengers persist in SQLite (PASSENGERS_DB); ids come from the primary key, not a global counter
+passenger_store = PassengerStore(
+    os.environ.get('PASSENGERS_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'passengers.db')),
+    pool_size=int(os.environ.get('PASSENGERS_POOL_SIZE', 8))
+)
+MAX_PAGE_SIZE = int(os.environ.get('PASSENGERS_MAX_PAGE_SIZE', 1000))
+MAX_IMPORT_ROWS = int(os.environ.get('PASSENGERS_MAX_IMPORT_ROWS', 50000))
+
+def json_array(items, chunk_size=500):
+    """Serialize an iterable of dicts as a JSON array, chunk_size items per yielded piece"""
+    yield '['
+    chunk = []
+    first = True
+    for item in items:
+        chunk.append(json.dumps(item))
+        if len(chunk) >= chunk_size:
+            yield ('' if first else ',') + ','.join(chunk)
+            chunk = []
+            first = False
+    if chunk:
+        yield ('' if first else ',') + ','.join(chunk)
+    yield ']'
 
 @app.get("/")
 async def root():
     return {"message": "Boarding Pass API is running"}
 
 @app.get("/passengers")
-async def get_passengers():
-    return passengers_db
+async def get_passengers(
+    flight_number: Optional[str] = None,
+    boarding_from: Optional[str] = None,
+    boarding_to: Optional[str] = None,
+    fields: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE)
+):
+    """List passengers as a streamed JSON array.
+
+    With ?limit= the listing is paged by id, or by boarding time when
+    boarding_from/boarding_to are given: pass the X-Next-Cursor header
+    back as ?after= for the next page (no header on the last page).
+    Without it every match is streamed, read from the database in batches.
+    """
+    try:
+        fields = parse_fields(fields)
+        after = parse_cursor(after, boarding_from is not None or boarding_to is not None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    query = {
+        'fields': fields,
+        'flight_number': flight_number,
+        'boarding_from': boarding_from,
+        'boarding_to': boarding_to,
+        'after': after
+    }
+
+    if limit is None:
+        # Starlette iterates the sync generator in its threadpool
+        return StreamingResponse(json_array(passenger_store.iter_passengers(**query)), media_type="application/json")
+
+    passengers, next_after = await run_in_threadpool(passenger_store.page, limit, **query)
+    headers = {} if next_after is None else {"X-Next-Cursor": format_cursor(next_after)}
+    return StreamingResponse(json_array(passengers), media_type="application/json", headers=headers)
 
-@app.post("/passengers")
+@app.post("/passengers", response_model=Passenger)
 async def create_passenger(passenger: Passenger):
-    global current_id
-    passenger.id = current_id
-    current_id += 1
-    passengers_db.append(passenger)
-    return passenger
+    return await run_in_threadpool(passenger_store.create, passenger.model_dump())
+
+@app.post("/passengers/bulk")
+async def import_passengers(request: Request, format: Optional[str] = None):
+    """Import a manifest: JSON array, NDJSON or CSV (name, flight_number, seat, boarding_time columns).
+
+    Valid rows are inserted in one transaction; invalid ones are listed in
+    `errors` by their 0-based index in the upload and do not stop the rest.
+    """
+    try:
+        records = parse_records(await request.body(), detect_format(request.headers.get("content-type"), format))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(records) > MAX_IMPORT_ROWS:
+        raise HTTPException(status_code=413, detail=f"Too many rows ({len(records)}, max {MAX_IMPORT_ROWS})")
+
+    valid, errors = await run_in_threadpool(validate_batches, Passenger, records)
+    ids = []
+    if valid:
+        ids = await run_in_threadpool(passenger_store.create_many, [passenger.model_dump() for _, passenger in valid])
+
+    return {
+        "imported": len(ids),
+        "failed": len(errors),
+        "ids": [{"index": index, "id": passenger_id} for (index, _), passenger_id in zip(valid, ids)],
+        "errors": errors
+    }
 
-@app.get("/passengers/{passenger_id}")
+@app.get("/passengers/{passenger_id}", response_model=Passenger)
 async def get_passenger(passenger_id: int):
-    passenger = next((p for p in passengers_db if p.id == passenger_id), None)
+    passenger = await run_in_threadpool(passenger_store.get, passenger_id)
     if not passenger:
         raise HTTPException(status_code=404, detail="Passenger not found")
     return passenger
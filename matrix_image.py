@@ -0,0 +1,87 @@
+"""Write boolean module matrices (QR codes, barcodes) straight to PNG or SVG.
+
+PIL renders the matrix into an 8-bit image at full scale and then encodes
+it; here each matrix row is packed to bits once, scaled rows are emitted as
+PNG 'Up' filtered repeats (all zero bytes, which zlib collapses), and the
+result is a 1-bit palette PNG that is a fraction of the size.
+"""
+import struct
+import zlib
+import qrcode
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Palette index 0 is the light background, 1 is a dark module
+PALETTE = b'\xff\xff\xff\x00\x00\x00'
+
+
+def _chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+
+def pack_row(row, scale=1):
+    """Pack a row of booleans into PNG 1-bit scanline bytes, repeating each module `scale` times"""
+    width = len(row) * scale
+    bits = ''.join(('1' if module else '0') * scale for module in row)
+    padding = -width % 8
+    return int(bits + '0' * padding, 2).to_bytes((width + padding) // 8, 'big')
+
+
+def encode_png(packed_rows, width, row_repeat=1, compress_level=9):
+    """Encode pre-packed 1-bit scanlines as a palette PNG.
+
+    Each packed row is emitted `row_repeat` times; repeats use the Up filter
+    so they compress to almost nothing.
+    """
+    raw = bytearray()
+    for packed in packed_rows:
+        raw += b'\x00' + packed
+        if row_repeat > 1:
+            raw += (b'\x02' + bytes(len(packed))) * (row_repeat - 1)
+
+    height = len(packed_rows) * row_repeat
+    header = struct.pack('>IIBBBBB', width, height, 1, 3, 0, 0, 0)
+    return b''.join([
+        PNG_SIGNATURE,
+        _chunk(b'IHDR', header),
+        _chunk(b'PLTE', PALETTE),
+        _chunk(b'IDAT', zlib.compress(bytes(raw), compress_level)),
+        _chunk(b'IEND', b'')
+    ])
+
+
+def to_png(matrix, scale=10):
+    """Render a module matrix as a 1-bit PNG with `scale` pixels per module"""
+    packed_rows = [pack_row(row, scale) for row in matrix]
+    return encode_png(packed_rows, len(matrix[0]) * scale, row_repeat=scale)
+
+
+def to_svg(matrix, scale=10):
+    """Render a module matrix as an SVG with one path made of horizontal runs"""
+    size = len(matrix)
+    width = len(matrix[0])
+    commands = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < width:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < width and row[x]:
+                x += 1
+            commands.append(f"M{start},{y}h{x - start}v1h-{x - start}z")
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width * scale}" height="{size * scale}" '
+        f'viewBox="0 0 {width} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{width}" height="{size}" fill="#fff"/>'
+        f'<path d="{"".join(commands)}" fill="#000"/></svg>'
+    )
+
+
+def qr_matrix(data, border=4, error_correction=qrcode.constants.ERROR_CORRECT_M):
+    """Return the QR module matrix for data, quiet zone included"""
+    qr = qrcode.QRCode(error_correction=error_correction, border=border)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.get_matrix()
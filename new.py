@@ -1,10 +1,11 @@
 from flask import Flask, render_template, request, jsonify
-import qrcode
-import barcode
-from barcode.writer import ImageWriter
+from werkzeug.security import safe_join
 import os
 from datetime import datetime
 import uuid
+import documents
+from image_janitor import ImageJanitor
+import warmup
 
 app = Flask(__name__)
 
@@ -20,6 +21,16 @@ BASE_URL = 'http://localhost:5000'
 
 os.makedirs(IMAGES_FOLDER, exist_ok=True)
 
+image_janitor = ImageJanitor(
+    IMAGES_FOLDER,
+    ttl=int(os.environ.get('IMAGE_TTL', 7 * 24 * 3600)),
+    max_bytes=int(os.environ.get('IMAGE_MAX_BYTES', 1024 ** 3))
+)
+
+@app.before_request
+def start_image_janitor():
+    image_janitor.start()
+
 @app.route('/')
 def index():
     return render_template('qr.html')
@@ -43,16 +54,19 @@ def generate_qr_code():
         gate = data.get('gate', 'C12')
         pnr = data.get('pnr', 'XYZ789')
 
-        qr_data = f"BOARDING PASS\nPassenger: {first_name} {last_name}\nFlight: {flight}\nFrom: {from_airport}\nTo: {to_airport}\nDate: {date}\nTime: {time}\nSeat: {seat}\nGate: {gate}\nPNR: {pnr}"
+        # Encode the IATA BCBP mandatory items from the same values the response reports
+        qr_data = documents.qr_payload(dict(
+            data, firstName=first_name, lastName=last_name, flight=flight, date=date,
+            seat=seat, pnr=pnr, **{'from': from_airport, 'to': to_airport}
+        ))
 
-        qr_img = qrcode.make(qr_data)
-        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         unique_id = str(uuid.uuid4())[:8]
-        filename = f"qr_code_{timestamp}_{unique_id}.png"
+        filename = f"{ImageJanitor.shard(unique_id)}/qr_code_{timestamp}_{unique_id}.png"
         filepath = os.path.join(IMAGES_FOLDER, filename)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        qr_img.save(filepath)
+        documents.render_file('qr_code', qr_data, filepath)
         image_url = f"{BASE_URL}/images/{filename}"
 
         return jsonify({
@@ -92,15 +106,13 @@ def generate_barcode():
 
         barcode_data = pnr
         
-        barcode_class = barcode.get_barcode_class('code128')
-        barcode_img = barcode_class(barcode_data, writer=ImageWriter())
-        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         unique_id = str(uuid.uuid4())[:8]
-        filename = f"barcode_{timestamp}_{unique_id}.png"
+        filename = f"{ImageJanitor.shard(unique_id)}/barcode_{timestamp}_{unique_id}.png"
         filepath = os.path.join(IMAGES_FOLDER, filename)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        barcode_img.save(filepath)
+        documents.render_file('barcode', barcode_data, filepath)
         image_url = f"{BASE_URL}/images/{filename}"
 
         return jsonify({
@@ -123,14 +135,16 @@ def generate_barcode():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/images/<filename>')
+@app.route('/images/<path:filename>')
 def serve_image(filename):
     try:
+        ImageJanitor.touch(safe_join(IMAGES_FOLDER, filename))
         return app.send_static_file(filename)
     except:
         return jsonify({'error': 'Image not found'}), 404
 
 if __name__ == '__main__':
+    warmup.warm_up()
     app.static_folder = IMAGES_FOLDER
     app.static_url_path = '/images'
     
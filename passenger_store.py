@@ -0,0 +1,247 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Fields the API exposes, in response order; `id` is the passenger_id primary key
+FIELDS = ('id', 'name', 'flight_number', 'seat', 'boarding_time')
+COLUMNS = {'id': 'passenger_id', 'name': 'name', 'flight_number': 'flight_number', 'seat': 'seat',
+           'boarding_time': 'boarding_time'}
+
+
+def parse_fields(text):
+    """Validate a comma-separated ?fields= value; returns FIELDS for None/empty, raises ValueError on unknown names"""
+    if not text:
+        return FIELDS
+    requested = [field.strip() for field in text.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} (available: {', '.join(FIELDS)})")
+    return tuple(field for field in FIELDS if field in requested)
+
+
+def parse_cursor(text, by_boarding):
+    """Decode an ?after= cursor from page(); raises ValueError on a malformed one.
+
+    Id-ordered listings use the last id ('42'); boarding-time ranges page by
+    (boarding_time, id) and use 'HH:MM|42'.
+    """
+    if text is None or text == '':
+        return None
+    try:
+        if not by_boarding:
+            return int(text)
+        boarding_time, _, passenger_id = text.rpartition('|')
+        if not boarding_time:
+            raise ValueError
+        return boarding_time, int(passenger_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor {text!r}")
+
+
+def format_cursor(after):
+    return str(after) if isinstance(after, int) else f"{after[0]}|{after[1]}"
+
+
+class PassengerStore:
+    """SQLite-backed passenger storage with a small connection pool.
+
+    Follows the passengers table in Detabase_schem.sql (passenger_id
+    primary key, created_at/updated_at) with the boarding fields the API
+    takes. Lookups by id go through the primary key and listings filter
+    through idx_passenger_flight/idx_passenger_boarding and page by keyset,
+    so none of them scans the table: by id, or by (boarding_time, id) when a
+    boarding range is given, so the range index also supplies the order. Ids are
+    allocated by SQLite inside the INSERT, which is atomic across threads
+    and worker processes.
+
+    Every method blocks; call them from async endpoints through
+    `run_in_threadpool` so the event loop keeps serving other requests.
+    """
+
+    def __init__(self, db_path, pool_size=8, timeout=30):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._pool = queue.LifoQueue()
+        self._opened = 0
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        with self.connection() as conn:
+            self._create_schema(conn)
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection; at most pool_size are open per process"""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Connections must not cross a fork; start a fresh pool in the child
+                self._pool = queue.LifoQueue()
+                self._opened = 0
+                self._pid = os.getpid()
+            pool = self._pool
+            opened = self._opened < self.pool_size and pool.empty()
+            if opened:
+                self._opened += 1
+
+        conn = self._open() if opened else pool.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            pool.put(conn)
+
+    def _create_schema(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS passengers (
+                passenger_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                flight_number TEXT NOT NULL,
+                seat TEXT NOT NULL,
+                boarding_time TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_passenger_flight ON passengers (flight_number)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_passenger_name ON passengers (name)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_passenger_boarding ON passengers (boarding_time)')
+
+    @staticmethod
+    def _passenger(row):
+        return {
+            'id': row['passenger_id'],
+            'name': row['name'],
+            'flight_number': row['flight_number'],
+            'seat': row['seat'],
+            'boarding_time': row['boarding_time']
+        }
+
+    def create(self, passenger):
+        """Insert a passenger dict (any `id` in it is ignored) and return it with its new id"""
+        now = time.time()
+        with self.connection() as conn:
+            cursor = conn.execute(
+                'INSERT INTO passengers (name, flight_number, seat, boarding_time, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (passenger['name'], passenger['flight_number'], passenger['seat'], passenger['boarding_time'], now, now)
+            )
+        return dict(passenger, id=cursor.lastrowid)
+
+    def create_many(self, passengers, batch_size=1000):
+        """Insert passenger dicts in one transaction; returns their ids in input order.
+
+        Rows go in through executemany, batch_size at a time. The write
+        lock is taken up front, so the ids handed out are the consecutive
+        run after the table's current sequence value.
+        """
+        now = time.time()
+        with self.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'passengers'").fetchone()
+                first_id = (row[0] if row else 0) + 1
+                for start in range(0, len(passengers), batch_size):
+                    conn.executemany(
+                        'INSERT INTO passengers (name, flight_number, seat, boarding_time, created_at, updated_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?)',
+                        [(passenger['name'], passenger['flight_number'], passenger['seat'], passenger['boarding_time'],
+                          now, now) for passenger in passengers[start:start + batch_size]]
+                    )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return list(range(first_id, first_id + len(passengers)))
+
+    def get(self, passenger_id):
+        """Return the passenger as a dict, or None if it does not exist"""
+        with self.connection() as conn:
+            row = conn.execute('SELECT * FROM passengers WHERE passenger_id = ?', (passenger_id,)).fetchone()
+        return None if row is None else self._passenger(row)
+
+    def all(self, flight_number=None):
+        """All passengers in id order, optionally only those on one flight"""
+        return list(self.iter_passengers(flight_number=flight_number))
+
+    def _select(self, fields, flight_number, boarding_from, boarding_to, after, limit):
+        by_boarding = boarding_from is not None or boarding_to is not None
+        columns = ', '.join(['passenger_id', 'boarding_time'] +
+                            [COLUMNS[field] for field in fields if field not in ('id', 'boarding_time')])
+        conditions = []
+        params = []
+        for condition, value in (('flight_number = ?', flight_number), ('boarding_time >= ?', boarding_from),
+                                 ('boarding_time <= ?', boarding_to)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        if after is not None:
+            if by_boarding:
+                conditions.append('(boarding_time, passenger_id) > (?, ?)')
+                params.extend(after)
+            else:
+                conditions.append('passenger_id > ?')
+                params.append(after)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        order = 'boarding_time, passenger_id' if by_boarding else 'passenger_id'
+        with self.connection() as conn:
+            return conn.execute(
+                f'SELECT {columns} FROM passengers{where} ORDER BY {order} LIMIT ?', params + [limit]
+            ).fetchall()
+
+    @staticmethod
+    def _cursor(row, boarding_from, boarding_to):
+        if boarding_from is not None or boarding_to is not None:
+            return row['boarding_time'], row['passenger_id']
+        return row['passenger_id']
+
+    @staticmethod
+    def _project(rows, fields):
+        return [{field: row[COLUMNS[field]] for field in fields} for row in rows]
+
+    def page(self, limit, fields=FIELDS, flight_number=None, boarding_from=None, boarding_to=None, after=None):
+        """One keyset page: (passengers, next_after), next_after None on the last page.
+
+        `after` is the previous page's next_after (see parse_cursor), so a
+        page costs an index seek plus `limit` rows however deep it is.
+        boarding_from/boarding_to bound boarding_time inclusively as strings
+        ('HH:MM' compares correctly) and switch the order to (boarding_time, id).
+        """
+        rows = self._select(fields, flight_number, boarding_from, boarding_to, after, limit + 1)
+        next_after = self._cursor(rows[limit - 1], boarding_from, boarding_to) if len(rows) > limit else None
+        return self._project(rows[:limit], fields), next_after
+
+    def iter_passengers(self, fields=FIELDS, flight_number=None, boarding_from=None, boarding_to=None,
+                        after=None, batch_size=500):
+        """Yield every matching passenger in page() order, reading batch_size rows at a time.
+
+        A connection is only held while a batch is read, so a slow consumer
+        (e.g. a streamed response) never pins one for the whole listing.
+        """
+        while True:
+            rows = self._select(fields, flight_number, boarding_from, boarding_to, after, batch_size)
+            yield from self._project(rows, fields)
+            if len(rows) < batch_size:
+                return
+            after = self._cursor(rows[-1], boarding_from, boarding_to)
+
+    def count(self):
+        with self.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM passengers').fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            opened = self._opened
+        return {
+            'passengers': self.count(),
+            'pool_size': self.pool_size,
+            'open_connections': opened
+        }
@@ -0,0 +1,171 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from image_janitor import ImageJanitor
+
+
+def write_atomic(path, render):
+    """Run render(fp) against a temporary file and rename it into place.
+
+    Concurrent writers of the same content-addressed path therefore never
+    expose a half-written image; the last rename simply wins.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as fp:
+            render(fp)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class RenderCache:
+    """Content-addressed cache for rendered QR/barcode images and documents.
+
+    Images are keyed on a hash of the encoded string plus the render options,
+    so a byte-identical payload always maps to the same file. Lookups go
+    through an in-memory LRU first and then the on-disk directory; only a miss
+    on both tiers runs the renderer.
+    """
+
+    def __init__(self, directory, max_entries=2048, max_image_bytes=32 * 1024 ** 2):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_image_bytes = max_image_bytes
+        self._entries = OrderedDict()
+        self._images = OrderedDict()  # key -> image bytes for in-memory responses
+        self._image_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(kind, payload, options=None):
+        """Return the content hash for a payload rendered with the given options"""
+        digest = hashlib.sha256()
+        digest.update(kind.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(json.dumps(options or {}, sort_keys=True).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(str(payload).encode('utf-8'))
+        return digest.hexdigest()[:32]
+
+    @staticmethod
+    def filename_for(kind, key, extension='png'):
+        # Shard by hash prefix so no single directory grows too large
+        return f"{key[:2]}/{kind}_{key}.{extension}"
+
+    def path_for(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def lookup(self, kind, key, extension='png'):
+        """Return the cached filename for a key, or None when it has to be rendered"""
+        with self._lock:
+            filename = self._entries.get(key)
+            if filename is not None:
+                self._entries.move_to_end(key)
+
+        # Touching the file records the access for the janitor's LRU and
+        # confirms it has not been evicted since it was remembered
+        if filename is not None:
+            if ImageJanitor.touch(self.path_for(filename)):
+                with self._lock:
+                    self.hits += 1
+                return filename
+            self.forget(key)
+
+        filename = self.filename_for(kind, key, extension)
+        if ImageJanitor.touch(self.path_for(filename)):
+            self.remember(key, filename)
+            with self._lock:
+                self.disk_hits += 1
+            return filename
+        return None
+
+    def store(self, kind, key, render, extension='png'):
+        """Render into the cache directory and return the new filename.
+
+        `render` receives a binary file object and must write PNG data (or
+        whatever `extension` names) to it.
+        """
+        filename = self.filename_for(kind, key, extension)
+        write_atomic(self.path_for(filename), render)
+        self.remember(key, filename, rendered=True)
+        return filename
+
+    def get_or_render(self, kind, payload, render, options=None, extension='png'):
+        """Return the filename for a payload, rendering it only on a cache miss"""
+        key = self.key(kind, payload, options)
+        filename = self.lookup(kind, key, extension)
+        if filename is None:
+            filename = self.store(kind, key, render, extension)
+        return filename
+
+    def render_bytes(self, kind, payload, render, options=None):
+        """Return the rendered bytes for a payload without touching disk.
+
+        Used by the inline response modes; rendered images are kept in a
+        byte-bounded in-memory LRU instead of being written out.
+        """
+        key = self.key(kind, payload, options)
+        data = self.cached_bytes(key)
+        if data is not None:
+            return data
+
+        buffered = io.BytesIO()
+        render(buffered)
+        return self.remember_bytes(key, buffered.getvalue())
+
+    def cached_bytes(self, key):
+        """Return the in-memory image for a key, or None"""
+        with self._lock:
+            data = self._images.get(key)
+            if data is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+            return data
+
+    def remember_bytes(self, key, data):
+        """Keep image bytes rendered elsewhere (e.g. by a pool worker) in the in-memory LRU"""
+        with self._lock:
+            self.misses += 1
+            if key not in self._images:
+                self._images[key] = data
+                self._image_bytes += len(data)
+            while self._image_bytes > self.max_image_bytes and self._images:
+                _, evicted = self._images.popitem(last=False)
+                self._image_bytes -= len(evicted)
+        return data
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'inline_images': len(self._images),
+                'inline_bytes': self._image_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses
+            }
+
+    def forget(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def remember(self, key, filename, rendered=False):
+        """Record a filename, including ones rendered elsewhere (e.g. by a pool worker)"""
+        with self._lock:
+            if rendered:
+                self.misses += 1
+            self._entries[key] = filename
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,128 @@
+"""Weather responses for registry airports, shared by app.py, weather_.py and async_api.py.
+
+Responses keep the /api/weather shape (success, airport_code, city,
+temperature, ..., source). They come from weather_model, so a whole set of
+airports is one vectorized call and every app gets the same value for an
+airport in a given hour, or from a real provider when one is configured
+(falling back to the model when it gives up). Results go through a
+WeatherCache so the prefetcher, single lookups and bulk lookups all read
+the same entries.
+"""
+from datetime import datetime
+import weather_model
+
+DEFAULT_EMOJI = '🌤️'
+
+
+class SimulatedWeather:
+    """Cached weather for the airports in a registry.
+
+    `provider(lat, lon)` optionally fetches real weather (e.g.
+    WeatherProvider.fetch); when it is None or returns None the model
+    answers. `submit` (e.g. an executor's submit) lets bulk lookups fetch
+    provider misses concurrently.
+    """
+
+    def __init__(self, registry, cache, provider=None, submit=None):
+        self.registry = registry
+        self.cache = cache
+        self.provider = provider
+        self.submit = submit
+
+    def _response(self, code, airport, weather, timestamp):
+        return {
+            'success': True,
+            'airport_code': code,
+            'city': airport['city'],
+            'temperature': weather['temperature'],
+            'description': weather['description'],
+            'main': weather['main'],
+            'emoji': weather_model.EMOJI.get(weather['main'], DEFAULT_EMOJI),
+            'humidity': weather['humidity'],
+            'wind_speed': weather['wind_speed'],
+            'timestamp': timestamp,
+            'source': weather.get('source', 'simulated_realtime')
+        }
+
+    def error(self, code):
+        return {
+            'success': False,
+            'error': 'Unable to fetch weather data',
+            'airport_code': code,
+            'city': self.registry[code]['city'] if code in self.registry else 'Unknown'
+        }
+
+    def for_many(self, airport_codes):
+        """Fresh simulated responses for known airport codes, in order, from one model call"""
+        rows = [self.registry[code] for code in airport_codes]
+        records = weather_model.simulate_records(
+            [airport['lat'] for airport in rows],
+            [airport['lon'] for airport in rows],
+            base_temps=[weather_model.BASE_TEMPS.get(code, float('nan')) for code in airport_codes]
+        )
+        timestamp = datetime.now().isoformat()
+        return [self._response(code, airport, weather, timestamp)
+                for code, airport, weather in zip(airport_codes, rows, records)]
+
+    def fetch(self, airport_code):
+        """Fresh response for a known airport: the provider's when it answers, else the model's"""
+        if self.provider is not None:
+            airport = self.registry[airport_code]
+            weather = self.provider(airport['lat'], airport['lon'])
+            if weather is not None:
+                return self._response(airport_code, airport, weather, datetime.now().isoformat())
+        return self.for_many([airport_code])[0]
+
+    def get(self, airport_code):
+        """Cached response for a known airport, fetching it on a miss"""
+        return self.cache.get_or_fetch(airport_code, lambda: self.fetch(airport_code))
+
+    def refresh(self, airport_code):
+        if airport_code in self.registry:
+            self.cache.set(airport_code, self.fetch(airport_code))
+
+    def refresh_many(self, airport_codes):
+        """Re-simulate and store every known airport in one call; returns how many were stored"""
+        known = [code for code in airport_codes if code in self.registry]
+        for code, weather in zip(known, self.for_many(known)):
+            self.cache.set(code, weather)
+        return len(known)
+
+    def bulk(self, airport_codes):
+        """Responses keyed by code.
+
+        Cached airports come straight from the cache. Without a provider
+        every miss is simulated in one model call; with one, misses are
+        fetched through `submit`, sharing any fetch already running.
+        """
+        results = {}
+        misses = []
+        for code in dict.fromkeys(airport_codes):
+            if code not in self.registry:
+                results[code] = {'success': False, 'error': f'Airport {code} not found'}
+                continue
+            if self.provider is not None:
+                misses.append(code)
+                continue
+            cached = self.cache.get(code)
+            if cached is None:
+                misses.append(code)
+            else:
+                results[code] = cached
+
+        if self.provider is None:
+            for code, weather in zip(misses, self.for_many(misses)):
+                self.cache.set(code, weather)
+                results[code] = weather
+            return results
+
+        # Hits come back already completed; misses are fetched through submit
+        pending = {code: self.cache.fetch_async(code, lambda code=code: self.fetch(code), self.submit)
+                   for code in misses}
+        for code, future in pending.items():
+            try:
+                results[code] = future.result()
+            except Exception as e:
+                print(f"Error processing weather request: {e}")
+                results[code] = self.error(code)
+        return results
@@ -0,0 +1,49 @@
+import json
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from flask import Response
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def wants_ndjson(request):
+    """True when the client asked for a streamed NDJSON response"""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'ndjson'):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def completed(result):
+    """Wrap an already known result (e.g. a cache hit) in a finished future"""
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def bounded_as_completed(items, submit, window):
+    """Yield futures as they finish while keeping at most `window` in flight.
+
+    Items are only submitted when a slot frees up, so memory stays flat no
+    matter how long the input is.
+    """
+    items = iter(items)
+    in_flight = set()
+    exhausted = False
+    while True:
+        while not exhausted and len(in_flight) < window:
+            try:
+                in_flight.add(submit(next(items)))
+            except StopIteration:
+                exhausted = True
+        if not in_flight:
+            return
+        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future
+
+
+def ndjson_response(results):
+    """Stream an iterable of dicts as one JSON document per line"""
+    def generate():
+        for result in results:
+            yield json.dumps(result) + '\n'
+    return Response(generate(), mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,95 @@
+import pytest
+import bcbp
+
+
+def test_encode_produces_the_fixed_mandatory_layout():
+    data = bcbp.encode('John', 'Doe', 'ABC123', 'JFK', 'LHR', 'UA 2456', '2025-07-15',
+                       compartment='Y', seat='23A', sequence='1A')
+    assert data == 'M1DOE/JOHN            EABC123 JFKLHRUA 2456 196Y023A0001A100'
+    assert len(data) == bcbp.BCBP_LENGTH == 60
+
+
+def test_decode_round_trips_encode():
+    decoded = bcbp.decode(bcbp.encode('Priya', 'Patel', 'XYZ789', 'BOM', 'DEL', 'AI0121', '2025-09-10',
+                                      seat='17A', sequence='001A'))
+    assert decoded['first_name'] == 'PRIYA'
+    assert decoded['last_name'] == 'PATEL'
+    assert decoded['pnr'] == 'XYZ789'
+    assert decoded['from_airport'] == 'BOM'
+    assert decoded['to_airport'] == 'DEL'
+    assert decoded['flight'] == 'AI0121'
+    assert decoded['julian_date'] == '253'
+    assert decoded['seat'] == '017A'
+    assert decoded['sequence'] == '0001A'
+    assert decoded['electronic_ticket'] is True
+    assert decoded['conditional_size'] == 0
+
+
+def test_decode_rejects_other_data():
+    with pytest.raises(ValueError):
+        bcbp.decode('BOARDING PASS')
+    with pytest.raises(ValueError):
+        bcbp.decode('X' * bcbp.BCBP_LENGTH)
+
+
+def test_name_keeps_digits_and_hyphens():
+    assert bcbp.format_name('Jo-Ann', 'Smith-Jones').strip() == 'SMITH-JONES/JO-ANN'
+    assert bcbp.format_name('A', 'S0') != bcbp.format_name('A', 'S1')
+
+
+def test_name_is_ascii_and_truncated_to_twenty_characters():
+    name = bcbp.format_name('José', "O'Connor-Wolfeschlegel")
+    assert len(name) == 20
+    assert name == 'OCONNOR-WOLFESCHLEGE'
+    assert bcbp.format_name('Zoë', 'Müller').strip() == 'MULLER/ZOE'
+
+
+@pytest.mark.parametrize('flight, expected', [
+    ('AI 2727', ('AI ', '2727 ')),
+    ('AI0121', ('AI ', '0121 ')),
+    ('UA2456A', ('UA ', '2456A')),
+    ('6E 52', ('6E ', '0052 ')),
+    ('??', ('?? ', '     '))
+])
+def test_split_flight(flight, expected):
+    assert bcbp.split_flight(flight) == expected
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2025-01-01', '001'),
+    ('31/12/2024', '366'),
+    ('15.07.2025', '196'),
+    ('not a date', '   '),
+    (None, '   ')
+])
+def test_julian_date(value, expected):
+    assert bcbp.julian_date(value) == expected
+
+
+def test_missing_values_are_blank():
+    assert bcbp.format_seat(None) == '    '
+    assert bcbp.format_sequence(None) == '     '
+    data = bcbp.encode('John', 'Doe', None, 'BOM', 'DEL', 'AI 202', None, seat=None, sequence=None)
+    assert 'NONE' not in data
+    assert len(data) == bcbp.BCBP_LENGTH
+
+
+def test_seat_and_sequence_are_zero_padded():
+    assert bcbp.format_seat('7c') == '007C'
+    assert bcbp.format_sequence('12') == '0012 '
+    assert bcbp.format_seat('exit row') == 'EXIT'
+
+
+def test_boarding_pass_payload_uses_the_form_defaults():
+    decoded = bcbp.decode(bcbp.encode_boarding_pass({'firstName': 'Warm', 'pnr': 'PNR001'}))
+    assert decoded['first_name'] == 'WARM'
+    assert decoded['last_name'] == 'SHARMA'
+    assert decoded['pnr'] == 'PNR001'
+    assert decoded['flight'] == 'AI2727'
+
+
+def test_e_ticket_and_bag_tag_layouts():
+    assert bcbp.encode_e_ticket('1234567890123', 'Rahul', 'Sharma', 'AI 2727', 'BOM', 'DEL', '2025-09-10') == \
+        '1234567890123|SHARMA/RAHUL|AI2727|BOMDEL|250910'
+    assert bcbp.encode_bag_tag('0000-615742', 'Priya', 'Patel', 'AI0121', 'BOM', 'DEL') == \
+        '0000-615742|PATEL/PRIYA|AI0121|BOMDEL'
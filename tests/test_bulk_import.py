@@ -0,0 +1,77 @@
+from typing import Optional
+import pytest
+from pydantic import BaseModel
+from bulk_import import detect_format, parse_records, validate_batches
+
+
+class Record(BaseModel):
+    name: str
+    age: Optional[int] = None
+
+
+@pytest.mark.parametrize('content_type, override, expected', [
+    (None, None, 'json'),
+    ('application/json; charset=utf-8', None, 'json'),
+    ('application/x-ndjson', None, 'ndjson'),
+    ('application/jsonl', None, 'ndjson'),
+    ('TEXT/CSV', None, 'csv'),
+    ('text/plain', 'csv', 'csv')
+])
+def test_detect_format(content_type, override, expected):
+    assert detect_format(content_type, override) == expected
+
+
+def test_detect_format_rejects_unknown_types():
+    with pytest.raises(ValueError):
+        detect_format('text/plain')
+    with pytest.raises(ValueError):
+        detect_format('application/json', 'xml')
+
+
+def test_parse_json_array():
+    assert parse_records(b'[{"name": "Ann"}, {"name": "Bob"}]', 'json') == [{'name': 'Ann'}, {'name': 'Bob'}]
+    for body in (b'{"name": "Ann"}', b'[{"name": '):
+        with pytest.raises(ValueError):
+            parse_records(body, 'json')
+
+
+def test_parse_ndjson_keeps_bad_lines_as_errors():
+    records = parse_records(b'{"name": "Ann"}\n\nnot json\n{"name": "Bob"}\n', 'ndjson')
+    assert records[0] == {'name': 'Ann'}
+    assert isinstance(records[1], ValueError)
+    assert records[2] == {'name': 'Bob'}
+
+
+def test_parse_csv_drops_empty_cells():
+    records = parse_records('\ufeffname,age\nAnn,31\nBob,\n'.encode('utf-8'), 'csv')
+    assert records == [{'name': 'Ann', 'age': '31'}, {'name': 'Bob'}]
+    with pytest.raises(ValueError):
+        parse_records(b'', 'csv')
+
+
+def test_rejects_non_utf8_bodies():
+    with pytest.raises(ValueError):
+        parse_records(b'\xff\xfe', 'json')
+
+
+def test_validate_batches_reports_bad_rows_by_index():
+    records = [
+        {'name': 'Ann', 'age': '31'},
+        {'age': 5},
+        ValueError('Invalid JSON'),
+        {'name': 'Bob', 'age': 'old'},
+        {'name': 'Cat'}
+    ]
+    valid, errors = validate_batches(Record, records, batch_size=2)
+
+    assert [(index, record.name, record.age) for index, record in valid] == [(0, 'Ann', 31), (4, 'Cat', None)]
+    assert [error['index'] for error in errors] == [1, 2, 3]
+    assert errors[0]['error'].startswith('name:')
+    assert errors[1]['error'] == 'Invalid JSON'
+    assert errors[2]['error'].startswith('age:')
+
+
+def test_validate_batches_with_clean_input():
+    valid, errors = validate_batches(Record, [{'name': f'P{i}'} for i in range(5)], batch_size=2)
+    assert [index for index, _ in valid] == [0, 1, 2, 3, 4]
+    assert errors == []
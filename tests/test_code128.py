@@ -0,0 +1,66 @@
+import io
+import pytest
+from PIL import Image
+import code128
+
+
+def checksum(values):
+    return (values[0] + sum(index * value for index, value in enumerate(values[1:], start=1))) % 103
+
+
+def test_digit_runs_are_packed_in_code_set_c():
+    assert code128.encode('123456') == [105, 12, 34, 56, 44]
+
+
+def test_lower_case_uses_code_set_b():
+    assert code128.encode('abc') == [104, 65, 66, 67, 90]
+
+
+def test_switches_to_code_set_c_for_trailing_digits():
+    values = code128.encode('AB1234')
+    assert values[3] == code128.SWITCH['C']
+    assert values[4:6] == [12, 34]
+    assert len(values) == 7
+
+
+def test_control_characters_use_code_set_a():
+    assert code128.encode('\tA')[:3] == [103, 73, 33]
+
+
+@pytest.mark.parametrize('text', ['ABC123', '0000-615742', '1234567890123', 'Mixed case 42', '7'])
+def test_checksum(text):
+    values = code128.encode(text)
+    assert values[-1] == checksum(values[:-1])
+
+
+def test_rejects_empty_and_unencodable_text():
+    with pytest.raises(ValueError):
+        code128.encode('')
+    with pytest.raises(ValueError):
+        code128.encode('café')
+
+
+def test_modules_decode_back_to_the_symbol_values():
+    text = 'ABC123'
+    row = code128.modules(text, quiet_zone=0)
+    values = code128.encode(text)
+    assert len(row) == len(values) * 11 + 13
+
+    table = {tuple(pattern): value for value, pattern in enumerate(code128.MODULE_TABLE.tolist())}
+    symbols = [table[tuple(row[start:start + 11].tolist())] for start in range(0, len(values) * 11, 11)]
+    assert symbols == values
+    assert row[-13:].tolist() == code128.STOP_MODULES.tolist()
+
+
+def test_render_png_size_and_bars():
+    text = 'ABC123'
+    png = code128.render_png(text, module_width=2, height=30)
+    image = Image.open(io.BytesIO(png)).convert('L')
+    row = code128.modules(text)
+    assert image.size == (len(row) * 2, 30)
+
+    pixels = image.tobytes()
+    width = image.size[0]
+    for y in (0, 29):
+        scanline = pixels[y * width:(y + 1) * width]
+        assert [scanline[x] == 0 for x in range(0, width, 2)] == [bool(module) for module in row]
@@ -0,0 +1,68 @@
+import io
+import struct
+import zlib
+from PIL import Image
+import matrix_image
+
+MATRIX = [
+    [True, False, True],
+    [False, True, False],
+    [True, True, False]
+]
+
+
+def chunks(png):
+    assert png.startswith(matrix_image.PNG_SIGNATURE)
+    offset = len(matrix_image.PNG_SIGNATURE)
+    while offset < len(png):
+        length, kind = struct.unpack('>I4s', png[offset:offset + 8])
+        data = png[offset + 8:offset + 8 + length]
+        crc, = struct.unpack('>I', png[offset + 8 + length:offset + 12 + length])
+        assert crc == zlib.crc32(kind + data) & 0xffffffff
+        yield kind, data
+        offset += 12 + length
+
+
+def pixels(png):
+    image = Image.open(io.BytesIO(png)).convert('L')
+    width, height = image.size
+    data = image.tobytes()
+    return [[data[y * width + x] == 0 for x in range(width)] for y in range(height)]
+
+
+def test_pack_row_pads_to_whole_bytes():
+    assert matrix_image.pack_row([True, False, True]) == bytes([0b10100000])
+    assert matrix_image.pack_row([True, False], scale=4) == bytes([0b11110000])
+    assert matrix_image.pack_row([True] * 9) == bytes([0xff, 0x80])
+
+
+def test_png_is_a_one_bit_palette_image():
+    png = matrix_image.to_png(MATRIX, scale=3)
+    kinds = [kind for kind, _ in chunks(png)]
+    assert kinds == [b'IHDR', b'PLTE', b'IDAT', b'IEND']
+
+    header = dict(chunks(png))[b'IHDR']
+    width, height, depth, color_type = struct.unpack('>IIBB', header[:10])
+    assert (width, height, depth, color_type) == (9, 9, 1, 3)
+
+
+def test_png_pixels_match_the_scaled_matrix():
+    scale = 4
+    expected = [[module for module in row for _ in range(scale)] for row in MATRIX for _ in range(scale)]
+    assert pixels(matrix_image.to_png(MATRIX, scale)) == expected
+
+
+def test_svg_draws_one_run_per_dark_segment():
+    svg = matrix_image.to_svg(MATRIX, scale=5)
+    assert 'width="15" height="15"' in svg
+    assert 'viewBox="0 0 3 3"' in svg
+    assert 'M0,0h1v1h-1zM2,0h1v1h-1zM1,1h1v1h-1zM0,2h2v1h-2z' in svg
+
+
+def test_qr_matrix_includes_the_quiet_zone():
+    matrix = matrix_image.qr_matrix('M1DOE/JOHN', border=4)
+    size = len(matrix)
+    assert size == 21 + 2 * 4  # version 1
+    assert all(len(row) == size for row in matrix)
+    assert not any(matrix[0]) and not any(matrix[-1])
+    assert pixels(matrix_image.to_png(matrix, 1)) == [[bool(module) for module in row] for row in matrix]
@@ -0,0 +1,93 @@
+import pytest
+from passenger_store import PassengerStore, format_cursor, parse_cursor, parse_fields
+
+
+def passenger(name, flight_number='AI202', boarding_time='10:00', seat='1A'):
+    return {'name': name, 'flight_number': flight_number, 'seat': seat, 'boarding_time': boarding_time}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PassengerStore(str(tmp_path / 'passengers.db'), pool_size=2)
+
+
+def test_create_assigns_ids_and_ignores_given_ones(store):
+    first = store.create(dict(passenger('Ann'), id=99))
+    second = store.create(passenger('Bob'))
+    assert (first['id'], second['id']) == (1, 2)
+    assert store.get(1) == dict(passenger('Ann'), id=1)
+    assert store.get(3) is None
+
+
+def test_create_many_returns_consecutive_ids(store):
+    store.create(passenger('Ann'))
+    ids = store.create_many([passenger(f'P{i}') for i in range(5)], batch_size=2)
+    assert ids == [2, 3, 4, 5, 6]
+    assert store.get(6)['name'] == 'P4'
+    assert store.count() == 6
+
+
+def test_create_many_is_all_or_nothing(store):
+    with pytest.raises(KeyError):
+        store.create_many([passenger('Ann'), {'name': 'No flight'}])
+    assert store.count() == 0
+
+
+def test_all_filters_by_flight(store):
+    store.create_many([passenger('Ann', 'AI202'), passenger('Bob', 'UK955'), passenger('Cat', 'AI202')])
+    assert [p['name'] for p in store.all()] == ['Ann', 'Bob', 'Cat']
+    assert [p['name'] for p in store.all(flight_number='AI202')] == ['Ann', 'Cat']
+
+
+def test_pages_by_id_until_the_last_page(store):
+    store.create_many([passenger(f'P{i}') for i in range(5)])
+    names = []
+    after = None
+    pages = 0
+    while True:
+        rows, after = store.page(2, after=after)
+        names.extend(row['name'] for row in rows)
+        pages += 1
+        if after is None:
+            break
+    assert names == [f'P{i}' for i in range(5)]
+    assert pages == 3
+
+
+def test_boarding_range_pages_by_time_then_id(store):
+    store.create_many([
+        passenger('Late', boarding_time='11:30'),
+        passenger('Early', boarding_time='09:00'),
+        passenger('Mid1', boarding_time='10:15'),
+        passenger('Mid2', boarding_time='10:15'),
+        passenger('Outside', boarding_time='12:00')
+    ])
+    rows, after = store.page(2, fields=('name',), boarding_from='09:00', boarding_to='11:30')
+    assert rows == [{'name': 'Early'}, {'name': 'Mid1'}]
+    assert after == ('10:15', 3)
+    assert parse_cursor(format_cursor(after), by_boarding=True) == after
+
+    rows, after = store.page(2, fields=('name',), boarding_from='09:00', boarding_to='11:30', after=after)
+    assert rows == [{'name': 'Mid2'}, {'name': 'Late'}]
+    assert after is None
+
+
+def test_iter_passengers_reads_in_batches(store):
+    store.create_many([passenger(f'P{i}') for i in range(7)])
+    assert [p['id'] for p in store.iter_passengers(fields=('id',), batch_size=3)] == list(range(1, 8))
+
+
+def test_parse_fields():
+    assert parse_fields(None) == ('id', 'name', 'flight_number', 'seat', 'boarding_time')
+    assert parse_fields('seat, name') == ('name', 'seat')
+    with pytest.raises(ValueError):
+        parse_fields('name,password')
+
+
+def test_parse_cursor():
+    assert parse_cursor(None, by_boarding=False) is None
+    assert parse_cursor('42', by_boarding=False) == 42
+    assert parse_cursor('10:15|7', by_boarding=True) == ('10:15', 7)
+    for text, by_boarding in (('abc', False), ('10:15', True), ('|7', True), ('10:15|x', True)):
+        with pytest.raises(ValueError):
+            parse_cursor(text, by_boarding)
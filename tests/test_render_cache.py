@@ -0,0 +1,89 @@
+import os
+import pytest
+from render_cache import RenderCache, write_atomic
+
+
+def writer(content, calls=None):
+    def render(fp):
+        if calls is not None:
+            calls.append(content)
+        fp.write(content)
+    return render
+
+
+def test_key_depends_on_kind_payload_and_options():
+    key = RenderCache.key('qr_code', 'ABC123', {'scale': 10})
+    assert key == RenderCache.key('qr_code', 'ABC123', {'scale': 10})
+    assert len(key) == 32
+    assert key != RenderCache.key('barcode', 'ABC123', {'scale': 10})
+    assert key != RenderCache.key('qr_code', 'ABC124', {'scale': 10})
+    assert key != RenderCache.key('qr_code', 'ABC123', {'scale': 8})
+
+
+def test_filename_is_sharded_by_key_prefix():
+    assert RenderCache.filename_for('qr_code', 'ab12cd') == 'ab/qr_code_ab12cd.png'
+    assert RenderCache.filename_for('document', 'ab12cd', 'pdf') == 'ab/document_ab12cd.pdf'
+
+
+def test_get_or_render_renders_once(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    calls = []
+    first = cache.get_or_render('qr_code', 'ABC123', writer(b'png', calls))
+    second = cache.get_or_render('qr_code', 'ABC123', writer(b'png', calls))
+
+    assert first == second
+    assert calls == [b'png']
+    with open(cache.path_for(first), 'rb') as fp:
+        assert fp.read() == b'png'
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_lookup_finds_files_rendered_by_another_process(tmp_path):
+    RenderCache(str(tmp_path)).get_or_render('barcode', 'ABC123', writer(b'png'))
+    cache = RenderCache(str(tmp_path))
+    key = cache.key('barcode', 'ABC123')
+
+    assert cache.lookup('barcode', key) == cache.filename_for('barcode', key)
+    assert cache.stats()['disk_hits'] == 1
+
+
+def test_evicted_file_is_rendered_again(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    calls = []
+    filename = cache.get_or_render('qr_code', 'ABC123', writer(b'png', calls))
+    os.remove(cache.path_for(filename))
+
+    assert cache.get_or_render('qr_code', 'ABC123', writer(b'png', calls)) == filename
+    assert calls == [b'png', b'png']
+    assert os.path.exists(cache.path_for(filename))
+
+
+def test_render_bytes_keeps_images_within_the_byte_budget(tmp_path):
+    cache = RenderCache(str(tmp_path), max_image_bytes=10)
+    calls = []
+    assert cache.render_bytes('qr_code', 'A', writer(b'123456', calls)) == b'123456'
+    assert cache.render_bytes('qr_code', 'A', writer(b'123456', calls)) == b'123456'
+    assert calls == [b'123456']
+
+    cache.render_bytes('qr_code', 'B', writer(b'abcdef'))
+    stats = cache.stats()
+    assert stats['inline_images'] == 1
+    assert stats['inline_bytes'] == 6
+    assert cache.cached_bytes(cache.key('qr_code', 'A')) is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_write_atomic_leaves_no_partial_file(tmp_path):
+    path = str(tmp_path / 'ab' / 'image.png')
+
+    def failing(fp):
+        fp.write(b'half')
+        raise RuntimeError('render failed')
+
+    with pytest.raises(RuntimeError):
+        write_atomic(path, failing)
+    assert os.listdir(tmp_path / 'ab') == []
+
+    write_atomic(path, writer(b'whole'))
+    assert os.listdir(tmp_path / 'ab') == ['image.png']
@@ -0,0 +1,76 @@
+import pytest
+from user_store import DuplicateEmail, UserStore, VersionConflict
+
+
+@pytest.fixture
+def store():
+    return UserStore()
+
+
+def test_ids_are_stable_and_never_reused(store):
+    ann = store.create({'name': 'Ann', 'email': 'ann@example.com'})
+    bob = store.create({'name': 'Bob', 'email': 'bob@example.com'})
+    store.delete(ann['id'])
+    cat = store.create({'name': 'Cat', 'email': 'cat@example.com'})
+
+    assert (ann['id'], bob['id'], cat['id']) == (1, 2, 3)
+    assert store.get(2)['name'] == 'Bob'
+    assert store.get(1) is None
+    assert len(store) == 2
+
+
+def test_emails_are_unique_ignoring_case_and_spaces(store):
+    store.create({'name': 'Ann', 'email': 'ann@example.com'})
+    with pytest.raises(DuplicateEmail):
+        store.create({'name': 'Impostor', 'email': ' ANN@example.com '})
+    assert store.get_by_email('Ann@Example.com')['name'] == 'Ann'
+
+
+def test_create_many_reports_duplicates_by_position(store):
+    store.create({'name': 'Ann', 'email': 'ann@example.com'})
+    created, errors = store.create_many([
+        {'name': 'Bob', 'email': 'bob@example.com'},
+        {'name': 'Ann again', 'email': 'ann@example.com'},
+        {'name': 'Bob again', 'email': 'BOB@example.com'}
+    ])
+    assert [user['name'] for user in created] == ['Bob']
+    assert [error['position'] for error in errors] == [1, 2]
+
+
+def test_update_bumps_the_version_and_checks_it(store):
+    user = store.create({'name': 'Ann', 'email': 'ann@example.com'})
+    assert user['version'] == 1
+
+    updated = store.update(user['id'], {'name': 'Ann B', 'email': 'ann.b@example.com'}, expected_version=1)
+    assert updated['version'] == 2
+    assert store.get_by_email('ann@example.com') is None
+    assert store.get_by_email('ann.b@example.com')['name'] == 'Ann B'
+
+    with pytest.raises(VersionConflict) as conflict:
+        store.update(user['id'], {'name': 'Lost update', 'email': 'ann.b@example.com'}, expected_version=1)
+    assert conflict.value.current_version == 2
+    assert store.get(user['id'])['name'] == 'Ann B'
+
+
+def test_update_rejects_another_users_email(store):
+    store.create({'name': 'Ann', 'email': 'ann@example.com'})
+    bob = store.create({'name': 'Bob', 'email': 'bob@example.com'})
+    with pytest.raises(DuplicateEmail):
+        store.update(bob['id'], {'name': 'Bob', 'email': 'ANN@example.com'})
+    assert store.update(99, {'name': 'Nobody', 'email': 'nobody@example.com'}) is None
+
+
+def test_delete_checks_the_version(store):
+    user = store.create({'name': 'Ann', 'email': 'ann@example.com'})
+    with pytest.raises(VersionConflict):
+        store.delete(user['id'], expected_version=2)
+    assert store.delete(user['id'], expected_version=1)['name'] == 'Ann'
+    assert store.delete(user['id']) is None
+    store.create({'name': 'Ann', 'email': 'ann@example.com'})
+
+
+def test_returned_users_are_copies(store):
+    user = store.create({'name': 'Ann', 'email': 'ann@example.com'})
+    user['name'] = 'Changed'
+    store.list()[0]['name'] = 'Changed'
+    assert store.get(user['id'])['name'] == 'Ann'
@@ -0,0 +1,115 @@
+import threading
+
+
+class DuplicateEmail(Exception):
+    """Raised when another user already has the email address"""
+
+
+class VersionConflict(Exception):
+    """Raised when a write names a version that is no longer current"""
+
+    def __init__(self, current_version):
+        super().__init__(f'User was modified (current version {current_version})')
+        self.current_version = current_version
+
+
+def email_key(email):
+    return email.strip().casefold()
+
+
+class UserStore:
+    """In-memory users keyed by stable ids, with a unique email index.
+
+    Ids come from a counter and are never reused, so deleting a user does
+    not renumber anyone else. Every user carries a `version` that goes up on
+    each update; writers pass the version they read as `expected_version`
+    and get VersionConflict instead of overwriting a newer change.
+    """
+
+    def __init__(self):
+        self._users = {}  # id -> user dict (including id and version)
+        self._by_email = {}  # email_key -> id
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def _insert(self, user):
+        key = email_key(user['email'])
+        if key in self._by_email:
+            raise DuplicateEmail(f"Email {user['email']} is already registered")
+        record = dict(user, id=self._next_id, version=1)
+        self._next_id += 1
+        self._users[record['id']] = record
+        self._by_email[key] = record['id']
+        return dict(record)
+
+    def create(self, user):
+        """Add a user dict and return it with its id and version; raises DuplicateEmail"""
+        with self._lock:
+            return self._insert(user)
+
+    def create_many(self, users):
+        """Add many users under one lock: returns (created, errors) with errors as {'position', 'error'}"""
+        created = []
+        errors = []
+        with self._lock:
+            for position, user in enumerate(users):
+                try:
+                    created.append(self._insert(user))
+                except DuplicateEmail as e:
+                    errors.append({'position': position, 'error': str(e)})
+        return created, errors
+
+    def get(self, user_id):
+        with self._lock:
+            user = self._users.get(user_id)
+            return None if user is None else dict(user)
+
+    def get_by_email(self, email):
+        with self._lock:
+            user_id = self._by_email.get(email_key(email))
+            return None if user_id is None else dict(self._users[user_id])
+
+    def list(self):
+        with self._lock:
+            return [dict(user) for user in self._users.values()]
+
+    def _check_version(self, user, expected_version):
+        if expected_version is not None and expected_version != user['version']:
+            raise VersionConflict(user['version'])
+
+    def update(self, user_id, changes, expected_version=None):
+        """Replace a user's fields; returns the new user, or None if there is no such user.
+
+        Raises VersionConflict when expected_version is given and stale, and
+        DuplicateEmail when the new email belongs to someone else.
+        """
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is None:
+                return None
+            self._check_version(user, expected_version)
+
+            old_key, new_key = email_key(user['email']), email_key(changes['email'])
+            if new_key != old_key and new_key in self._by_email:
+                raise DuplicateEmail(f"Email {changes['email']} is already registered")
+
+            record = dict(changes, id=user_id, version=user['version'] + 1)
+            self._users[user_id] = record
+            del self._by_email[old_key]
+            self._by_email[new_key] = user_id
+            return dict(record)
+
+    def delete(self, user_id, expected_version=None):
+        """Remove a user and return it, or None if there is no such user; raises VersionConflict"""
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is None:
+                return None
+            self._check_version(user, expected_version)
+            del self._users[user_id]
+            del self._by_email[email_key(user['email'])]
+            return user
+
+    def __len__(self):
+        with self._lock:
+            return len(self._users)
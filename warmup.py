@@ -0,0 +1,105 @@
+"""Start-up warm-up for the Flask and FastAPI entry points.
+
+The first request on a fresh worker used to pay for importing PIL, NumPy
+and qrcode, parsing fonts and building composer templates. warm_up() does
+all of that ahead of time: it imports the rendering stack (timing each
+import), loads the fonts and runs a dummy render of every document type.
+Run it in the gunicorn master with preload_app (see gunicorn.conf.py) and
+the forked workers share the warmed pages copy-on-write; run it before
+app.run() for the dev server.
+"""
+import importlib
+import sys
+import time
+from io import BytesIO
+
+# Heaviest first, so each module's time is its own rather than its dependencies'
+PRELOAD_MODULES = (
+    'numpy',
+    'PIL.Image',
+    'PIL.ImageDraw',
+    'PIL.ImageFont',
+    'qrcode',
+    'matrix_image',
+    'code128',
+    'bcbp',
+    'documents',
+    'composer',
+    'weather_model',
+    'airports'
+)
+
+# One payload per document type (documents.document_mode); every other field takes the form defaults
+SAMPLE_DOCUMENTS = {
+    'boarding_pass': {'firstName': 'Warm', 'lastName': 'Up'},
+    'e_ticket': {'etFirstName': 'Warm', 'etLastName': 'Up'},
+    'baggage_tag': {'bagFirstName': 'Warm', 'bagLastName': 'Up'}
+}
+
+
+def import_timed(names=PRELOAD_MODULES):
+    """Import modules in order; returns [(name, seconds, already_loaded)]"""
+    timings = []
+    for name in names:
+        already_loaded = name in sys.modules
+        started = time.perf_counter()
+        importlib.import_module(name)
+        timings.append((name, time.perf_counter() - started, already_loaded))
+    return timings
+
+
+def _warm_documents():
+    import composer
+    import documents
+    for data in SAMPLE_DOCUMENTS.values():
+        composer.render_document(data, BytesIO(), 'png')
+    data = SAMPLE_DOCUMENTS['boarding_pass']
+    documents.render_png('qr_code', documents.qr_payload(data))
+    documents.render_png('barcode', documents.barcode_payload(data))
+
+
+def _warm_weather():
+    import airports
+    import weather_model
+    weather_model.simulate_records(
+        [airport['lat'] for airport in airports.registry.values()],
+        [airport['lon'] for airport in airports.registry.values()]
+    )
+
+
+STEPS = (
+    ('documents', _warm_documents),
+    ('weather model', _warm_weather)
+)
+
+
+def warm_up(report=True):
+    """Import the rendering stack and run one render of everything; returns the timings"""
+    started = time.perf_counter()
+    imports = import_timed()
+    steps = []
+    for name, step in STEPS:
+        step_started = time.perf_counter()
+        try:
+            step()
+            steps.append((name, time.perf_counter() - step_started, None))
+        except Exception as e:
+            # A failed warm-up only costs the first request its speed, never the start-up
+            steps.append((name, time.perf_counter() - step_started, str(e)))
+
+    timings = {
+        'imports': imports,
+        'steps': steps,
+        'total_seconds': time.perf_counter() - started
+    }
+    if report:
+        print_report(timings)
+    return timings
+
+
+def print_report(timings):
+    print(f"Warm-up finished in {timings['total_seconds'] * 1000:.0f} ms")
+    for name, seconds, already_loaded in timings['imports']:
+        print(f"   import {name:<16} {seconds * 1000:8.1f} ms{' (already loaded)' if already_loaded else ''}")
+    for name, seconds, error in timings['steps']:
+        print(f"   warm   {name:<16} {seconds * 1000:8.1f} ms{f' FAILED: {error}' if error else ''}")
@@ -1,122 +1,63 @@
 from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import requests
 import time
+import airports
+from airport_listing import AirportListing
+from simulated_weather import SimulatedWeather
+from weather_cache import WeatherCache
+from weather_prefetch import WeatherPrefetcher
+from weather_provider import WeatherProvider
 
 app = Flask(__name__)
 CORS(app)
 
 # Airport data with coordinates for real weather API
-AIRPORT_DATA = {
-    'DEL': {'city': 'Delhi', 'lat': 28.6139, 'lon': 77.2090},
-    'BOM': {'city': 'Mumbai', 'lat': 19.0760, 'lon': 72.8777},
-    'BLR': {'city': 'Bangalore', 'lat': 12.9716, 'lon': 77.5946},
-    'MAA': {'city': 'Chennai', 'lat': 13.0827, 'lon': 80.2707},
-    'HYD': {'city': 'Hyderabad', 'lat': 17.3850, 'lon': 78.4867},
-    'CCU': {'city': 'Kolkata', 'lat': 22.5726, 'lon': 88.3639},
-    'AMD': {'city': 'Ahmedabad', 'lat': 23.0225, 'lon': 72.5714},
-    'GOI': {'city': 'Goa', 'lat': 15.2993, 'lon': 74.1240},
-    'PNQ': {'city': 'Pune', 'lat': 18.5204, 'lon': 73.8567},
-    'COK': {'city': 'Kochi', 'lat': 9.9312, 'lon': 76.2673}
-}
-
-# Weather emoji mapping
-WEATHER_EMOJI = {
-    'clear': '☀️',
-    'clouds': '☁️',
-    'rain': '🌧️',
-    'drizzle': '🌦️',
-    'thunderstorm': '⛈️',
-    'snow': '❄️',
-    'mist': '🌫️',
-    'fog': '🌫️',
-    'haze': '🌫️',
-    'smoke': '🌫️'
-}
-
-# Cache for weather data to avoid too many API calls
-weather_cache = {}
-CACHE_DURATION = 300  # 5 minutes
-
-def get_emoji_for_weather(condition):
-    """Get appropriate emoji for weather condition"""
-    condition_lower = condition.lower()
-    for key, emoji in WEATHER_EMOJI.items():
-        if key in condition_lower:
-            return emoji
-    return '🌤️'  # Default emoji
-
-def fetch_real_weather(lat, lon):
-    """Fetch real weather data from OpenWeatherMap API"""
-    try:
-        # Using OpenWeatherMap API (free tier)
-        api_key = "demo_key"  # In production, use a real API key
-        url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={api_key}&units=metric"
-        
-        # For demo purposes, we'll use mock data that simulates real conditions
-        # In production, uncomment the following lines:
-        # response = requests.get(url, timeout=10)
-        # response.raise_for_status()
-        # data = response.json()
-        
-        # Mock data that simulates real weather patterns
-        current_hour = datetime.now().hour
-        current_month = datetime.now().month
-        
-        # Simulate weather based on time of day and season
-        if 6 <= current_hour <= 18:  # Daytime
-            if current_month in [12, 1, 2]:  # Winter
-                temp = 18 + (current_hour - 6)  # 18-30°C range
-                conditions = ['clear', 'clouds', 'clear']
-            elif current_month in [3, 4, 5]:  # Spring
-                temp = 25 + (current_hour - 6)  # 25-37°C range
-                conditions = ['clear', 'haze', 'clear']
-            else:  # Summer/Monsoon
-                temp = 28 + (current_hour - 6)  # 28-40°C range
-                conditions = ['clear', 'clouds', 'rain']
-        else:  # Nighttime
-            if current_month in [12, 1, 2]:  # Winter
-                temp = 12 + (current_hour / 4)  # 12-18°C range
-                conditions = ['clear', 'mist', 'clear']
-            else:  # Other seasons
-                temp = 20 + (current_hour / 6)  # 20-26°C range
-                conditions = ['clear', 'clouds', 'clear']
-        
-        # Add some randomness based on airport location
-        import random
-        condition = random.choice(conditions)
-        temp_variation = random.uniform(-2, 2)
-        temp += temp_variation
-        
-        descriptions = {
-            'clear': 'Clear sky',
-            'clouds': 'Partly cloudy',
-            'rain': 'Light rain',
-            'haze': 'Hazy',
-            'mist': 'Misty',
-            'drizzle': 'Drizzling'
-        }
-        
-        return {
-            'temperature': round(temp),
-            'description': descriptions.get(condition, 'Clear'),
-            'main': condition.capitalize(),
-            'humidity': random.randint(40, 80),
-            'wind_speed': round(random.uniform(1, 15), 1)
-        }
-        
-    except Exception as e:
-        print(f"Error fetching weather data: {e}")
-        # Fallback data
-        return {
-            'temperature': 25,
-            'description': 'Weather unavailable',
-            'main': 'Clear',
-            'humidity': 50,
-            'wind_speed': 5.0
-        }
+AIRPORT_DATA = airports.registry
+airport_listing = AirportListing(AIRPORT_DATA, max_age=int(os.environ.get('AIRPORTS_MAX_AGE', 3600)))
+
+# Cache for weather data to avoid too many API calls: TTL + LRU, bounded in size.
+# Set WEATHER_CACHE_DB to a SQLite path to share one cache between all workers on the host.
+CACHE_DURATION = int(os.environ.get('WEATHER_CACHE_TTL', 300))  # 5 minutes
+# Past the TTL, entries are still served for this long while a background refresh runs
+STALE_DURATION = int(os.environ.get('WEATHER_CACHE_STALE', 600))
+weather_cache = WeatherCache(
+    ttl=CACHE_DURATION,
+    stale_ttl=STALE_DURATION,
+    max_entries=int(os.environ.get('WEATHER_CACHE_SIZE', 1024)),
+    db_path=os.environ.get('WEATHER_CACHE_DB')
+)
+
+# Bulk requests fetch cache misses concurrently instead of one after another
+WEATHER_FETCH_WORKERS = int(os.environ.get('WEATHER_FETCH_WORKERS', 8))
+MAX_BULK_AIRPORTS = int(os.environ.get('MAX_BULK_AIRPORTS', 100))
+fetch_pool = None
+WEATHER_API_URL = os.environ.get('WEATHER_API_URL')
+
+# Real weather comes from an OpenWeatherMap-compatible API when WEATHER_API_URL is set
+# (https://api.openweathermap.org, or weather_stub_server.py for local testing)
+weather_provider = None
+if WEATHER_API_URL:
+    weather_provider = WeatherProvider(
+        WEATHER_API_URL,
+        os.environ.get('WEATHER_API_KEY', 'demo_key'),
+        # None tells SimulatedWeather to use the model, which needs the airport code
+        fallback=lambda lat, lon: None,
+        pool_size=WEATHER_FETCH_WORKERS,
+        connect_timeout=float(os.environ.get('WEATHER_CONNECT_TIMEOUT', 1.0)),
+        read_timeout=float(os.environ.get('WEATHER_READ_TIMEOUT', 2.0)),
+        retries=int(os.environ.get('WEATHER_RETRIES', 2))
+    )
+
+simulated_weather = SimulatedWeather(
+    AIRPORT_DATA,
+    weather_cache,
+    provider=weather_provider.fetch if weather_provider else None,
+    submit=lambda *args: get_fetch_pool().submit(*args)
+)
 
 @app.route('/')
 def serve_index():
@@ -137,6 +78,20 @@ def health_check():
         'version': '1.0.0'
     })
 
+# Keep every listed airport warm so requests never wait on the provider
+weather_prefetcher = WeatherPrefetcher(
+    simulated_weather.refresh,
+    airports=airports.PREFETCH_AIRPORTS,
+    interval=int(os.environ.get('WEATHER_PREFETCH_INTERVAL', 240)),
+    submit=lambda fn, code: get_fetch_pool().submit(fn, code),
+    refresh_many=simulated_weather.refresh_many if weather_provider is None else None
+)
+
+@app.before_request
+def start_background_workers():
+    # Started lazily so each forked gunicorn worker gets its own thread
+    weather_prefetcher.start()
+
 @app.route('/api/weather/<airport_code>')
 def get_weather(airport_code):
     airport_code = airport_code.upper()
@@ -145,89 +100,53 @@ def get_weather(airport_code):
         return jsonify({
             'success': False,
             'error': f'Airport code {airport_code} not found',
-            'available_airports': list(AIRPORT_DATA.keys())
+            'suggestions': AIRPORT_DATA.suggest(airport_code)
         }), 404
     
-    # Check cache first
-    cache_key = f"{airport_code}_{datetime.now().strftime('%Y%m%d%H')}"
-    if cache_key in weather_cache:
-        cached_data = weather_cache[cache_key]
-        if time.time() - cached_data['timestamp'] < CACHE_DURATION:
-            return jsonify(cached_data['data'])
-    
     try:
-        airport = AIRPORT_DATA[airport_code]
-        weather_data = fetch_real_weather(airport['lat'], airport['lon'])
-        
-        response_data = {
-            'success': True,
-            'airport_code': airport_code,
-            'city': airport['city'],
-            'temperature': weather_data['temperature'],
-            'description': weather_data['description'],
-            'main': weather_data['main'],
-            'emoji': get_emoji_for_weather(weather_data['main']),
-            'humidity': weather_data['humidity'],
-            'wind_speed': weather_data['wind_speed'],
-            'timestamp': datetime.now().isoformat(),
-            'source': 'simulated_realtime'
-        }
-        
-        # Cache the response
-        weather_cache[cache_key] = {
-            'data': response_data,
-            'timestamp': time.time()
-        }
-        
-        return jsonify(response_data)
+        # Served from cache (stale entries refresh in the background); concurrent misses share one fetch
+        return jsonify(simulated_weather.get(airport_code))
         
     except Exception as e:
         print(f"Error processing weather request: {e}")
-        return jsonify({
-            'success': False,
-            'error': 'Unable to fetch weather data',
-            'airport_code': airport_code,
-            'city': AIRPORT_DATA.get(airport_code, {}).get('city', 'Unknown')
-        }), 500
-
-@app.route('/api/airports')
-def list_airports():
-    airports_list = []
-    for code, info in AIRPORT_DATA.items():
-        airports_list.append({
-            'code': code,
-            'city': info['city'],
-            'coordinates': {
-                'lat': info['lat'],
-                'lon': info['lon']
-            }
-        })
-    
+        return jsonify(simulated_weather.error(airport_code)), 500
+
+@app.route('/api/weather/stats')
+def weather_cache_stats():
+    """Hit/miss counters for the weather cache"""
     return jsonify({
         'success': True,
-        'airports': airports_list,
-        'count': len(airports_list)
+        'cache': weather_cache.stats(),
+        'prefetch': weather_prefetcher.stats(),
+        'provider': weather_provider.stats() if weather_provider else None
     })
 
+airport_listing.add_route(app)
+
+def get_fetch_pool():
+    """Return the thread pool used for concurrent weather fetches, creating it on first use"""
+    global fetch_pool
+    if fetch_pool is None:
+        fetch_pool = ThreadPoolExecutor(max_workers=WEATHER_FETCH_WORKERS, thread_name_prefix='weather-fetch')
+    return fetch_pool
+
 @app.route('/api/weather/bulk')
 def get_bulk_weather():
-    """Get weather for multiple airports at once"""
+    """Get weather for multiple airports at once.
+
+    Cached airports are answered directly; the rest are fetched concurrently
+    (sharing any fetch already running for the same airport) and the whole
+    response is serialized once.
+    """
     airports_param = request.args.get('airports', 'DEL,BOM')
     airport_codes = [code.strip().upper() for code in airports_param.split(',')]
-    
-    results = {}
-    for code in airport_codes:
-        if code in AIRPORT_DATA:
-            # Use the existing weather endpoint logic
-            weather_response = get_weather(code)
-            results[code] = weather_response.get_json()
-        else:
-            results[code] = {
-                'success': False,
-                'error': f'Airport {code} not found'
-            }
-    
-    return jsonify(results)
+    if len(airport_codes) > MAX_BULK_AIRPORTS:
+        return jsonify({
+            'success': False,
+            'error': f'Too many airports (max {MAX_BULK_AIRPORTS})'
+        }), 400
+
+    return jsonify(simulated_weather.bulk(airport_codes))
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
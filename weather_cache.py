@@ -0,0 +1,261 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class WeatherCache:
+    """TTL + LRU cache for weather responses, optionally shared through SQLite.
+
+    Entries live in a bounded in-memory LRU and are fresh for `ttl` seconds
+    after they were stored. With `db_path` set, entries are also written to a
+    local SQLite database so every gunicorn worker on the host reads one warm
+    cache instead of each fetching its own copy.
+
+    `get_or_fetch` keeps expiry off the request path: for `stale_ttl` seconds
+    after an entry goes stale it is still served while one background refresh
+    runs, and concurrent misses for a key share a single fetch. A stale
+    entry is first checked against the shared table, which another worker
+    may already have refreshed. Refreshes run on a pool of at most
+    `refresh_workers` threads.
+    """
+
+    def __init__(self, ttl=300, max_entries=1024, db_path=None, purge_interval=60, stale_ttl=600,
+                 refresh_workers=4):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.purge_interval = purge_interval
+        self.refresh_workers = refresh_workers
+        self._refresh_pool = None
+        self._refresh_pool_pid = None
+        self._entries = OrderedDict()  # key -> (fresh_until, expires_at, value)
+        self._inflight = {}  # key -> Future of the fetch currently running for it
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_purge = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.stale_hits = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        if db_path:
+            self._create_schema()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _create_schema(self):
+        conn = self._connect()
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(weather_cache)')]
+        if columns and 'fresh_until' not in columns:
+            # Table from before stale-while-revalidate; its rows are only a cache, so rebuild it
+            conn.execute('DROP TABLE weather_cache')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS weather_cache (
+                cache_key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                fresh_until REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_weather_cache_expires ON weather_cache (expires_at)')
+
+    def get(self, key):
+        """Return the cached value for key, or None if it is missing or no longer fresh"""
+        entry = self._lookup(key)
+        with self._lock:
+            if entry is None or not entry[0]:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry[1]
+
+    def get_or_fetch(self, key, fetch):
+        """Return the value for key, calling fetch() to produce it when needed.
+
+        Fresh entries are returned directly. Stale entries are returned as
+        well and refreshed once in the background. On a miss only one caller
+        runs fetch(); concurrent callers for the same key wait for its result.
+        """
+        return self.fetch_async(key, fetch).result()
+
+    def fetch_async(self, key, fetch, submit=None):
+        """Like get_or_fetch, but return a Future.
+
+        Hits come back as completed futures. A miss runs fetch() through
+        `submit` (e.g. an executor's submit) when given, else in the caller.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            fresh, value = entry
+            with self._lock:
+                if fresh:
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+            if not fresh:
+                self._refresh_in_background(key, fetch)
+            future = Future()
+            future.set_result(value)
+            return future
+
+        with self._lock:
+            self.misses += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = self._inflight[key] = Future()
+
+        if submit is None:
+            self._run_fetch(key, fetch, future)
+        else:
+            submit(self._run_fetch, key, fetch, future)
+        return future
+
+    def _run_fetch(self, key, fetch, future):
+        try:
+            value = fetch()
+            self.set(key, value)
+            future.set_result(value)
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh_in_background(self, key, fetch):
+        with self._lock:
+            if key in self._inflight:
+                return
+            future = self._inflight[key] = Future()
+            self.refreshes += 1
+
+        def refresh():
+            self._run_fetch(key, fetch, future)
+            if future.exception() is not None:
+                with self._lock:
+                    self.refresh_errors += 1
+                print(f"Weather refresh for {key} failed, serving stale data: {future.exception()}")
+
+        self._get_refresh_pool().submit(refresh)
+
+    def _get_refresh_pool(self):
+        """Return the refresh thread pool, creating it on first use and again after a fork"""
+        with self._lock:
+            if self._refresh_pool is None or self._refresh_pool_pid != os.getpid():
+                self._refresh_pool = ThreadPoolExecutor(max_workers=self.refresh_workers,
+                                                        thread_name_prefix='weather-refresh')
+                self._refresh_pool_pid = os.getpid()
+            return self._refresh_pool
+
+    def _lookup(self, key):
+        """Return (fresh, value) for a usable entry, or None; hit counters are left to the caller"""
+        now = time.time()
+        stale = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                fresh_until, expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    if fresh_until > now or not self.db_path:
+                        return fresh_until > now, value
+                    # Another worker may have refreshed the shared row already
+                    stale = value
+                else:
+                    del self._entries[key]
+                    self.expired += 1
+
+        if self.db_path:
+            try:
+                row = self._connect().execute(
+                    'SELECT value, fresh_until, expires_at FROM weather_cache WHERE cache_key = ? AND expires_at > ?',
+                    (key, now)
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Shared weather cache unavailable: {e}")
+                row = None
+            if row is not None and (stale is None or row[1] > now):
+                value = json.loads(row[0])
+                self._remember(key, value, row[1], row[2])
+                with self._lock:
+                    self.shared_hits += 1
+                return row[1] > now, value
+        if stale is not None:
+            return False, stale
+        return None
+
+    def set(self, key, value, ttl=None):
+        """Store a JSON-serializable value, fresh for ttl seconds (defaults to the cache TTL)"""
+        fresh_until = time.time() + (self.ttl if ttl is None else ttl)
+        expires_at = fresh_until + self.stale_ttl
+        self._remember(key, value, fresh_until, expires_at)
+
+        if self.db_path:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO weather_cache (cache_key, value, fresh_until, expires_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    (key, json.dumps(value), fresh_until, expires_at)
+                )
+                self._purge_expired(conn)
+            except sqlite3.Error as e:
+                print(f"Shared weather cache unavailable: {e}")
+
+    def _remember(self, key, value, fresh_until, expires_at):
+        with self._lock:
+            self._entries[key] = (fresh_until, expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _purge_expired(self, conn):
+        now = time.time()
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        conn.execute('DELETE FROM weather_cache WHERE expires_at < ?', (now,))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            self._connect().execute('DELETE FROM weather_cache')
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'stale_ttl_seconds': self.stale_ttl,
+                'shared': bool(self.db_path),
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'refreshes': self.refreshes,
+                'refresh_errors': self.refresh_errors,
+                'expired': self.expired,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,144 @@
+"""Vectorized simulated weather for many airports at once.
+
+Every value is a pure function of (location, hour): random draws come from
+a counter-based hash (splitmix64) of the rounded coordinates, the hour and
+a per-variable stream id rather than from a shared RNG. The same airport
+therefore gets the same weather for the whole hour in every worker, so
+results can be cached and compared, and a whole departures board is one
+set of array operations instead of a loop of random.uniform calls.
+"""
+import time
+import numpy as np
+
+# (main, description) pairs, OpenWeatherMap style
+CONDITIONS = [
+    ('Clear', 'Clear sky'),
+    ('Clouds', 'Partly cloudy'),
+    ('Haze', 'Hazy'),
+    ('Mist', 'Misty'),
+    ('Drizzle', 'Drizzling'),
+    ('Rain', 'Light rain'),
+    ('Thunderstorm', 'Thunderstorm')
+]
+CLEAR, CLOUDS, HAZE, MIST, DRIZZLE, RAIN, THUNDERSTORM = range(len(CONDITIONS))
+EMOJI = {
+    'Clear': '☀️',
+    'Clouds': '☁️',
+    'Haze': '🌫️',
+    'Mist': '🌫️',
+    'Drizzle': '🌦️',
+    'Rain': '🌧️',
+    'Thunderstorm': '⛈️',
+    # Only reported by real providers
+    'Snow': '❄️',
+    'Fog': '🌫️',
+    'Smoke': '🌫️'
+}
+
+# Typical temperatures for the home airports; everywhere else the mean is
+# derived from latitude
+BASE_TEMPS = {
+    'DEL': 25, 'BOM': 28, 'BLR': 26, 'MAA': 30, 'HYD': 29,
+    'CCU': 27, 'AMD': 32, 'GOI': 27, 'PNQ': 26, 'COK': 28
+}
+
+# Stream ids keep the draws for different variables independent
+TEMPERATURE_STREAM, HUMIDITY_STREAM, WIND_STREAM, CONDITION_STREAM = 1, 2, 3, 4
+
+
+def _splitmix64(values):
+    """splitmix64 finalizer on a uint64 array (arithmetic wraps modulo 2**64)"""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _uniform(keys, stream):
+    """Deterministic uniform [0, 1) draws, one per key"""
+    with np.errstate(over='ignore'):
+        bits = _splitmix64(keys ^ _splitmix64(np.full_like(keys, stream)))
+    return (bits >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def location_keys(lats, lons, hour):
+    """Per-(location, hour) hash keys; coordinates are rounded to ~1 km"""
+    lat_ids = np.round((np.asarray(lats, dtype=np.float64) + 90) * 100).astype(np.uint64)
+    lon_ids = np.round((np.asarray(lons, dtype=np.float64) + 180) * 100).astype(np.uint64)
+    location = (lat_ids << np.uint64(16)) | lon_ids
+    with np.errstate(over='ignore'):
+        return _splitmix64((location << np.uint64(24)) ^ np.uint64(hour))
+
+
+def simulate(lats, lons, timestamp=None, base_temps=None):
+    """Simulate current weather for arrays of coordinates.
+
+    Returns a dict of equally sized arrays: temperature (deg C, rounded),
+    humidity (%), wind_speed (m/s) and condition (index into CONDITIONS).
+    `base_temps` optionally overrides the latitude-derived mean temperature
+    per location (NaN keeps the derived value).
+    """
+    timestamp = time.time() if timestamp is None else timestamp
+    hour = int(timestamp // 3600)
+    # Everything below sees the start of the hour, so values hold for the whole hour
+    timestamp = hour * 3600
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    keys = location_keys(lats, lons, hour)
+
+    # Climate: warm tropics, cooler towards the poles, seasons flipped in the south
+    day_of_year = (timestamp / 86400) % 365.25
+    mean = 27 - 0.45 * np.clip(np.abs(lats) - 15, 0, None)
+    if base_temps is not None:
+        base_temps = np.asarray(base_temps, dtype=np.float64)
+        mean = np.where(np.isnan(base_temps), mean, base_temps)
+    season = np.cos(2 * np.pi * (day_of_year - 196) / 365.25) * np.sign(lats) * np.abs(lats) * 0.25
+
+    # Day/night cycle on local solar time, warmest mid-afternoon
+    local_hour = (timestamp / 3600 + lons / 15) % 24
+    diurnal = 5 * np.cos(2 * np.pi * (local_hour - 15) / 24)
+
+    temperature = mean + season + diurnal + (_uniform(keys, TEMPERATURE_STREAM) * 4 - 2)
+    humidity = 40 + _uniform(keys, HUMIDITY_STREAM) * 45
+    wind_speed = 1 + _uniform(keys, WIND_STREAM) * 14
+
+    draw = _uniform(keys, CONDITION_STREAM)
+    night = (local_hour < 6) | (local_hour > 20)
+    condition = np.select(
+        [
+            (humidity > 80) & (draw < 0.15),
+            (humidity > 78) & (draw < 0.55),
+            (humidity > 72) & (draw < 0.5),
+            night & (humidity > 65) & (draw < 0.6),
+            (temperature > 30) & (humidity < 55) & (draw < 0.5),
+            draw < 0.35
+        ],
+        [THUNDERSTORM, RAIN, DRIZZLE, MIST, HAZE, CLOUDS],
+        default=CLEAR
+    )
+
+    return {
+        'temperature': np.round(temperature).astype(int),
+        'humidity': np.round(humidity).astype(int),
+        'wind_speed': np.round(wind_speed, 1),
+        'condition': condition
+    }
+
+
+def simulate_records(lats, lons, timestamp=None, base_temps=None):
+    """simulate() as one dict per location with main/description strings"""
+    weather = simulate(lats, lons, timestamp, base_temps)
+    records = []
+    for temperature, humidity, wind_speed, condition in zip(
+        weather['temperature'].tolist(), weather['humidity'].tolist(),
+        weather['wind_speed'].tolist(), weather['condition'].tolist()
+    ):
+        main, description = CONDITIONS[condition]
+        records.append({
+            'temperature': temperature,
+            'description': description,
+            'main': main,
+            'humidity': humidity,
+            'wind_speed': wind_speed
+        })
+    return records
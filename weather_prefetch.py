@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+# (from, to, date, time) request fields for each document type
+DEPARTURE_FIELDS = [
+    ('etFrom', 'etTo', 'etDate', 'etTime'),
+    ('bagFrom', 'bagTo', 'bagDate', 'bagTime'),
+    ('from', 'to', 'date', 'time')
+]
+
+
+def parse_departure(date, time_of_day):
+    """Parse form date/time strings ('2025-09-10', '13:15') into a timestamp, or None"""
+    if not date:
+        return None
+    try:
+        return datetime.strptime(f"{date} {time_of_day or '00:00'}", '%Y-%m-%d %H:%M').timestamp()
+    except ValueError:
+        return None
+
+
+class DepartureBoard:
+    """Upcoming departures seen in document requests, used to decide which airports to keep warm.
+
+    Every boarding pass or e-ticket names its origin, destination and
+    departure time; both airports are remembered until their last known
+    flight has left. Only one entry is kept per airport, its next and last
+    departure, so a full flight's worth of passes costs one entry rather
+    than one per passenger.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._airports = {}  # airport_code -> [next_departure, last_departure]
+        self._lock = threading.Lock()
+
+    def record(self, airport_code, departs_at):
+        now = time.time()
+        if departs_at < now:
+            return
+        with self._lock:
+            entry = self._airports.get(airport_code)
+            if entry is not None:
+                if entry[0] < now or departs_at < entry[0]:
+                    entry[0] = departs_at
+                entry[1] = max(entry[1], departs_at)
+                return
+            if len(self._airports) >= self.max_entries:
+                self._prune(now)
+            if len(self._airports) >= self.max_entries:
+                # Make room by forgetting the airport whose flights leave soonest
+                del self._airports[min(self._airports, key=lambda code: self._airports[code][1])]
+            self._airports[airport_code] = [departs_at, departs_at]
+
+    def _prune(self, now):
+        for code in [code for code, (_, last) in self._airports.items() if last < now]:
+            del self._airports[code]
+
+    def record_document(self, data):
+        """Remember the airports of a document request payload; ignores payloads without a usable departure"""
+        for from_key, to_key, date_key, time_key in DEPARTURE_FIELDS:
+            if from_key in data:
+                departs_at = parse_departure(data.get(date_key), data.get(time_key))
+                if departs_at is None or departs_at < time.time():
+                    return
+                for key in (from_key, to_key):
+                    if data.get(key):
+                        self.record(str(data[key]).upper(), departs_at)
+                return
+
+    def airports_departing(self, within_hours):
+        """Airport codes with a departure between now and now + within_hours"""
+        now = time.time()
+        horizon = now + within_hours * 3600
+        with self._lock:
+            self._prune(now)
+            codes = set()
+            for code, entry in self._airports.items():
+                if entry[0] < now:
+                    # The next known flight has left; later ones in between are not tracked
+                    entry[0] = entry[1]
+                if entry[0] <= horizon:
+                    codes.add(code)
+            return codes
+
+    def __len__(self):
+        with self._lock:
+            return len(self._airports)
+
+
+class WeatherPrefetcher:
+    """Refresh weather on a timer so request paths find it in the cache.
+
+    Each pass refreshes the `airports` that should always be warm plus every
+    airport on the departure board with a departure in the next
+    `horizon_hours`. `refresh(code)` fetches one airport and stores it; run
+    the pass more often than the cache TTL so entries never go stale. When
+    the source can produce many airports in one call, `refresh_many(codes)`
+    refreshes the whole pass at once and returns how many it stored.
+    """
+
+    def __init__(self, refresh, airports=(), departures=None, interval=240, horizon_hours=6, submit=None,
+                 refresh_many=None):
+        self.refresh = refresh
+        self.refresh_many = refresh_many
+        self.airports = airports
+        self.departures = departures
+        self.interval = interval
+        self.horizon_hours = horizon_hours
+        self.submit = submit
+        self._lock = threading.Lock()
+        self._started_pid = None
+        self.runs = 0
+        self.refreshed = 0
+        self.errors = 0
+        self.last_run = None
+        self.last_airports = 0
+        self.last_duration = 0.0
+
+    def start(self):
+        """Start the prefetch thread for this process (safe to call repeatedly and after fork)"""
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+        thread = threading.Thread(target=self._run, name='weather-prefetch', daemon=True)
+        thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.prefetch()
+            except Exception as e:
+                print(f"Weather prefetch failed: {e}")
+            time.sleep(self.interval)
+
+    def targets(self):
+        codes = set(self.airports)
+        if self.departures is not None:
+            codes |= self.departures.airports_departing(self.horizon_hours)
+        return sorted(codes)
+
+    def prefetch(self):
+        """Refresh every target airport once; returns the number refreshed"""
+        started = time.monotonic()
+        codes = self.targets()
+
+        if self.refresh_many is not None:
+            refreshed = self._refresh_all(codes)
+        # Fan out through the caller's executor when given, so slow providers overlap
+        elif self.submit is not None:
+            outcomes = [self.submit(self._refresh_one, code) for code in codes]
+            refreshed = sum(1 for outcome in outcomes if outcome.result())
+        else:
+            refreshed = sum(1 for code in codes if self._refresh_one(code))
+
+        with self._lock:
+            self.runs += 1
+            self.refreshed += refreshed
+            self.errors += len(codes) - refreshed
+            self.last_run = time.time()
+            self.last_airports = len(codes)
+            self.last_duration = time.monotonic() - started
+        return refreshed
+
+    def _refresh_one(self, code):
+        try:
+            self.refresh(code)
+            return True
+        except Exception as e:
+            print(f"Weather prefetch for {code} failed: {e}")
+            return False
+
+    def _refresh_all(self, codes):
+        try:
+            return self.refresh_many(codes)
+        except Exception as e:
+            print(f"Weather prefetch for {len(codes)} airports failed: {e}")
+            return 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'interval_seconds': self.interval,
+                'horizon_hours': self.horizon_hours,
+                'departure_airports': len(self.departures) if self.departures is not None else None,
+                'runs': self.runs,
+                'refreshed': self.refreshed,
+                'errors': self.errors,
+                'last_run': self.last_run,
+                'last_airports': self.last_airports,
+                'last_duration_seconds': round(self.last_duration, 4)
+            }
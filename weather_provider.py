@@ -0,0 +1,200 @@
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ProviderError(Exception):
+    """Raised when the weather provider cannot be reached or returns an unusable reply"""
+
+
+class ProviderRejected(ProviderError):
+    """Raised for a 4xx reply: the provider is up but refuses the request, so retrying will not help"""
+
+
+class CircuitBreaker:
+    """Stop calling a failing provider for a while instead of waiting on every request.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    calls are refused for `reset_after` seconds; then a single trial call is
+    let through (half-open) and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold=5, reset_after=30):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """Return True if a call may go out now"""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def release(self):
+        """End a call that says nothing about the provider's health (a half-open trial may run again)"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class WeatherProvider:
+    """Client for an OpenWeatherMap-compatible current weather API.
+
+    All calls share one keep-alive connection pool, use short connect/read
+    timeouts and retry a bounded number of times with jittered exponential
+    backoff. When the provider keeps failing the circuit breaker opens and
+    `fallback(lat, lon)` answers instead, so a provider outage never blocks
+    request threads.
+    """
+
+    def __init__(self, base_url, api_key, fallback, pool_size=20, connect_timeout=1.0,
+                 read_timeout=2.0, retries=2, backoff=0.1, failure_threshold=5, reset_after=30):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.fallback = fallback
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_after)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.fallbacks = 0
+
+        self.session = requests.Session()
+        # Retries are handled here (with jitter), not by urllib3
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(self, lat, lon):
+        """Return current weather for a location, falling back when the provider is unavailable"""
+        if not self.breaker.allow():
+            return self._fallback(lat, lon)
+
+        try:
+            weather = self._fetch_with_retries(lat, lon)
+        except ProviderRejected as e:
+            # The provider answered, so this does not count towards opening the breaker
+            print(f"Weather provider rejected the request: {e}")
+            self.breaker.release()
+            with self._lock:
+                self.failures += 1
+            return self._fallback(lat, lon)
+        except ProviderError as e:
+            print(f"Weather provider failed: {e}")
+            self.breaker.record_failure()
+            with self._lock:
+                self.failures += 1
+            return self._fallback(lat, lon)
+        except BaseException:
+            # Never leave a half-open trial marked as running
+            self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success()
+        return weather
+
+    def _fallback(self, lat, lon):
+        with self._lock:
+            self.fallbacks += 1
+        return self.fallback(lat, lon)
+
+    def _fetch_with_retries(self, lat, lon):
+        for attempt in range(self.retries + 1):
+            if attempt:
+                with self._lock:
+                    self.retried += 1
+                # Full jitter keeps retries from many workers from arriving in lockstep
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+            try:
+                return self._request(lat, lon)
+            except ProviderRejected:
+                raise
+            except ProviderError as e:
+                error = e
+        raise error
+
+    def _request(self, lat, lon):
+        with self._lock:
+            self.requests += 1
+        try:
+            response = self.session.get(
+                f"{self.base_url}/data/2.5/weather",
+                params={'lat': lat, 'lon': lon, 'appid': self.api_key, 'units': 'metric'},
+                timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            raise ProviderError(str(e))
+
+        if response.status_code in RETRY_STATUSES:
+            raise ProviderError(f'HTTP {response.status_code}')
+        if 400 <= response.status_code < 500:
+            raise ProviderRejected(f'HTTP {response.status_code}')
+        try:
+            response.raise_for_status()
+            return self.parse(response.json())
+        except Exception as e:
+            # Any reply parse() cannot handle (wrong types, a list body, ...) is a provider failure
+            raise ProviderError(f'Unusable response: {e!r}')
+
+    @staticmethod
+    def parse(data):
+        """Map an OpenWeatherMap reply onto the fields the weather endpoints return"""
+        condition = data['weather'][0]
+        return {
+            'temperature': round(data['main']['temp']),
+            'description': condition['description'].capitalize(),
+            'main': condition['main'],
+            'humidity': data['main']['humidity'],
+            'wind_speed': round(data['wind']['speed'], 1),
+            'source': 'provider'
+        }
+
+    def stats(self):
+        with self._lock:
+            return {
+                'base_url': self.base_url,
+                'requests': self.requests,
+                'retries': self.retried,
+                'failures': self.failures,
+                'fallbacks': self.fallbacks,
+                'circuit': self.breaker.state
+            }
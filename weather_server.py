@@ -1,12 +1,12 @@
 from flask import Flask, render_template, request, jsonify, send_from_directory
 from flask_cors import CORS
-import qrcode
-import barcode
-from barcode.writer import ImageWriter
 import os
 from datetime import datetime
 import uuid
 import random
+import documents
+import airports
+from airport_listing import AirportListing
 
 app = Flask(__name__)
 CORS(app)
@@ -18,18 +18,8 @@ IMAGES_FOLDER = 'static/images'
 os.makedirs(os.path.join(app.root_path, IMAGES_FOLDER), exist_ok=True)
 
 # Airport data
-AIRPORT_DATA = {
-    'DEL': {'city': 'Delhi', 'lat': 28.6139, 'lon': 77.2090},
-    'BOM': {'city': 'Mumbai', 'lat': 19.0760, 'lon': 72.8777},
-    'BLR': {'city': 'Bangalore', 'lat': 12.9716, 'lon': 77.5946},
-    'MAA': {'city': 'Chennai', 'lat': 13.0827, 'lon': 80.2707},
-    'HYD': {'city': 'Hyderabad', 'lat': 17.3850, 'lon': 78.4867},
-    'CCU': {'city': 'Kolkata', 'lat': 22.5726, 'lon': 88.3639},
-    'AMD': {'city': 'Ahmedabad', 'lat': 23.0225, 'lon': 72.5714},
-    'GOI': {'city': 'Goa', 'lat': 15.2993, 'lon': 74.1240},
-    'PNQ': {'city': 'Pune', 'lat': 18.5204, 'lon': 73.8567},
-    'COK': {'city': 'Kochi', 'lat': 9.9312, 'lon': 76.2673}
-}
+AIRPORT_DATA = airports.registry
+airport_listing = AirportListing(AIRPORT_DATA, max_age=int(os.environ.get('AIRPORTS_MAX_AGE', 3600)))
 
 # Weather configurations for different cities
 WEATHER_CONFIGS = {
@@ -81,50 +71,8 @@ def generate_qr_code():
     try:
         data = request.json or {}
         
-        # Extract data based on current mode
-        if 'etFirstName' in data:  # E-Ticket mode
-            first_name = data.get('etFirstName', 'Rahul')
-            last_name = data.get('etLastName', 'Sharma')
-            flight = data.get('etFlight', 'AI 2727')
-            from_airport = data.get('etFrom', 'BOM')
-            to_airport = data.get('etTo', 'DEL')
-            date = data.get('etDate', '2025-09-10')
-            time = data.get('etTime', '13:15')
-            pnr = data.get('pnrEt', 'ABC123')
-            ticket_number = data.get('ticketNumber', '1234567890123')
-            
-            qr_data = f"E-TICKET\nTicket: {ticket_number}\nPassenger: {first_name} {last_name}\nFlight: {flight}\nFrom: {from_airport}\nTo: {to_airport}\nDate: {date}\nTime: {time}\nPNR: {pnr}"
-        
-        elif 'bagFirstName' in data:  # Baggage Tag mode
-            first_name = data.get('bagFirstName', 'Priya')
-            last_name = data.get('bagLastName', 'Patel')
-            flight = data.get('bagFlight', 'AI0121')
-            from_airport = data.get('bagFrom', 'BOM')
-            to_airport = data.get('bagTo', 'DEL')
-            pnr = data.get('bagPnr', 'ABC123')
-            bag_number = data.get('bagNumber', '0000-615742')
-            
-            qr_data = f"BAGGAGE TAG\nPassenger: {first_name} {last_name}\nFlight: {flight}\nFrom: {from_airport}\nTo: {to_airport}\nPNR: {pnr}\nTag: {bag_number}"
-        
-        else:  # Boarding Pass mode (default)
-            first_name = data.get('firstName', 'Rahul')
-            last_name = data.get('lastName', 'Sharma')
-            flight = data.get('flight', 'AI 2727')
-            from_airport = data.get('from', 'BOM')
-            to_airport = data.get('to', 'DEL')
-            date = data.get('date', '2025-09-10')
-            time = data.get('time', '13:15')
-            seat = data.get('seat', '17A')
-            gate = data.get('gate', '07')
-            pnr = data.get('pnr', 'ABC123')
-            boarding_time = data.get('boardingTime', '12:45')
-            flight_class = data.get('class', 'Y')
-            sequence = data.get('sequence', '001A')
-            
-            qr_data = f"BOARDING PASS\nPassenger: {first_name} {last_name}\nFlight: {flight}\nFrom: {from_airport}\nTo: {to_airport}\nDate: {date}\nTime: {time}\nSeat: {seat}\nGate: {gate}\nPNR: {pnr}\nBoarding: {boarding_time}\nClass: {flight_class}\nSeq: {sequence}"
-
-        # Generate QR code
-        qr_img = qrcode.make(qr_data)
+        # Boarding passes carry the IATA BCBP mandatory items; e-tickets and bag tags their compact layouts
+        qr_data = documents.qr_payload(data)
         
         # Generate unique filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -134,8 +82,8 @@ def generate_qr_code():
         # Construct the full file path
         filepath = os.path.join(app.root_path, IMAGES_FOLDER, filename)
         
-        # Save QR code to file
-        qr_img.save(filepath)
+        # Write the QR code as a 1-bit PNG straight from its module matrix
+        documents.render_file('qr_code', qr_data, filepath)
         
         # Generate the URL for the image
         image_url = f"/static/images/{filename}"
@@ -156,17 +104,8 @@ def generate_barcode():
     try:
         data = request.json or {}
         
-        # Determine barcode content based on mode
-        if 'bagNumber' in data:  # Baggage Tag mode
-            barcode_data = data.get('bagNumber', '0000-615742')
-        elif 'ticketNumber' in data:  # E-Ticket mode
-            barcode_data = data.get('ticketNumber', '1234567890123')
-        else:  # Boarding Pass mode (default)
-            barcode_data = data.get('pnr', 'ABC123')
-
-        # Generate barcode (using Code128 format)
-        barcode_class = barcode.get_barcode_class('code128')
-        barcode_img = barcode_class(barcode_data, writer=ImageWriter())
+        # Bag tag number, ticket number or PNR depending on the mode
+        barcode_data = documents.barcode_payload(data)
         
         # Generate unique filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -176,8 +115,8 @@ def generate_barcode():
         # Construct the full file path
         filepath = os.path.join(app.root_path, IMAGES_FOLDER, filename)
         
-        # Save barcode to file
-        barcode_img.save(filepath)
+        # Write the Code128 barcode with the native encoder
+        documents.render_file('barcode', barcode_data, filepath)
         
         # Generate the URL for the image
         image_url = f"/static/images/{filename}"
@@ -202,7 +141,7 @@ def get_weather(airport_code):
         return jsonify({
             'success': False,
             'error': f'Airport code {airport_code} not found',
-            'available_airports': list(AIRPORT_DATA.keys())
+            'suggestions': AIRPORT_DATA.suggest(airport_code)
         }), 404
     
     try:
@@ -250,24 +189,7 @@ def get_weather(airport_code):
             'city': AIRPORT_DATA.get(airport_code, {}).get('city', 'Unknown')
         }), 500
 
-@app.route('/api/airports')
-def list_airports():
-    airports_list = []
-    for code, info in AIRPORT_DATA.items():
-        airports_list.append({
-            'code': code,
-            'city': info['city'],
-            'coordinates': {
-                'lat': info['lat'],
-                'lon': info['lon']
-            }
-        })
-    
-    return jsonify({
-        'success': True,
-        'airports': airports_list,
-        'count': len(airports_list)
-    })
+airport_listing.add_route(app)
 
 # Route to serve images
 @app.route('/static/images/<filename>')
@@ -290,7 +212,7 @@ if __name__ == '__main__':
     print("   GET /api/weather/<code>   - Get weather for airport")
     print("   GET /api/airports         - List all supported airports")
     print("")
-    print("📋 Supported airport codes:", list(AIRPORT_DATA.keys()))
+    print(f"📋 Supported airports: {len(AIRPORT_DATA)}")
     print("")
     print("🌐 Server will be available at: http://localhost:5000")
     
@@ -0,0 +1,61 @@
+"""Local stand-in for the OpenWeatherMap current weather API.
+
+Serves /data/2.5/weather in the provider's response format so the pooled
+client, retries and circuit breaker in weather_provider.py can be exercised
+offline. Failures and latency are injectable:
+
+    python weather_stub_server.py [--port 8081] [--fail-rate 0.2] [--delay 0.5]
+    WEATHER_API_URL=http://localhost:8081 python weather_.py
+"""
+import argparse
+import random
+import time
+from flask import Flask, jsonify, request
+
+app = Flask(__name__)
+
+CONDITIONS = [
+    ('Clear', 'clear sky'),
+    ('Clouds', 'scattered clouds'),
+    ('Rain', 'light rain'),
+    ('Haze', 'haze'),
+    ('Mist', 'mist')
+]
+
+settings = {'fail_rate': 0.0, 'delay': 0.0}
+
+
+@app.route('/data/2.5/weather')
+def current_weather():
+    if settings['delay']:
+        time.sleep(settings['delay'])
+    if random.random() < settings['fail_rate']:
+        return jsonify({'cod': 503, 'message': 'stub: injected failure'}), 503
+
+    try:
+        lat = float(request.args['lat'])
+        lon = float(request.args['lon'])
+    except (KeyError, ValueError):
+        return jsonify({'cod': 400, 'message': 'wrong latitude or longitude'}), 400
+
+    # Stable per location and hour, so repeated calls look like a real feed
+    rng = random.Random(f"{lat:.2f},{lon:.2f},{int(time.time() // 3600)}")
+    main, description = rng.choice(CONDITIONS)
+    return jsonify({
+        'coord': {'lat': lat, 'lon': lon},
+        'weather': [{'main': main, 'description': description}],
+        'main': {'temp': round(35 - abs(lat) * 0.5 + rng.uniform(-3, 3), 2), 'humidity': rng.randint(30, 90)},
+        'wind': {'speed': round(rng.uniform(0.5, 12), 2)},
+        'cod': 200
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local weather provider stub')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--delay', type=float, default=0.0, help='seconds to wait before answering')
+    args = parser.parse_args()
+    settings.update(fail_rate=args.fail_rate, delay=args.delay)
+    print(f"Weather stub provider on http://localhost:{args.port}/data/2.5/weather")
+    app.run(host='0.0.0.0', port=args.port, threaded=True)